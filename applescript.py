@@ -0,0 +1,216 @@
+import os
+import sys
+import time
+import tempfile
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# Every automation is an AppleScript template that defines a `perform` handler.
+# Parameters are passed to the handler as arguments, never spliced into the
+# source, so quotes or backslashes in a message body can't break (or inject
+# into) the script, and each template only has to be compiled once.
+
+class ScriptTemplate:
+    """A named AppleScript whose `perform` handler takes `params` in order."""
+
+    def __init__(self, name, source, params=()):
+        self.name = name
+        self.source = source
+        self.params = tuple(params)
+
+    def __repr__(self):
+        return f"ScriptTemplate({self.name!r})"
+
+#############################
+# Backends
+#############################
+class OsascriptBackend:
+    """
+    Fallback: one osascript process per call. Templates are compiled once
+    with osacompile and run from the cached .scpt, with parameters passed as argv.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "jarvis_applescript")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._compiled = {}
+
+    def compile(self, template):
+        args = ", ".join(f"item {i + 1} of argv" for i in range(len(template.params)))
+        source = f"{template.source}\non run argv\n    return perform({args})\nend run\n"
+        path = os.path.join(self.cache_dir, f"{template.name}.scpt")
+        subprocess.run(["osacompile", "-o", path, "-e", source], check=True, capture_output=True)
+        self._compiled[template.name] = path
+
+    def is_compiled(self, template):
+        return template.name in self._compiled
+
+    def run(self, template, args):
+        result = subprocess.run(["osascript", self._compiled[template.name], *args],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+        return result.stdout.strip()
+
+class OSAKitBackend:
+    """
+    Keeps the AppleScript interpreter loaded in this process (via PyObjC's
+    OSAKit) and calls each compiled template's `perform` handler directly.
+    """
+
+    def __init__(self):
+        import OSAKit
+        self._osakit = OSAKit
+        self._language = OSAKit.OSALanguage.languageForName_("AppleScript")
+        self._compiled = {}
+
+    def compile(self, template):
+        script = self._osakit.OSAScript.alloc().initWithSource_language_(template.source, self._language)
+        ok, error = script.compileAndReturnError_(None)
+        if not ok:
+            raise RuntimeError(f"Could not compile {template.name}: {error}")
+        self._compiled[template.name] = script
+
+    def is_compiled(self, template):
+        return template.name in self._compiled
+
+    def run(self, template, args):
+        script = self._compiled[template.name]
+        result, error = script.executeHandlerWithName_arguments_error_("perform", list(args), None)
+        if error:
+            raise RuntimeError(str(error))
+        if result is None or result.stringValue() is None:
+            return ""
+        return result.stringValue().strip()
+
+class FakeBackend:
+    """
+    Stand-in executor for Linux. Records every call and simulates the cost of
+    starting a process, compiling and running. Results come from `responses`
+    (template name -> string or callable(*args)).
+    """
+
+    def __init__(self, responses=None, spawn_delay=0.0, compile_delay=0.0, run_delay=0.0, fork_per_call=False):
+        self.responses = responses or {}
+        self.spawn_delay = spawn_delay
+        self.compile_delay = compile_delay
+        self.run_delay = run_delay
+        self.fork_per_call = fork_per_call
+        self.calls = []
+        self.compile_count = 0
+        self._compiled = set()
+
+    def compile(self, template):
+        time.sleep(self.compile_delay)
+        self.compile_count += 1
+        self._compiled.add(template.name)
+
+    def is_compiled(self, template):
+        return template.name in self._compiled and not self.fork_per_call
+
+    def run(self, template, args):
+        if self.fork_per_call:
+            time.sleep(self.spawn_delay)
+        time.sleep(self.run_delay)
+        self.calls.append((template.name, tuple(args)))
+        response = self.responses.get(template.name, "")
+        return response(*args) if callable(response) else response
+
+#############################
+# Runner
+#############################
+class AppleScriptRunner:
+    """
+    Runs templates on a single long-lived host thread. Templates are compiled
+    the first time they are used and the compiled script is reused afterwards.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._host = ThreadPoolExecutor(max_workers=1, thread_name_prefix="applescript")
+
+    def submit(self, template, *args):
+        """Run a template on the host thread; returns a Future with its output."""
+        if len(args) != len(template.params):
+            raise TypeError(f"{template.name} expects {template.params}, got {len(args)} argument(s)")
+        return self._host.submit(self._run, template, [str(a) for a in args])
+
+    def run(self, template, *args):
+        """Run a template and wait for its output (None if it failed)."""
+        try:
+            return self.submit(template, *args).result()
+        except Exception as e:
+            print(f"❌ AppleScript {template.name} failed: {e}")
+            return None
+
+    def close(self):
+        self._host.shutdown(wait=False)
+
+    def _run(self, template, args):
+        if not self.backend.is_compiled(template):
+            self.backend.compile(template)
+        return self.backend.run(template, args)
+
+def create_backend(name=None):
+    """
+    Pick a backend: JARVIS_APPLESCRIPT_BACKEND=osakit|osascript|fake
+    (default: the best one available on macOS). The fake only records what
+    it would have run, so it is never picked unless asked for.
+    """
+    name = name or os.getenv("JARVIS_APPLESCRIPT_BACKEND")
+    if name == "fake":
+        return FakeBackend()
+    if name == "osascript":
+        return OsascriptBackend()
+    try:
+        return OSAKitBackend()
+    except ImportError:
+        if name == "osakit":
+            raise
+        if sys.platform != "darwin":
+            raise RuntimeError("AppleScript needs macOS; set JARVIS_APPLESCRIPT_BACKEND=fake to run without it")
+        return OsascriptBackend()
+
+_default_runner = None
+
+def get_runner():
+    """The shared runner used by jarvis.py and hardware_listener.py."""
+    global _default_runner
+    if _default_runner is None:
+        _default_runner = AppleScriptRunner(create_backend())
+    return _default_runner
+
+#############################
+# Benchmark
+#############################
+BENCH_TEMPLATE = ScriptTemplate("bench_echo", '''
+on perform(textValue)
+    return textValue
+end perform
+''', params=("text",))
+
+def benchmark(backend, calls=50, label=None):
+    runner = AppleScriptRunner(backend)
+    timings = []
+    for i in range(calls):
+        t0 = time.perf_counter()
+        runner.run(BENCH_TEMPLATE, f'quote " and backslash \\ #{i}')
+        timings.append(time.perf_counter() - t0)
+    runner.close()
+    first, rest = timings[0], sorted(timings[1:])
+    print(f"{label or type(backend).__name__:<28} first call {first * 1000:7.1f} ms"
+          f"   median after {rest[len(rest) // 2] * 1000:7.2f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark AppleScript execution backends.")
+    parser.add_argument("--backend", choices=["fake", "osascript", "osakit"], default="fake")
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+    if args.backend == "fake":
+        # Rough costs of a cold osascript: ~40 ms to start, ~15 ms to compile, ~2 ms to run.
+        costs = dict(spawn_delay=0.04, compile_delay=0.015, run_delay=0.002)
+        benchmark(FakeBackend(fork_per_call=True, **costs), args.calls, "fake, fork per call")
+        benchmark(FakeBackend(**costs), args.calls, "fake, persistent process")
+    else:
+        benchmark(create_backend(args.backend), args.calls)
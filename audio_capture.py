@@ -0,0 +1,190 @@
+import time
+import argparse
+import threading
+from array import array
+
+class AudioRing:
+    """
+    Preallocated ring of int16 audio frames. One writer (the capture
+    callback) appends; any number of RingReaders follow it with their own
+    cursors. The audio path itself takes no locks: the writer copies samples
+    into the next slot and then bumps frames_written, and readers only look
+    at slots below frames_written. A Condition is used only to wake readers.
+    """
+
+    def __init__(self, frame_length, capacity_frames=256):
+        self.frame_length = frame_length
+        self.capacity = capacity_frames
+        self.samples = array("h", bytes(2 * frame_length * capacity_frames))
+        self.captured_at = array("d", bytes(8 * capacity_frames))
+        self.frames_written = 0
+        self._samples_view = memoryview(self.samples)
+        self._bytes_view = self._samples_view.cast("B")
+        self._fill = 0          # samples already written into the current slot
+        self._wakeup = threading.Condition()
+
+    def write(self, data, captured_at=None):
+        """Append raw little-endian int16 PCM (any length; frames are completed across calls)."""
+        captured_at = time.perf_counter() if captured_at is None else captured_at
+        data = memoryview(data).cast("B")
+        frame_bytes = 2 * self.frame_length
+        pos = 0
+        completed = False
+        while pos < len(data):
+            slot = self.frames_written % self.capacity
+            start = slot * frame_bytes + 2 * self._fill
+            n = min(len(data) - pos, frame_bytes - 2 * self._fill)
+            self._bytes_view[start:start + n] = data[pos:pos + n]
+            pos += n
+            self._fill += n // 2
+            if self._fill == self.frame_length:
+                self.captured_at[slot] = captured_at
+                self._fill = 0
+                self.frames_written += 1
+                completed = True
+        if completed:
+            with self._wakeup:
+                self._wakeup.notify_all()
+
+    def frame(self, index):
+        """Zero-copy int16 view of frame number `index` (valid until the writer laps it)."""
+        start = (index % self.capacity) * self.frame_length
+        return self._samples_view[start:start + self.frame_length]
+
+    def reader(self, from_frames_ago=0):
+        """A new reader starting `from_frames_ago` frames back (0 = only new audio)."""
+        return RingReader(self, max(0, self.frames_written - from_frames_ago))
+
+    def wait_for(self, frame_index, timeout=None):
+        """Block until frame `frame_index` has been written. Returns False on timeout."""
+        if self.frames_written > frame_index:
+            return True
+        with self._wakeup:
+            return self._wakeup.wait_for(lambda: self.frames_written > frame_index, timeout)
+
+class RingReader:
+    """A cursor into an AudioRing. Counts frames it lost because it fell behind."""
+
+    def __init__(self, ring, position):
+        self.ring = ring
+        self.position = position
+        self.overruns = 0
+        self.last_captured_at = 0.0
+
+    def available(self):
+        return self.ring.frames_written - self.position
+
+    def read(self, timeout=None):
+        """
+        Next frame as a zero-copy int16 memoryview, or None on timeout.
+        Process it before the writer comes back around (capacity frames later).
+        """
+        ring = self.ring
+        if not ring.wait_for(self.position, timeout):
+            return None
+        # The writer may be filling the slot right after frames_written, so keep one slot of margin
+        behind = ring.frames_written - self.position
+        if behind >= ring.capacity:
+            skipped = behind - ring.capacity + 1
+            self.overruns += skipped
+            self.position += skipped
+        frame = ring.frame(self.position)
+        self.last_captured_at = ring.captured_at[self.position % ring.capacity]
+        self.position += 1
+        return frame
+
+class AudioCapture:
+    """
+    Captures microphone audio with a PyAudio callback (PortAudio's own
+    thread) into an AudioRing, so frames keep being recorded no matter what
+    the rest of Jarvis is doing.
+    """
+
+    def __init__(self, pa, sample_rate, frame_length, capacity_frames=512):
+        import pyaudio
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.ring = AudioRing(frame_length, capacity_frames)
+        self.input_overflows = 0
+        self.detection_latency_last = 0.0
+        self.detection_latency_max = 0.0
+        self._detection_latency_total = 0.0
+        self._detections_measured = 0
+        self._overflow_flag = pyaudio.paInputOverflow
+        self._continue = pyaudio.paContinue
+        self.stream = pa.open(
+            rate=sample_rate,
+            channels=1,
+            format=pyaudio.paInt16,
+            input=True,
+            frames_per_buffer=frame_length,
+            stream_callback=self._on_audio
+        )
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        if status & self._overflow_flag:
+            self.input_overflows += 1
+        self.ring.write(in_data)
+        return None, self._continue
+
+    def record_processed(self, reader):
+        """Record capture-to-detection latency for the frame `reader` just returned."""
+        latency = time.perf_counter() - reader.last_captured_at
+        self.detection_latency_last = latency
+        self.detection_latency_max = max(self.detection_latency_max, latency)
+        self._detection_latency_total += latency
+        self._detections_measured += 1
+
+    def stats(self, reader=None):
+        measured = self._detections_measured
+        return {
+            "frames_captured": self.ring.frames_written,
+            "input_overflows": self.input_overflows,
+            "reader_overruns": reader.overruns if reader else None,
+            "detection_latency_ms_last": self.detection_latency_last * 1000,
+            "detection_latency_ms_avg": (self._detection_latency_total / measured * 1000) if measured else 0.0,
+            "detection_latency_ms_max": self.detection_latency_max * 1000,
+        }
+
+    def close(self):
+        try:
+            if self.stream.is_active():
+                self.stream.stop_stream()
+            self.stream.close()
+        except Exception as e:
+            print(f"Error closing audio stream: {e}")
+
+#############################
+# Benchmark: ring vs struct.unpack_from per frame
+#############################
+def benchmark(frames=20000, frame_length=512):
+    import struct
+    pcm = bytes(range(256)) * (2 * frame_length // 256)
+
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        struct.unpack_from("h" * frame_length, pcm)
+    unpack_us = (time.perf_counter() - t0) / frames * 1e6
+
+    ring = AudioRing(frame_length)
+    reader = ring.reader()
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        ring.write(pcm)
+        reader.read()
+    ring_us = (time.perf_counter() - t0) / frames * 1e6
+
+    # A reader that stalls for longer than the ring holds loses the oldest frames, and says so
+    slow = ring.reader()
+    for _ in range(ring.capacity + 10):
+        ring.write(pcm)
+    slow.read()
+    print(f"struct.unpack_from per frame : {unpack_us:6.2f} µs")
+    print(f"ring write + zero-copy read  : {ring_us:6.2f} µs")
+    print(f"stalled reader overruns      : {slow.overruns} frames")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the audio ring buffer.")
+    parser.add_argument("--frames", type=int, default=20000)
+    args = parser.parse_args()
+    benchmark(args.frames)
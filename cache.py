@@ -0,0 +1,170 @@
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+class ResponseCache:
+    """
+    LRU cache with per-entry TTLs, used in front of slow network calls.
+
+    - Entries expire after their TTL and the least recently used ones are
+      evicted once max_entries (or max_bytes, if set) is exceeded.
+    - With a path, entries are also written to SQLite so they survive restarts.
+    - get_or_compute() coalesces concurrent misses for the same key into one call.
+    Values must be JSON-serializable.
+    """
+
+    def __init__(self, max_entries=256, default_ttl=3600, max_bytes=None, path=None, name="cache"):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._entries = OrderedDict()   # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._inflight = {}             # key -> Future
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT, expires_at REAL, size INTEGER, accessed_at REAL)"
+            )
+            self._db.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        encoded = json.dumps(value)
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._store(key, value, expires_at, len(encoded))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                    (key, encoded, expires_at, len(encoded), time.time())
+                )
+                self._evict_from_disk()
+                self._db.commit()
+
+    def get_or_compute(self, key, compute, ttl=None, should_cache=None):
+        """
+        Return the cached value for key, or call compute() to produce it.
+        If another thread is already computing the same key, wait for its
+        result instead of calling compute() again. should_cache(value) can
+        veto caching (e.g. for error replies).
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        if should_cache is None or should_cache(value):
+            self.set(key, value, ttl)
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._remove(key)
+            if self._db is not None:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # The helpers below expect self._lock to be held.
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None and self._db is not None:
+            row = self._db.execute(
+                "SELECT value, expires_at, size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                entry = (json.loads(row[0]), row[1], row[2])
+                self._store(key, *entry)
+        if entry is None:
+            return None
+        if entry[1] < time.time():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        if self._db is not None:
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return entry
+
+    def _store(self, key, value, expires_at, size):
+        self._remove(key)
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _evict_from_disk(self):
+        self._db.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+        if self.max_bytes is None:
+            limit_clause, limit = "COUNT(*)", self.max_entries
+        else:
+            limit_clause, limit = "COALESCE(SUM(size), 0)", self.max_bytes
+        while self._db.execute(f"SELECT {limit_clause} FROM entries").fetchone()[0] > limit:
+            self._db.execute(
+                "DELETE FROM entries WHERE key = (SELECT key FROM entries ORDER BY accessed_at LIMIT 1)"
+            )
@@ -0,0 +1,132 @@
+import os
+import time
+import asyncio
+import argparse
+import threading
+import statistics
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Every OpenAI and SerpAPI call goes through the clients below, so TLS
+# connections are opened once and kept alive between turns. openai and
+# requests are imported on first use; openai alone takes about half a second.
+# Timeouts and connection limits are built from the SDK's own types, so they
+# match whichever HTTP library (httpx or httpx2) the installed openai uses.
+HTTP_TIMEOUT = float(os.getenv("JARVIS_HTTP_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("JARVIS_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("JARVIS_HTTP_MAX_CONNECTIONS", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("JARVIS_HTTP_KEEPALIVE", "120"))
+SERPAPI_BASE_URL = os.getenv("SERPAPI_BASE_URL", "https://serpapi.com")
+
+_lock = threading.Lock()
+_openai_client = None
+_async_openai_client = None
+_serpapi_session = None
+
+def _timeout(openai):
+    return openai.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+def _limits(openai):
+    Limits = type(openai.DEFAULT_CONNECTION_LIMITS)
+    return Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                  max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                  keepalive_expiry=HTTP_KEEPALIVE_EXPIRY)
+
+def get_openai_client():
+    """The shared OpenAI client (reads OPENAI_API_KEY / OPENAI_BASE_URL from the environment)."""
+    global _openai_client
+    import openai
+    with _lock:
+        if _openai_client is None:
+            _openai_client = openai.OpenAI(
+                timeout=_timeout(openai),
+                http_client=openai.DefaultHttpxClient(limits=_limits(openai), timeout=_timeout(openai))
+            )
+    return _openai_client
+
+def get_async_openai_client():
+    """The shared AsyncOpenAI client. Use it from a single event loop."""
+    global _async_openai_client
+    import openai
+    with _lock:
+        if _async_openai_client is None:
+            _async_openai_client = openai.AsyncOpenAI(
+                timeout=_timeout(openai),
+                http_client=openai.DefaultAsyncHttpxClient(limits=_limits(openai), timeout=_timeout(openai))
+            )
+    return _async_openai_client
+
+def get_serpapi_session():
+    global _serpapi_session
+    import requests
+    from requests.adapters import HTTPAdapter
+    with _lock:
+        if _serpapi_session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_maxsize=HTTP_MAX_CONNECTIONS))
+            session.mount("http://", HTTPAdapter(pool_maxsize=HTTP_MAX_CONNECTIONS))
+            _serpapi_session = session
+    return _serpapi_session
+
+def serpapi_search(params):
+    """Run a SerpAPI Google search and return the decoded JSON results."""
+    params = dict({"engine": "google", "output": "json", "api_key": os.getenv("SERPAPI_KEY")}, **params)
+    response = get_serpapi_session().get(f"{SERPAPI_BASE_URL}/search", params=params,
+                                         timeout=(HTTP_CONNECT_TIMEOUT, HTTP_TIMEOUT))
+    response.raise_for_status()
+    return response.json()
+
+async def async_serpapi_search(params):
+    return await asyncio.to_thread(serpapi_search, params)
+
+def close_clients():
+    global _openai_client, _serpapi_session
+    with _lock:
+        if _openai_client is not None:
+            _openai_client.close()
+            _openai_client = None
+        if _serpapi_session is not None:
+            _serpapi_session.close()
+            _serpapi_session = None
+
+#############################
+# Benchmark: repeated calls with and without pooling
+#############################
+def benchmark(calls=30):
+    global SERPAPI_BASE_URL
+    import openai
+    import requests
+    import fake_openai_server
+    import fake_serpapi_server
+
+    _, openai_url = fake_openai_server.serve_in_thread(first_token_delay=0.0)
+    _, serpapi_url = fake_serpapi_server.serve_in_thread(delay=0.0)
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ["OPENAI_BASE_URL"] = openai_url
+    SERPAPI_BASE_URL = serpapi_url
+    messages = [{"role": "user", "content": "hello"}]
+
+    def timed(fn):
+        samples = []
+        for _ in range(calls):
+            t0 = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - t0)
+        return f"median {statistics.median(samples) * 1000:6.2f} ms   max {max(samples) * 1000:6.2f} ms"
+
+    print("OpenAI, new client per call :", timed(
+        lambda: openai.OpenAI().chat.completions.create(model="gpt-4", messages=messages)))
+    print("OpenAI, shared pooled client:", timed(
+        lambda: get_openai_client().chat.completions.create(model="gpt-4", messages=messages)))
+    print("SerpAPI, new request per call:", timed(
+        lambda: requests.get(f"{serpapi_url}/search", params={"q": "latest news"}).json()))
+    print("SerpAPI, pooled session      :", timed(lambda: serpapi_search({"q": "latest news"})))
+    close_clients()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs unpooled HTTP clients.")
+    parser.add_argument("--calls", type=int, default=30)
+    args = parser.parse_args()
+    benchmark(args.calls)
@@ -0,0 +1,312 @@
+import os
+import re
+import time
+import bisect
+import random
+import argparse
+import threading
+import unicodedata
+
+from applescript import ScriptTemplate, get_runner
+
+#############################
+# Contacts and name normalization
+#############################
+class Contact:
+    """One person from the address book, with every phone number and email."""
+
+    def __init__(self, uid, name, nicknames=(), phones=(), emails=()):
+        self.uid = uid
+        self.name = name
+        self.nicknames = [n for n in nicknames if n]
+        self.phones = [p for p in phones if p]
+        self.emails = [e for e in emails if e]
+
+    def __repr__(self):
+        return f"Contact({self.name!r}, phones={self.phones}, emails={self.emails})"
+
+def normalize_name(text):
+    """Lowercase, strip accents and punctuation: "  José O'Neil " -> "jose oneil"."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = re.sub(r"[^a-z0-9 ]+", "", text)
+    return " ".join(text.split())
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance between a and b, or limit + 1 once it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+#############################
+# Sources
+#############################
+class VCardSource:
+    """Reads contacts from a .vcf file. Reloads only when the file changes."""
+
+    def __init__(self, path):
+        self.path = path
+        self._mtime = None
+
+    def fetch_changes(self):
+        """Returns (changed_contacts, all_uids), or None if nothing changed."""
+        mtime = os.path.getmtime(self.path)
+        if mtime == self._mtime:
+            return None
+        self._mtime = mtime
+        with open(self.path, encoding="utf-8") as f:
+            contacts = parse_vcards(f.read())
+        return contacts, {c.uid for c in contacts}
+
+def parse_vcards(text):
+    # Unfold continuation lines (RFC 6350: a line starting with a space continues the previous one)
+    text = re.sub(r"\r?\n[ \t]", "", text)
+    contacts = []
+    card = None
+    for line in text.splitlines():
+        if line.upper() == "BEGIN:VCARD":
+            card = {"FN": "", "UID": "", "NICKNAME": [], "TEL": [], "EMAIL": []}
+        elif line.upper() == "END:VCARD" and card is not None:
+            uid = card["UID"] or f"vcard-{len(contacts)}"
+            contacts.append(Contact(uid, card["FN"], card["NICKNAME"], card["TEL"], card["EMAIL"]))
+            card = None
+        elif card is not None and ":" in line:
+            key, value = line.split(":", 1)
+            key = key.split(";")[0].upper()
+            if key in ("FN", "UID"):
+                card[key] = value.strip()
+            elif key == "NICKNAME":
+                card["NICKNAME"].extend(n.strip() for n in value.split(","))
+            elif key in ("TEL", "EMAIL"):
+                card[key].append(value.strip())
+    return contacts
+
+# Returns one line per person changed in the last `secondsAgo` seconds (0 = everyone):
+#   id <tab> name <tab> nickname <tab> phone|phone <tab> email|email
+# followed by a final line with every person id, so deletions can be detected.
+FETCH_CONTACTS = ScriptTemplate("fetch_contacts", '''
+on joinList(theList, delimiter)
+    set oldDelimiters to AppleScript's text item delimiters
+    set AppleScript's text item delimiters to delimiter
+    set joined to theList as text
+    set AppleScript's text item delimiters to oldDelimiters
+    return joined
+end joinList
+
+on perform(secondsAgo)
+    set output to {}
+    tell application "Contacts"
+        if (secondsAgo as integer) > 0 then
+            set changedPeople to every person whose modification date > ((current date) - (secondsAgo as integer))
+        else
+            set changedPeople to every person
+        end if
+        repeat with p in changedPeople
+            set nick to nickname of p
+            if nick is missing value then set nick to ""
+            set phoneValues to value of every phone of p
+            set emailValues to value of every email of p
+            set end of output to (id of p) & tab & (name of p) & tab & nick & tab & my joinList(phoneValues, "|") & tab & my joinList(emailValues, "|")
+        end repeat
+        set end of output to my joinList(id of every person, tab)
+    end tell
+    return my joinList(output, linefeed)
+end perform
+''', params=("seconds_ago",))
+
+class MacContactsSource:
+    """Reads Contacts.app through the AppleScript runner, fetching only people changed since the last refresh."""
+
+    def __init__(self, runner=None):
+        self.runner = runner or get_runner()
+        self._last_fetch = None
+
+    def fetch_changes(self):
+        started = time.time()
+        seconds_ago = 0 if self._last_fetch is None else int(started - self._last_fetch) + 1
+        output = self.runner.run(FETCH_CONTACTS, seconds_ago)
+        if output is None:
+            return None
+        self._last_fetch = started
+        lines = output.split("\n")
+        all_uids = set(lines[-1].split("\t")) if lines[-1] else set()
+        contacts = []
+        for line in lines[:-1]:
+            fields = line.split("\t")
+            if len(fields) != 5:
+                continue
+            uid, name, nickname, phones, emails = fields
+            contacts.append(Contact(uid, name, [nickname], phones.split("|"), emails.split("|")))
+        return contacts, all_uids
+
+#############################
+# Index
+#############################
+class ContactIndex:
+    """
+    In-memory address book index. Lookups try an exact name/nickname match,
+    then a prefix match (3+ letters), then the closest name within a small
+    edit distance (5+ letters, to absorb speech recognition mistakes like
+    "jonn" for "john"). Short queries never fuzzy-match: "mom" is not "tom".
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self._contacts = {}     # uid -> Contact
+        self._keys = {}         # normalized name/token/nickname -> set of uids
+        self._sorted_keys = []
+        self._keys_by_length = {}
+        self._fuzzy_cache = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._thread = None
+
+    def refresh(self):
+        """Apply whatever changed in the source since the last refresh."""
+        changes = self.source.fetch_changes()
+        if changes is not None:
+            changed, all_uids = changes
+            with self._lock:
+                contacts = {uid: c for uid, c in self._contacts.items() if uid in all_uids}
+                contacts.update((c.uid, c) for c in changed)
+                self._rebuild(contacts)
+        self._loaded = True
+
+    def start_background_refresh(self, interval=300):
+        """Load now (in the background) and keep refreshing every `interval` seconds."""
+        def run():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print("Error refreshing contacts:", e)
+                time.sleep(interval)
+        if self._thread is None:
+            self._thread = threading.Thread(target=run, name="contacts-refresh", daemon=True)
+            self._thread.start()
+
+    def lookup_all(self, query, limit=5):
+        """Return up to `limit` matching contacts, sorted by name."""
+        if not self._loaded:
+            self.refresh()
+        q = normalize_name(query)
+        if not q:
+            return []
+        contacts = self._contacts
+        uids = self._match(q)
+        if not uids and " " in q:
+            # "jonn smith": match each word on its own and keep people matching all of them
+            for token in q.split():
+                token_uids = self._match(token)
+                uids = token_uids if not uids else uids & token_uids
+                if not uids:
+                    break
+        return sorted((contacts[uid] for uid in uids), key=lambda c: c.name)[:limit]
+
+    def lookup(self, query):
+        """The one contact `query` means, or None if nobody or several people match."""
+        matches = self.lookup_all(query, limit=2)
+        return matches[0] if len(matches) == 1 else None
+
+    def __len__(self):
+        return len(self._contacts)
+
+    def _match(self, q):
+        if q in self._keys:
+            return self._keys[q]
+        return self._prefix_matches(q) or self._fuzzy_matches(q)
+
+    def _rebuild(self, contacts):
+        keys = {}
+        for uid, contact in contacts.items():
+            name = normalize_name(contact.name)
+            names = [name] + name.split() + [normalize_name(n) for n in contact.nicknames]
+            for key in names:
+                if key:
+                    keys.setdefault(key, set()).add(uid)
+        by_length = {}
+        for key in keys:
+            by_length.setdefault(len(key), []).append(key)
+        # Swap in whole new structures so readers never see a half-built index
+        self._contacts, self._keys, self._sorted_keys = contacts, keys, sorted(keys)
+        self._keys_by_length, self._fuzzy_cache = by_length, {}
+
+    def _prefix_matches(self, q):
+        if len(q) < 3:
+            return set()
+        sorted_keys = self._sorted_keys
+        uids = set()
+        i = bisect.bisect_left(sorted_keys, q)
+        while i < len(sorted_keys) and sorted_keys[i].startswith(q):
+            uids |= self._keys[sorted_keys[i]]
+            i += 1
+        return uids
+
+    def _fuzzy_matches(self, q):
+        cache = self._fuzzy_cache
+        if q in cache:
+            return cache[q]
+        if len(q) <= 4:
+            return set()
+        limit = 2
+        best, uids = limit + 1, set()
+        for length in range(len(q) - limit, len(q) + limit + 1):
+            for key in self._keys_by_length.get(length, ()):
+                distance = edit_distance(q, key, best)
+                if distance < best:
+                    best, uids = distance, set(self._keys[key])
+                elif distance == best and distance <= limit:
+                    uids |= self._keys[key]
+        cache[q] = uids if best <= limit else set()
+        return cache[q]
+
+def create_source():
+    """JARVIS_CONTACTS_VCF=/path/to/contacts.vcf reads a vCard file instead of Contacts.app."""
+    vcf_path = os.getenv("JARVIS_CONTACTS_VCF")
+    return VCardSource(vcf_path) if vcf_path else MacContactsSource()
+
+#############################
+# Benchmark
+#############################
+class _StaticSource:
+    def __init__(self, contacts):
+        self.contacts = contacts
+        self._sent = False
+
+    def fetch_changes(self):
+        if self._sent:
+            return None
+        self._sent = True
+        return self.contacts, {c.uid for c in self.contacts}
+
+def benchmark(people=1000, lookups=2000):
+    first = ["john", "maria", "ahmed", "li", "sofia", "dawit", "olivia", "liam", "noah", "emma", "yonas", "sara"]
+    last = ["smith", "garcia", "kebede", "chen", "rossi", "tesfaye", "brown", "nguyen", "haile", "miller"]
+    rng = random.Random(1)
+    contacts = [Contact(str(i), f"{rng.choice(first).title()} {rng.choice(last).title()} {i}",
+                        phones=[f"+1555{i:07d}"]) for i in range(people)]
+    index = ContactIndex(_StaticSource(contacts))
+    t0 = time.perf_counter()
+    index.refresh()
+    print(f"Indexed {len(index)} contacts in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    for label, query in [("exact", "dawit"), ("prefix", "dawi"), ("fuzzy", "dawid"), ("fuzzy", "maira smith")]:
+        t0 = time.perf_counter()
+        for _ in range(lookups):
+            index.lookup_all(query)
+        per_call = (time.perf_counter() - t0) / lookups * 1e6
+        print(f"{label:<7} {query!r:<14} {per_call:9.1f} µs   -> {len(index.lookup_all(query))} matches, "
+              f"lookup() -> {index.lookup(query)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark contact lookups.")
+    parser.add_argument("--people", type=int, default=1000)
+    args = parser.parse_args()
+    benchmark(args.people)
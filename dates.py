@@ -0,0 +1,248 @@
+import re
+import time
+import argparse
+import datetime
+import threading
+from collections import OrderedDict
+
+# Reminders and calendar events say when in a handful of common ways.
+# Those are resolved by the regex rules below in microseconds; anything
+# else goes to dateparser (imported on first use, English only) and the
+# answer is memoized relative to the current time.
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fifteen": 15, "twenty": 20,
+    "thirty": 30, "forty": 40, "forty five": 45, "fifty": 50, "sixty": 60, "ninety": 90,
+}
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+UNITS = {"minute": "minutes", "min": "minutes", "hour": "hours", "hr": "hours", "day": "days", "week": "weeks"}
+PERIOD_HOURS = {"morning": 9, "afternoon": 15, "evening": 18, "night": 20}
+
+_NUMBER = r"(?P<count>\d+|" + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True)) + ")"
+_TIME = (r"(?:(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<meridiem>am|pm)?(?:\s+o'?clock)?|(?P<named>noon|midnight))"
+         r"(?:\s+in\s+the\s+(?P<part>morning|afternoon|evening)|\s+at\s+night)?")
+_DAY = (r"(?P<day>today|tonight|tomorrow|(?:the\s+)?day\s+after\s+tomorrow|this(?=\s+(?:morning|afternoon|evening))"
+        r"|(?:(?:next|this|on|coming)\s+)?(?P<weekday>" + "|".join(WEEKDAYS) + r"))"
+        r"(?:\s+(?P<period>morning|afternoon|evening|night))?")
+_AT = r"(?:(?:at|by)\s+)?" + _TIME
+
+RELATIVE = re.compile(rf"^in\s+(?:{_NUMBER}\s+(?P<unit>minute|min|hour|hr|day|week)s?|(?P<half>half\s+an\s+hour))(?:\s+from\s+now)?$")
+DAY_THEN_TIME = re.compile(rf"^(?:on\s+)?{_DAY}(?:\s+{_AT})?$")
+TIME_THEN_DAY = re.compile(rf"^{_AT}(?:\s+(?:on\s+)?{_DAY})?$")
+
+def normalize(text):
+    text = text.lower().replace("a.m.", "am").replace("p.m.", "pm").replace("-", " ")
+    text = re.sub(r"[.,!?]+$", "", text.strip())
+    return re.sub(r"\s+", " ", text)
+
+class DateResolver:
+    """
+    resolve(text, now) -> datetime or None. Regex rules first, then
+    memoized dateparser. A bare hour from 1 to 7 ("tomorrow at 5") means PM.
+
+    Memoized dateparser answers are keyed by phrase and day. Phrases whose
+    answer moves with the clock ("in 3 hours") are stored as an offset from
+    now; the rest as a fixed time, reused while it is still in the future.
+    """
+
+    def __init__(self, cache_size=512, languages=("en",)):
+        self.cache_size = cache_size
+        self.languages = list(languages)
+        self.counts = {"rule": 0, "memo": 0, "dateparser": 0}
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self._dateparser = None
+
+    def resolve(self, text, now=None):
+        now = datetime.datetime.now() if now is None else now
+        phrase = normalize(text or "")
+        if not phrase:
+            return None
+        result = self._rules(phrase, now)
+        if result is not None:
+            self.counts["rule"] += 1
+            return result
+        return self._memoized(phrase, now)
+
+    #############################
+    # Regex rules
+    #############################
+    def _rules(self, phrase, now):
+        match = RELATIVE.match(phrase)
+        if match:
+            if match["half"]:
+                return now + datetime.timedelta(minutes=30)
+            count = match["count"]
+            count = int(count) if count.isdigit() else NUMBER_WORDS[count]
+            return now + datetime.timedelta(**{UNITS[match["unit"]]: count})
+        match = DAY_THEN_TIME.match(phrase) or TIME_THEN_DAY.match(phrase)
+        if match:
+            return self._day_and_time(match, now)
+        return None
+
+    def _day_and_time(self, match, now):
+        day = match["day"]
+        clock = self._clock(match)
+        if clock is False:
+            return None
+        if day is None:
+            # A time on its own is the next time the clock shows it
+            result = now.replace(hour=clock[0], minute=clock[1], second=0, microsecond=0)
+            return result if result > now else result + datetime.timedelta(days=1)
+        if match["weekday"]:
+            ahead = (WEEKDAYS.index(match["weekday"]) - now.weekday()) % 7 or 7
+            date = now.date() + datetime.timedelta(days=ahead)
+        elif day == "tomorrow":
+            date = now.date() + datetime.timedelta(days=1)
+        elif day.endswith("after tomorrow"):
+            date = now.date() + datetime.timedelta(days=2)
+        else:   # today, tonight, this (morning...)
+            date = now.date()
+        if clock is None:
+            period = match["period"] or ("night" if day == "tonight" else None)
+            if period is None:
+                return datetime.datetime.combine(date, now.time())
+            clock = (PERIOD_HOURS[period], 0)
+        return datetime.datetime.combine(date, datetime.time(*clock))
+
+    @staticmethod
+    def _clock(match):
+        """(hour, minute), None when no time was said, or False if it isn't a valid time."""
+        if match["named"]:
+            return (12, 0) if match["named"] == "noon" else (0, 0)
+        if match["hour"] is None:
+            return None
+        hour, minute = int(match["hour"]), int(match["minute"] or 0)
+        if hour > 23 or minute > 59:
+            return False
+        meridiem = match["meridiem"]
+        if meridiem is None and hour <= 12:
+            if match["part"] == "morning":
+                meridiem = "am"
+            elif match["part"] or match["period"] in ("afternoon", "evening", "night") or match["day"] == "tonight":
+                meridiem = "pm"
+            elif 1 <= hour <= 7:
+                meridiem = "pm"
+        if meridiem == "pm" and hour < 12:
+            hour += 12
+        elif meridiem == "am" and hour == 12:
+            hour = 0
+        elif meridiem and hour > 12:
+            return False
+        return hour, minute
+
+    #############################
+    # dateparser, memoized
+    #############################
+    def _memoized(self, phrase, now):
+        key = (phrase, now.date())
+        with self._lock:
+            entry = self._memo.get(key)
+            if entry is not None:
+                self._memo.move_to_end(key)
+        if entry is not None:
+            kind, value = entry
+            if kind == "none":
+                self.counts["memo"] += 1
+                return None
+            if kind == "offset":
+                self.counts["memo"] += 1
+                return now + value
+            if value > now:
+                self.counts["memo"] += 1
+                return value
+        self.counts["dateparser"] += 1
+        result = self._parse(phrase, now)
+        if result is None:
+            entry = ("none", None)
+        else:
+            # Parse again an hour later: if the answer moves by the same hour it's relative to now
+            shifted = self._parse(phrase, now + datetime.timedelta(hours=1))
+            moved = shifted is not None and shifted - result == datetime.timedelta(hours=1)
+            entry = ("offset", result - now) if moved else ("fixed", result)
+        with self._lock:
+            self._memo[key] = entry
+            while len(self._memo) > self.cache_size:
+                self._memo.popitem(last=False)
+        return result
+
+    def _parse(self, phrase, now):
+        if self._dateparser is None:
+            import dateparser  # large language data; loaded on first use (or by warm())
+            self._dateparser = dateparser
+        return self._dateparser.parse(phrase, languages=self.languages, settings={
+            "PREFER_DATES_FROM": "future",
+            "RELATIVE_BASE": now,
+            "RETURN_AS_TIMEZONE_AWARE": False,
+            "PARSERS": ["relative-time", "absolute-time"],
+        })
+
+    def warm(self):
+        """Import dateparser and load its English data ahead of the first reminder."""
+        self._parse("next month", datetime.datetime.now())
+
+    def stats(self):
+        return dict(self.counts, memoized=len(self._memo))
+
+#############################
+# Benchmark corpus
+#############################
+CORPUS = [
+    "tomorrow at 5", "tomorrow at 5pm", "tomorrow at 9am", "tomorrow at 7:30 am", "tomorrow morning",
+    "tomorrow evening", "tonight", "tonight at 9", "today at noon", "this afternoon",
+    "in 20 minutes", "in 5 minutes", "in an hour", "in half an hour", "in two hours", "in 3 days",
+    "in a week", "in forty five minutes", "next monday 9am", "next Monday at 9 a.m.", "on friday",
+    "friday at 3pm", "saturday morning", "sunday at noon", "at 6", "at 6:45 pm", "5pm", "8 in the evening",
+    "noon", "midnight", "the day after tomorrow at 10", "5pm tomorrow",
+    # for dateparser
+    "next month", "in 2 weeks and 3 days", "march 3rd at 2pm", "december 24", "3 days from now at noon",
+    "a week from friday", "june 5th 2027", "the 15th",
+]
+
+def run_benchmark(corpus=CORPUS, now=None, repeats=200):
+    import dateparser
+    now = now or datetime.datetime(2026, 3, 11, 10, 15)     # a Wednesday morning
+    settings = {"PREFER_DATES_FROM": "future", "RELATIVE_BASE": now}
+
+    t0 = time.perf_counter()
+    dateparser.parse("tomorrow", languages=["en"], settings=settings)
+    print(f"First dateparser call (language data): {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    resolver = DateResolver()
+    print(f"Now is {now:%A %B %d %Y %I:%M %p}\n")
+    print(f"{'phrase':<34}{'plain µs':>10}{'cold µs':>10}{'warm µs':>10}  {'result':<22} dateparser")
+    totals = [0.0, 0.0, 0.0]
+    differences, unparsed = [], []
+    for phrase in corpus:
+        t0 = time.perf_counter()
+        for _ in range(repeats // 10):
+            expected = dateparser.parse(phrase, languages=["en"], settings=settings)
+        plain = (time.perf_counter() - t0) / (repeats // 10)
+        t0 = time.perf_counter()
+        result = resolver.resolve(phrase, now)
+        cold = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            resolver.resolve(phrase, now)
+        warm = (time.perf_counter() - t0) / repeats
+        for i, seconds in enumerate((plain, cold, warm)):
+            totals[i] += seconds
+        same = (result and result.replace(second=0, microsecond=0)) == (expected and expected.replace(second=0, microsecond=0))
+        if not same:
+            (differences if expected else unparsed).append(phrase)
+        print(f"{phrase:<34}{plain * 1e6:>10.0f}{cold * 1e6:>10.0f}{warm * 1e6:>10.1f}  "
+              f"{result.strftime('%a %b %d %I:%M %p') if result else '-':<22} "
+              f"{'same' if same else (expected.strftime('%a %b %d %I:%M %p') if expected else '-')}")
+    n = len(corpus)
+    print(f"\nMean per phrase: plain dateparser {totals[0] / n * 1e6:.0f} µs, "
+          f"resolver first call {totals[1] / n * 1e6:.0f} µs, repeated {totals[2] / n * 1e6:.1f} µs")
+    print(f"Resolved by: {resolver.stats()}")
+    print(f"Plain dateparser found no date in {len(unparsed)}: {unparsed}")
+    print(f"{len(differences)} resolved differently (dateparser shown above): {differences}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare DateResolver with plain dateparser on a phrase corpus.")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+    run_benchmark(repeats=args.repeats)
@@ -0,0 +1,180 @@
+import time
+import random
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from tracing import Tracer
+
+#############################
+# Search + LLM, raced
+#############################
+def grounded_prompt(query, snippet):
+    return (f"Use this live search result if it helps answer the question.\n"
+            f"Search result: {snippet}\n\nQuestion: {query}")
+
+class _LLMRun:
+    """A streaming LLM answer whose first chunk is awaited on the pool."""
+
+    def __init__(self, pool, stream, on_first):
+        self.stream = stream
+        self.started = time.perf_counter()
+        self.first = pool.submit(self._first_chunk, on_first)
+
+    def _first_chunk(self, on_first):
+        chunk = next(self.stream, None)
+        on_first(time.perf_counter() - self.started)
+        return chunk
+
+    def ok(self):
+        return self.first.done() and not self.first.exception() and self.first.result() is not None
+
+    def cancel(self):
+        """Close the stream (and its HTTP response) as soon as no thread is reading it."""
+        if self.first.done():
+            self.stream.close()
+        else:
+            self.first.add_done_callback(lambda _: self.stream.close())
+
+    def chunks(self):
+        """The whole answer as one iterator, starting with the chunk already read."""
+        try:
+            yield self.first.result()
+            yield from self.stream
+        finally:
+            self.stream.close()
+
+class SpeculativeDispatcher:
+    """
+    Starts a web search and an LLM answer at the same time instead of
+    guessing which one the question needs:
+
+    - a useful snippet that arrives first is used to ground a fresh LLM
+      answer (or is spoken as-is if that answer misses the deadline), and
+      the ungrounded LLM stream is closed;
+    - an LLM answer that starts first wins, unless the question looked like
+      a search, in which case the snippet gets `grounding_wait` more seconds.
+
+    search(query)       -> snippet text
+    llm_stream(prompt)  -> iterator of reply chunks (closable)
+    is_useful(snippet)  -> False for "no results" / error texts
+
+    Timings go to `tracer` ("search", "llm_first_token", "dispatch") and the
+    winner is noted on the current turn.
+    """
+
+    def __init__(self, search, llm_stream, is_useful=bool, deadline=6.0, grounding_wait=0.8, max_workers=4,
+                 tracer=None):
+        self.search = search
+        self.llm_stream = llm_stream
+        self.is_useful = is_useful
+        self.deadline = deadline
+        self.grounding_wait = grounding_wait
+        self.pool = ThreadPoolExecutor(max_workers, thread_name_prefix="dispatch")
+        self.tracer = tracer or Tracer()
+        self.stats = self.tracer.stats
+        self.wins = Counter()
+
+    def answer(self, query, prefer_search=False):
+        """Returns (reply, winner): reply is an iterator of chunks, a string, or None on timeout."""
+        started = time.perf_counter()
+        deadline = started + self.deadline
+        search = self.pool.submit(self._timed_search, query)
+        llm = _LLMRun(self.pool, self.llm_stream(query), lambda s: self.tracer.record("llm_first_token", s))
+        llm_ready_at = None
+
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                llm.cancel()
+                return self._finish(None, "timeout", started)
+            snippet = self._snippet(search)
+            if snippet:
+                llm.cancel()
+                return self._ground(query, snippet, deadline, started)
+            if llm.ok():
+                llm_ready_at = llm_ready_at or now
+                if not prefer_search or search.done() or now >= llm_ready_at + self.grounding_wait:
+                    return self._finish(llm.chunks(), "llm", started)
+                timeout = llm_ready_at + self.grounding_wait - now
+            else:
+                timeout = deadline - now
+            pending = {f for f in (search, llm.first) if not f.done()}
+            if not pending:
+                # Search had nothing useful and the LLM failed
+                llm.cancel()
+                return self._finish(None, "none", started)
+            wait(pending, timeout=min(timeout, deadline - now), return_when=FIRST_COMPLETED)
+
+    def _timed_search(self, query):
+        t0 = time.perf_counter()
+        try:
+            return self.search(query)
+        finally:
+            self.tracer.record("search", time.perf_counter() - t0, t0)
+
+    def _snippet(self, search):
+        if not search.done() or search.exception():
+            return None
+        snippet = search.result()
+        return snippet if self.is_useful(snippet) else None
+
+    def _ground(self, query, snippet, deadline, started):
+        grounded = _LLMRun(self.pool, self.llm_stream(grounded_prompt(query, snippet)), lambda s: None)
+        wait({grounded.first}, timeout=max(0.0, deadline - time.perf_counter()))
+        if grounded.ok():
+            return self._finish(grounded.chunks(), "search+llm", started)
+        grounded.cancel()
+        return self._finish(snippet, "search", started)
+
+    def _finish(self, reply, winner, started):
+        self.tracer.record("dispatch", time.perf_counter() - started, started)
+        self.tracer.annotate(winner=winner)
+        self.wins[winner] += 1
+        print(f"🏁 {winner} answered in {(time.perf_counter() - started) * 1000:.0f} ms  "
+              f"({self.stats.summary('search')}; {self.stats.summary('llm_first_token')}; "
+              f"{self.stats.summary('dispatch')})")
+        return reply, winner
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+#############################
+# Harness: fake search and LLM with random latency
+#############################
+def run_harness(turns=20, seed=1):
+    rng = random.Random(seed)
+    closed = []
+
+    def fake_search(query):
+        time.sleep(rng.uniform(0.2, 1.2))
+        return "" if "poem" in query else f"Snippet about {query}."
+
+    def fake_llm(prompt):
+        delay = rng.uniform(0.3, 1.5)
+
+        def stream():
+            try:
+                time.sleep(delay)
+                for word in ("Here", " is", " the", " answer."):
+                    yield word
+            finally:
+                closed.append(prompt)
+        return stream()
+
+    dispatcher = SpeculativeDispatcher(fake_search, fake_llm, deadline=3.0)
+    questions = ["what's the latest news", "write a poem about rain", "who won the game", "tell me a joke"]
+    for i in range(turns):
+        question = questions[i % len(questions)]
+        reply, winner = dispatcher.answer(question, prefer_search=question.startswith(("what", "who")))
+        if reply is not None and not isinstance(reply, str):
+            "".join(reply)
+    time.sleep(1.6)
+    dispatcher.close()
+    print(f"Winners: {dict(dispatcher.wins)}; streams closed: {len(closed)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Race fake search and LLM backends through the dispatcher.")
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+    run_harness(args.turns)
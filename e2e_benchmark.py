@@ -0,0 +1,244 @@
+import os
+import re
+import sys
+import json
+import time
+import queue
+import argparse
+import tempfile
+import resource
+import threading
+from array import array
+
+import fake_devices
+
+# End-to-end run of jarvis.py on a plain Linux box. Every outside service is
+# replaced by a local fake with configurable latency:
+#
+#   microphone / PyAudio  -> fake_devices.FakeMicrophone (WAV fixtures or synthetic speech)
+#   Porcupine             -> fake_devices.FakePorcupine (wake clip carries a marker frame)
+#   pyttsx3               -> fake_devices.FakeTTSEngine
+#   Google STT            -> scripted transcripts
+#   OpenAI / SerpAPI      -> fake_openai_server.py / fake_serpapi_server.py
+#   osascript             -> applescript.FakeBackend
+#   Arduino serial port   -> fake_arduino.py pty read by hardware_listener.py
+#
+# A scripted user says the wake word, then each line of the conversation
+# whenever Jarvis starts listening, and the run reports how long Jarvis took
+# to start answering each line, plus throughput, CPU and memory use.
+
+CONVERSATION = [
+    "what's the temperature",
+    "tell me a joke about robots",
+    "what's the latest news",
+    "send message to mom saying i'll be home soon",
+    "yes",
+    "how humid is it",
+    "goodbye",
+]
+
+CONTACTS_VCF = """BEGIN:VCARD
+VERSION:3.0
+FN:Mom
+TEL;TYPE=CELL:+1 555 010 0001
+EMAIL:mom@example.com
+END:VCARD
+BEGIN:VCARD
+VERSION:3.0
+FN:Alex Smith
+TEL;TYPE=CELL:+1 555 010 0002
+END:VCARD
+"""
+
+def slug(text):
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+class ScriptedUser:
+    """Speaks the next line each time Jarvis starts listening; Google STT 'hears' its transcript."""
+
+    def __init__(self, microphone, lines, fixtures=None, stt_delay=0.3, words_per_second=2.5):
+        self.microphone = microphone
+        self.lines = list(lines)
+        self.fixtures = fixtures
+        self.stt_delay = stt_delay
+        self.words_per_second = words_per_second
+        self.listening = threading.Event()
+        self.transcripts = queue.Queue()
+        self.said = []          # (text, perf_counter when the last sample was played)
+        self.done = threading.Event()
+
+    def clip(self, text):
+        if self.fixtures:
+            path = os.path.join(self.fixtures, slug(text) + ".wav")
+            if os.path.exists(path):
+                return fake_devices.read_wav(path)
+        return fake_devices.synth_speech(max(0.4, len(text.split()) / self.words_per_second), seed=len(self.said))
+
+    def say_wake_word(self):
+        self.microphone.play(fake_devices.wake_word_clip())
+        self.microphone.play(array("h", bytes(2 * fake_devices.SAMPLE_RATE)))  # a 1 s pause
+
+    def run(self):
+        for text in self.lines:
+            if not self.listening.wait(60):
+                print(f"⚠️ Jarvis never started listening for {text!r}")
+                break
+            self.listening.clear()
+            time.sleep(0.2)   # the user takes a moment to start talking
+            self.transcripts.put(text)
+            self.microphone.play(self.clip(text))
+            self.microphone.wait_played()
+            self.said.append((text, time.perf_counter()))
+            print(f"🧑 USER: {text}")
+        self.done.set()
+
+    def recognize_google(self, audio_data, *args, **kwargs):
+        time.sleep(self.stt_delay)
+        try:
+            return self.transcripts.get_nowait()
+        except queue.Empty:
+            import speech_recognition as sr
+            raise sr.UnknownValueError()
+
+def start_fake_services(args, workdir):
+    import fake_openai_server
+    import fake_serpapi_server
+    openai_server, openai_url = fake_openai_server.serve_in_thread(
+        first_token_delay=args.llm_first_token, chunk_delay=args.llm_chunk)
+    serpapi_server, serpapi_url = fake_serpapi_server.serve_in_thread(delay=args.search_delay)
+
+    vcf = os.path.join(workdir, "contacts.vcf")
+    with open(vcf, "w") as f:
+        f.write(CONTACTS_VCF)
+
+    os.environ.update({
+        "OPENAI_API_KEY": "fake", "PORCUPINE_ACCESS_KEY": "fake", "SERPAPI_KEY": "fake",
+        "OPENAI_BASE_URL": openai_url, "SERPAPI_BASE_URL": serpapi_url,
+        "JARVIS_APPLESCRIPT_BACKEND": "fake",
+        "JARVIS_CONTACTS_VCF": vcf,
+        "JARVIS_HARDWARE_SOCKET": os.path.join(workdir, "hardware.sock"),
+        "JARVIS_TRACE": os.path.join(workdir, "trace.jsonl"),
+        "JARVIS_GPT_CACHE": "",
+        "JARVIS_STT": "google",
+        "JARVIS_PIPELINE": "1" if args.pipeline else "0",
+    })
+
+    # The Arduino: a pty that hardware_listener.py reads, as it would a USB serial port
+    import fake_arduino
+    import hardware_listener
+    master_fd, slave_path, _ = fake_arduino.open_fake_port()
+    hardware_listener.bus.start()
+    threading.Thread(target=hardware_listener.serial_listener, args=(slave_path,), daemon=True).start()
+
+    def arduino():
+        volume = 40
+        while True:
+            fake_arduino.write_line(master_fd, "DHT:T:72.5F, H:38%")
+            for _ in range(4):
+                volume = (volume + 1) % 100
+                fake_arduino.write_line(master_fd, f"VOL:{volume}")
+                time.sleep(0.5)
+    threading.Thread(target=arduino, daemon=True).start()
+    return openai_server, serpapi_server
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="jarvis-e2e-")
+    microphone = fake_devices.FakeMicrophone(speed=args.speed)
+    fake_devices.install(microphone, porcupine_delay=args.porcupine_delay, words_per_second=args.tts_wps)
+    start_fake_services(args, workdir)
+
+    t_import = time.perf_counter()
+    import jarvis
+    import_seconds = time.perf_counter() - t_import
+    jarvis.applescript.backend.run_delay = args.applescript_delay
+
+    user = ScriptedUser(microphone, CONVERSATION, args.fixtures, stt_delay=args.stt_delay)
+    jarvis.recognizer.recognize_google = user.recognize_google
+    ring_frames = jarvis.ring_frames
+
+    def listening_ring_frames(*a, **kw):
+        user.listening.set()
+        return ring_frames(*a, **kw)
+    jarvis.ring_frames = listening_ring_frames
+
+    finished = threading.Event()
+    cleanup = jarvis.cleanup
+
+    def cleanup_and_finish():
+        cleanup()
+        finished.set()
+    jarvis.cleanup = cleanup_and_finish
+
+    jarvis.hardware.subscribe(jarvis.on_hardware_event)
+    jarvis.hardware.start()
+    time.sleep(2.5)    # hardware_listener waits 2 s for the "Arduino" to boot
+
+    cpu_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    loop = jarvis.run_pipeline if args.pipeline else jarvis.detect_wake_word
+    threading.Thread(target=loop, name="jarvis", daemon=True).start()
+    user.say_wake_word()
+    threading.Thread(target=user.run, daemon=True).start()
+    if not finished.wait(args.timeout):
+        print("⚠️ The conversation did not finish in time")
+    wall = time.perf_counter() - started
+    cpu_after = resource.getrusage(resource.RUSAGE_SELF)
+
+    report(args, user, jarvis, wall, import_seconds, cpu_before, cpu_after, microphone)
+
+def report(args, user, jarvis, wall, import_seconds, cpu_before, cpu_after, microphone):
+    from tracing import percentile
+    spoken = fake_devices.FakeTTSEngine.log
+    latencies = []
+    print("\nTurn latency (end of user speech -> first audio of the reply)")
+    for text, said_at in user.said:
+        reply = next((t for t, _ in spoken if t > said_at), None)
+        if reply is None:
+            print(f"  {text:<45}  no reply")
+            continue
+        latencies.append(reply - said_at)
+        print(f"  {text:<45} {(reply - said_at) * 1000:8.0f} ms")
+    latencies.sort()
+    cpu = (cpu_after.ru_utime - cpu_before.ru_utime) + (cpu_after.ru_stime - cpu_before.ru_stime)
+    results = {
+        "mode": "pipeline" if args.pipeline else "legacy",
+        "turns": len(user.said),
+        "turn_ms_p50": percentile(latencies, 50) and percentile(latencies, 50) * 1000,
+        "turn_ms_p95": percentile(latencies, 95) and percentile(latencies, 95) * 1000,
+        "turns_per_minute": len(user.said) / wall * 60,
+        "audio_frames_per_second": microphone.frames_played / wall,
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "cpu_percent_of_core": cpu / wall * 100,
+        "max_rss_mb": cpu_after.ru_maxrss / 1024,
+        "import_jarvis_s": import_seconds,
+        "wake_detection": jarvis.capture.stats(jarvis.wake_reader),
+        "stages_ms": jarvis.tracer.stats.table(),
+    }
+    print(f"\nTurns: {results['turns']}  p50 {results['turn_ms_p50'] or 0:.0f} ms  p95 {results['turn_ms_p95'] or 0:.0f} ms")
+    print(f"Throughput: {results['turns_per_minute']:.1f} turns/min, {results['audio_frames_per_second']:.0f} audio frames/s")
+    print(f"CPU: {cpu:.2f} s over {wall:.1f} s ({results['cpu_percent_of_core']:.0f}% of one core)  "
+          f"max RSS {results['max_rss_mb']:.0f} MB  import jarvis {import_seconds * 1000:.0f} ms")
+    print(f"Stages: {jarvis.tracer.summary()}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a scripted conversation through jarvis.py with local fakes.")
+    parser.add_argument("--pipeline", action="store_true", help="drive run_pipeline() instead of detect_wake_word()")
+    parser.add_argument("--fixtures", help="directory of WAV recordings named after each line (e.g. whats_the_temperature.wav)")
+    parser.add_argument("--speed", type=float, default=1.0, help="microphone speed relative to real time")
+    parser.add_argument("--stt-delay", type=float, default=0.3)
+    parser.add_argument("--llm-first-token", type=float, default=0.3)
+    parser.add_argument("--llm-chunk", type=float, default=0.05)
+    parser.add_argument("--search-delay", type=float, default=0.4)
+    parser.add_argument("--applescript-delay", type=float, default=0.05)
+    parser.add_argument("--porcupine-delay", type=float, default=0.0005)
+    parser.add_argument("--tts-wps", type=float, default=8.0, help="fake TTS speaking rate, words per second")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    run(args)
+    sys.exit(0)
@@ -0,0 +1,100 @@
+import os
+import pty
+import tty
+import time
+import random
+import argparse
+import threading
+
+# A stand-in for the Arduino: writes the same serial protocol to a pseudo-terminal.
+# Run it, then start the listener with JARVIS_SERIAL_PORT=<printed pty path>.
+
+def open_fake_port():
+    """Create a pty pair. Returns (master_fd, slave_path, slave_fd)."""
+    master_fd, slave_fd = pty.openpty()
+    # Raw mode so lines pass through untouched (no echo, no CR/LF translation).
+    tty.setraw(slave_fd)
+    return master_fd, os.ttyname(slave_fd), slave_fd
+
+def write_line(master_fd, line):
+    os.write(master_fd, (line + "\r\n").encode("utf-8"))
+
+def simulate(master_fd, interval=0.5):
+    """Emit a realistic mix of DHT readings, trimpot sweeps and button presses."""
+    volume = 50
+    while True:
+        roll = random.random()
+        if roll < 0.6:
+            volume = max(0, min(100, volume + random.choice([-1, 1])))
+            write_line(master_fd, f"VOL:{volume}")
+        elif roll < 0.9:
+            write_line(master_fd, f"DHT:T:{random.uniform(68, 76):.1f}F, H:{random.randint(20, 45)}%")
+        else:
+            write_line(master_fd, random.choice(["BTN:STOP", "BTN:MUTE", "BTN:DEBUG"]))
+        time.sleep(interval)
+
+#############################
+# Benchmark: hardware_listener.read_lines over a pty
+#############################
+def benchmark(lines=5000, burst=50, gap=0.005, sweep=500):
+    import serial
+    import hardware_listener
+
+    master_fd, port, slave_fd = open_fake_port()
+    ser = serial.Serial(port, hardware_listener.BAUD_RATE, timeout=1)
+    sent_at = {}
+    latencies = []
+    done = threading.Event()
+
+    def reader():
+        for line in hardware_listener.read_lines(ser):
+            line = line.strip()
+            if line in sent_at:
+                latencies.append(time.perf_counter() - sent_at[line])
+            if len(latencies) >= lines:
+                done.set()
+                return
+
+    threading.Thread(target=reader, daemon=True).start()
+    start = time.perf_counter()
+    for i in range(lines):
+        line = f"DHT:T:{i}F, H:40%"
+        sent_at[line] = time.perf_counter()
+        write_line(master_fd, line)
+        if i % burst == burst - 1:
+            time.sleep(gap)
+    done.wait(30)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"Lines read        : {len(latencies)}/{lines} in {elapsed:.2f} s ({len(latencies) / elapsed:.0f} lines/s)")
+    if latencies:
+        print(f"Read latency      : p50 {latencies[len(latencies) // 2] * 1000:.2f} ms"
+              f"   p95 {latencies[int(len(latencies) * 0.95)] * 1000:.2f} ms")
+
+    # Trimpot sweep: many VOL readings should collapse into a few volume changes.
+    applied = []
+    debouncer = hardware_listener.VolumeDebouncer(apply=applied.append, min_interval=0.05)
+    for i in range(sweep):
+        debouncer.submit(i % 101)
+        time.sleep(0.001)
+    time.sleep(0.2)
+    print(f"Volume sweep      : {sweep} VOL readings -> {debouncer.applied_count} applies"
+          f" (last applied {applied[-1] if applied else None})")
+    ser.close()
+    os.close(slave_fd)
+    os.close(master_fd)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Arduino serial device on a pty.")
+    parser.add_argument("--bench", action="store_true", help="benchmark the serial reader instead")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between simulated lines")
+    args = parser.parse_args()
+    if args.bench:
+        benchmark()
+    else:
+        master_fd, port, slave_fd = open_fake_port()
+        print(f"Fake Arduino on {port}  (JARVIS_SERIAL_PORT={port} python hardware_listener.py)")
+        try:
+            simulate(master_fd, args.interval)
+        except KeyboardInterrupt:
+            pass
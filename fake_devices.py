@@ -0,0 +1,210 @@
+import sys
+import math
+import time
+import types
+import random
+import threading
+from array import array
+
+# Stand-ins for the microphone (PyAudio), Porcupine and the pyttsx3 engine,
+# so jarvis.py can run on a plain Linux box. install() registers them as the
+# `pyaudio`, `pvporcupine` and `pyttsx3` modules before jarvis is imported.
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 512
+
+# The last frame of a wake-word clip starts with this pattern; FakePorcupine looks for it.
+WAKE_MARKER = (12345, -12345, 12345, -12345)
+
+#############################
+# Audio
+#############################
+def synth_speech(seconds, sample_rate=SAMPLE_RATE, seed=None):
+    """Syllable-like tone bursts with short gaps: loud enough for the VAD, no words in it."""
+    rng = random.Random(seed)
+    samples = array("h")
+    while len(samples) < seconds * sample_rate:
+        syllable = int(rng.uniform(0.12, 0.25) * sample_rate)
+        pitch = rng.uniform(120, 220)
+        for i in range(syllable):
+            envelope = math.sin(math.pi * i / syllable)
+            samples.append(int(4000 * envelope * math.sin(2 * math.pi * pitch * i / sample_rate)))
+        samples.extend(array("h", bytes(2 * int(rng.uniform(0.03, 0.08) * sample_rate))))
+    return samples
+
+def wake_word_clip(sample_rate=SAMPLE_RATE, frame_length=FRAME_LENGTH):
+    """About 0.6 s of "speech" whose last frame carries WAKE_MARKER."""
+    clip = synth_speech(0.6, sample_rate, seed=0)
+    del clip[len(clip) - len(clip) % frame_length:]
+    clip[-frame_length:-frame_length + len(WAKE_MARKER)] = array("h", WAKE_MARKER)
+    return clip
+
+def read_wav(path):
+    import wave
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise ValueError(f"{path}: expected a 16-bit mono WAV file")
+        return array("h", wav.readframes(wav.getnframes()))
+
+class FakeMicrophone:
+    """
+    Plays queued clips (and quiet background noise in between) into a
+    PyAudio-style stream callback, frame by frame, at `speed` x real time.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, frame_length=FRAME_LENGTH, speed=1.0, noise=30):
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.speed = speed
+        self.noise = noise
+        self.frames_played = 0
+        self._clips = []
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._rng = random.Random(1)
+
+    def play(self, samples):
+        """Queue a clip. Returns immediately; wait_played() blocks until it has been heard."""
+        with self._lock:
+            self._idle.clear()
+            self._clips.append(array("h", samples))
+
+    def wait_played(self, timeout=None):
+        return self._idle.wait(timeout)
+
+    def next_frame(self):
+        n = self.frame_length
+        with self._lock:
+            if self._clips:
+                clip = self._clips[0]
+                frame, rest = clip[:n], clip[n:]
+                if len(frame) < n:
+                    frame.extend(array("h", bytes(2 * (n - len(frame)))))
+                if rest:
+                    self._clips[0] = rest
+                else:
+                    self._clips.pop(0)
+                    if not self._clips:
+                        self._idle.set()
+                return frame
+        return array("h", (self._rng.randint(-self.noise, self.noise) for _ in range(n)))
+
+    def run(self, callback, running):
+        frame_seconds = self.frame_length / self.sample_rate / self.speed
+        next_at = time.perf_counter()
+        while running():
+            callback(self.next_frame().tobytes(), self.frame_length, {}, 0)
+            self.frames_played += 1
+            next_at += frame_seconds
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+class FakeStream:
+    def __init__(self, microphone, callback):
+        self._active = True
+        self._thread = threading.Thread(target=microphone.run, args=(callback, lambda: self._active),
+                                        name="fake-microphone", daemon=True)
+        self._thread.start()
+
+    def is_active(self):
+        return self._active
+
+    def stop_stream(self):
+        self._active = False
+
+    def close(self):
+        self._active = False
+
+class FakePyAudio:
+    microphone = None   # set by install()
+
+    def open(self, rate, channels, format, input, frames_per_buffer, stream_callback):
+        return FakeStream(self.microphone, stream_callback)
+
+    def terminate(self):
+        pass
+
+#############################
+# Wake word
+#############################
+class FakePorcupine:
+    sample_rate = SAMPLE_RATE
+    frame_length = FRAME_LENGTH
+
+    def __init__(self, process_delay=0.0):
+        self.process_delay = process_delay
+        self.frames_processed = 0
+
+    def process(self, pcm):
+        if self.process_delay:
+            time.sleep(self.process_delay)
+        self.frames_processed += 1
+        return 0 if tuple(pcm[:len(WAKE_MARKER)]) == WAKE_MARKER else -1
+
+    def delete(self):
+        pass
+
+#############################
+# Text to speech
+#############################
+class FakeTTSEngine:
+    """pyttsx3-compatible engine that "speaks" at `words_per_second` and logs when each utterance starts."""
+
+    log = []            # (perf_counter at start, text), shared by all engines
+
+    def __init__(self, words_per_second=5.0, startup=0.02):
+        self.words_per_second = words_per_second
+        self.startup = startup
+        self.callbacks = {}
+        self.pending = []
+        self._stop = threading.Event()
+
+    def setProperty(self, name, value):
+        pass
+
+    def connect(self, topic, callback):
+        self.callbacks.setdefault(topic, []).append(callback)
+
+    def say(self, text):
+        self.pending.append(text)
+
+    def stop(self):
+        self._stop.set()
+
+    def runAndWait(self):
+        self._stop.clear()
+        while self.pending and not self._stop.is_set():
+            text = self.pending.pop(0)
+            time.sleep(self.startup)
+            FakeTTSEngine.log.append((time.perf_counter(), text))
+            for callback in self.callbacks.get("started-utterance", []):
+                callback(None)
+            for index, word in enumerate(text.split()):
+                if self._stop.wait(1 / self.words_per_second):
+                    break
+                for callback in self.callbacks.get("started-word", []):
+                    callback(None, index, len(word))
+        self.pending.clear()
+
+#############################
+# Registration
+#############################
+def install(microphone, porcupine_delay=0.0, words_per_second=5.0):
+    """Register fake pyaudio / pvporcupine / pyttsx3 modules. Call before importing jarvis."""
+    FakePyAudio.microphone = microphone
+
+    pyaudio = types.ModuleType("pyaudio")
+    pyaudio.PyAudio = FakePyAudio
+    pyaudio.paInt16 = 8
+    pyaudio.paInputOverflow = 2
+    pyaudio.paContinue = 0
+
+    pvporcupine = types.ModuleType("pvporcupine")
+    pvporcupine.create = lambda **kwargs: FakePorcupine(porcupine_delay)
+
+    pyttsx3 = types.ModuleType("pyttsx3")
+    pyttsx3.init = lambda *args, **kwargs: FakeTTSEngine(words_per_second)
+
+    sys.modules.update({"pyaudio": pyaudio, "pvporcupine": pvporcupine, "pyttsx3": pyttsx3})
@@ -0,0 +1,109 @@
+import json
+import time
+import threading
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# A tiny stand-in for the OpenAI chat completions endpoint.
+# Point Jarvis at it with: OPENAI_BASE_URL=http://127.0.0.1:8001/v1
+CANNED_REPLY = (
+    "Certainly, Creator. The weather today looks clear with a light breeze. "
+    "I would recommend a jacket for the evening, as it will get colder. "
+    "Is there anything else you would like to know?"
+)
+
+def split_into_chunks(text, size=4):
+    """Split text into small pieces, roughly like streamed tokens."""
+    words = text.split(" ")
+    return [" ".join(words[i:i + size]) + (" " if i + size < len(words) else "")
+            for i in range(0, len(words), size)]
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    reply = CANNED_REPLY
+    chunk_delay = 0.05      # seconds between streamed chunks
+    first_token_delay = 0.3 # seconds before the first chunk
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection pooling can be measured
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        model = body.get("model", "gpt-4")
+        time.sleep(self.first_token_delay)
+        if body.get("stream"):
+            self.send_stream(model)
+        else:
+            self.send_full(model)
+
+    def send_full(self, model):
+        payload = json.dumps({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.reply},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_stream(self, model):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")  # the stream ends when the connection does
+        self.end_headers()
+        self.close_connection = True
+        for i, piece in enumerate(split_into_chunks(self.reply)):
+            if i:
+                time.sleep(self.chunk_delay)
+            self.send_event(model, {"content": piece}, None)
+        self.send_event(model, {}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def send_event(self, model, delta, finish_reason):
+        chunk = {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }
+        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+def serve_in_thread(port=0, **settings):
+    """Start the fake server on a daemon thread. Returns (server, base_url)."""
+    handler = type("ConfiguredHandler", (FakeOpenAIHandler,), settings)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI server that streams canned chunks.")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    args = parser.parse_args()
+    FakeOpenAIHandler.chunk_delay = args.chunk_delay
+    FakeOpenAIHandler.first_token_delay = args.first_token_delay
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), FakeOpenAIHandler)
+    print(f"Fake OpenAI server on http://127.0.0.1:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
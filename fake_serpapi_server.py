@@ -0,0 +1,60 @@
+import json
+import time
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# A tiny stand-in for SerpAPI's Google search endpoint.
+# Point Jarvis at it with: SERPAPI_BASE_URL=http://127.0.0.1:8002
+
+class FakeSerpAPIHandler(BaseHTTPRequestHandler):
+    delay = 0.4          # seconds, roughly a real SerpAPI round trip
+    request_count = 0
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection pooling can be measured
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if not url.path.startswith("/search"):
+            self.send_error(404)
+            return
+        type(self).request_count += 1
+        query = parse_qs(url.query).get("q", [""])[0]
+        time.sleep(self.delay)
+        payload = json.dumps({
+            "search_metadata": {"status": "Success"},
+            "search_parameters": {"q": query},
+            "organic_results": [
+                {"position": 1, "title": f"Result for {query}", "link": "https://example.com",
+                 "snippet": f"Here is what I found about {query}."}
+            ]
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+def serve_in_thread(port=0, **settings):
+    """Start the fake server on a daemon thread. Returns (server, base_url)."""
+    handler = type("ConfiguredHandler", (FakeSerpAPIHandler,), dict(settings, request_count=0))
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake SerpAPI server.")
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--delay", type=float, default=0.4)
+    args = parser.parse_args()
+    FakeSerpAPIHandler.delay = args.delay
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), FakeSerpAPIHandler)
+    print(f"Fake SerpAPI server on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,20 +1,26 @@
-import openai
 import os
 from dotenv import load_dotenv
+from gpt_cache import get_gpt_cache
+from clients import get_openai_client
 
 # Load API Key from .env file
 load_dotenv()
 
-def chat_with_gpt(prompt):
-    try:
-        client = openai.OpenAI()
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",  # Changed to GPT-3.5 since GPT-4 is unavailable
-            messages=[{"role": "system", "content": "You are JARVIS, an AI assistant."},
+MODEL = "gpt-3.5-turbo"  # Changed to GPT-3.5 since GPT-4 is unavailable
+SYSTEM_PROMPT = "You are JARVIS, an AI assistant."
+
+def chat_with_gpt(prompt, use_cache=True):
+    def create():
+        response = get_openai_client().chat.completions.create(
+            model=MODEL,
+            messages=[{"role": "system", "content": SYSTEM_PROMPT},
                       {"role": "user", "content": prompt}],
             max_tokens=150
         )
-        return response.choices[0].message.content
+        tokens = response.usage.total_tokens if response.usage else 0
+        return response.choices[0].message.content, tokens
+    try:
+        return get_gpt_cache().complete(prompt, MODEL, SYSTEM_PROMPT, create, use_cache=use_cache)
     except Exception as e:
         print("Error communicating with GPT:", e)
         return None
@@ -0,0 +1,88 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+
+from cache import ResponseCache
+
+def normalize_prompt(prompt):
+    """Case, spacing and trailing punctuation don't change the question."""
+    return re.sub(r"\s+", " ", prompt.lower()).strip().rstrip("?.! ")
+
+def cache_key(prompt, model, system_prompt):
+    raw = json.dumps([model, system_prompt, normalize_prompt(prompt)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class GPTResponseCache:
+    """
+    Caches chat completions by (normalized prompt, model, system prompt) in
+    memory and SQLite. Each entry remembers how long the original request
+    took and how many tokens it used, so hits can report what they saved.
+    """
+
+    def __init__(self, path=None, ttl=24 * 60 * 60, max_bytes=5 * 1024 * 1024):
+        self.cache = ResponseCache(max_entries=10_000, default_ttl=ttl, max_bytes=max_bytes, path=path, name="gpt")
+        self.saved_seconds = 0.0
+        self.saved_tokens = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, prompt, model, system_prompt):
+        """Cached response text, or None. Logs the latency and tokens saved on a hit."""
+        entry = self.cache.get(cache_key(prompt, model, system_prompt))
+        if entry is None:
+            return None
+        self._record_hit(entry)
+        return entry["text"]
+
+    def _record_hit(self, entry):
+        with self._lock:
+            self.saved_seconds += entry["latency"]
+            self.saved_tokens += entry["tokens"]
+        print(f"⚡ GPT cache hit: saved {entry['latency']:.2f} s and {entry['tokens']} tokens "
+              f"(session total {self.saved_seconds:.1f} s, {self.saved_tokens} tokens)")
+
+    def store(self, prompt, model, system_prompt, text, latency, tokens=0):
+        self.cache.set(cache_key(prompt, model, system_prompt),
+                       {"text": text, "latency": latency, "tokens": tokens or 0})
+
+    def complete(self, prompt, model, system_prompt, create, use_cache=True):
+        """
+        Return the response for prompt, calling create() -> (text, total_tokens)
+        only on a cache miss. Concurrent identical prompts share one request.
+        Exceptions from create() propagate and nothing is cached.
+        """
+        if not use_cache:
+            return create()[0]
+        computed = []
+
+        def timed_create():
+            computed.append(True)
+            started = time.perf_counter()
+            text, tokens = create()
+            return {"text": text, "latency": time.perf_counter() - started, "tokens": tokens or 0}
+
+        entry = self.cache.get_or_compute(cache_key(prompt, model, system_prompt), timed_create,
+                                          should_cache=lambda e: bool(e["text"]))
+        if not computed:
+            self._record_hit(entry)
+        return entry["text"]
+
+    def stats(self):
+        return dict(self.cache.stats(), saved_seconds=self.saved_seconds, saved_tokens=self.saved_tokens)
+
+_shared_cache = None
+
+def get_gpt_cache():
+    """
+    The cache shared by jarvis.py and gpt.py. Configure with
+    JARVIS_GPT_CACHE (SQLite path, "" for memory only) and JARVIS_GPT_CACHE_TTL (seconds).
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = GPTResponseCache(
+            path=os.getenv("JARVIS_GPT_CACHE", "gpt_cache.db") or None,
+            ttl=float(os.getenv("JARVIS_GPT_CACHE_TTL", str(24 * 60 * 60))),
+        )
+    return _shared_cache
@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import socket
+import threading
+
+# Unix domain socket shared by hardware_listener.py (publisher) and jarvis.py (subscriber).
+SOCKET_PATH = os.getenv("JARVIS_HARDWARE_SOCKET", "/tmp/jarvis_hardware.sock")
+
+# Every message on the socket is one JSON object per line:
+#   {"seq": 12, "type": "button", "value": "BTN:STOP",
+#    "state": {"volume": 46, "dht": "...", "temperature": 75.0, "humidity": 40.0, "button": "BTN:STOP"}}
+# New subscribers are sent a {"type": "snapshot", ...} message with the current state first.
+
+class HardwareBusServer:
+    """Pushes hardware events to every connected subscriber."""
+
+    def __init__(self, path=SOCKET_PATH):
+        self.path = path
+        self.seq = 0
+        self.state = {"volume": None, "dht": None, "temperature": None, "humidity": None, "button": None}
+        self._clients = []
+        self._lock = threading.Lock()
+        self._sock = None
+
+    def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.path)
+        self._sock.listen()
+        threading.Thread(target=self._accept_loop, name="hardware-bus", daemon=True).start()
+        return self
+
+    def publish(self, event_type, value, state=None):
+        """Send one event (and the resulting state) to all subscribers."""
+        with self._lock:
+            self.seq += 1
+            if state is not None:
+                self.state = dict(state)
+            message = self._encode({"seq": self.seq, "type": event_type, "value": value, "state": self.state})
+            for client in list(self._clients):
+                try:
+                    client.sendall(message)
+                except OSError:
+                    self._drop(client)
+
+    def close(self):
+        with self._lock:
+            for client in list(self._clients):
+                self._drop(client)
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _accept_loop(self):
+        while self._sock is not None:
+            try:
+                client, _ = self._sock.accept()
+            except OSError:
+                return
+            with self._lock:
+                snapshot = self._encode({"seq": self.seq, "type": "snapshot", "value": None, "state": self.state})
+                try:
+                    client.sendall(snapshot)
+                except OSError:
+                    client.close()
+                    continue
+                self._clients.append(client)
+
+    def _drop(self, client):
+        try:
+            client.close()
+        except OSError:
+            pass
+        if client in self._clients:
+            self._clients.remove(client)
+
+    @staticmethod
+    def _encode(message):
+        return (json.dumps(message) + "\n").encode("utf-8")
+
+class HardwareBusClient:
+    """
+    Subscribes to the hardware bus on a background thread, reconnecting as needed.
+    latest() returns the most recent state dict; each update replaces the dict
+    rather than mutating it, so readers can hold on to it without copying.
+    """
+
+    def __init__(self, path=SOCKET_PATH, reconnect_delay=1.0):
+        self.path = path
+        self.reconnect_delay = reconnect_delay
+        self.seq = 0
+        self.connected = False
+        self._state = None
+        self._handlers = []
+        self._running = False
+
+    def subscribe(self, handler):
+        """Register handler(event_type, value, state), called for every pushed event."""
+        self._handlers.append(handler)
+
+    def latest(self):
+        return self._state
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            threading.Thread(target=self._run, name="hardware-bus-client", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._running = False
+
+    def _run(self):
+        while self._running:
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.connect(self.path)
+                    self.connected = True
+                    with sock.makefile("r", encoding="utf-8") as lines:
+                        for line in lines:
+                            if not self._running:
+                                return
+                            self._handle(json.loads(line))
+            except (OSError, ValueError):
+                pass
+            self.connected = False
+            time.sleep(self.reconnect_delay)
+
+    def _handle(self, message):
+        self.seq = message["seq"]
+        self._state = message["state"]
+        if message["type"] == "snapshot":
+            return
+        for handler in self._handlers:
+            try:
+                handler(message["type"], message["value"], self._state)
+            except Exception as e:
+                print(f"Error in hardware event handler: {e}")
@@ -1,27 +1,86 @@
 import serial
-import subprocess
 import time
 import json
+import os
+import threading
+from hardware_bus import HardwareBusServer
+from applescript import ScriptTemplate, get_runner
+from timeseries import parse_dht
 
 # Set your Arduino's serial port and baud rate.
 SERIAL_PORT = "/dev/cu.usbmodem3101"  # Your port
 BAUD_RATE = 115200
 
+# Optional legacy output: also write hardware_data.json on every update.
+WRITE_JSON_SNAPSHOT = os.getenv("JARVIS_HARDWARE_JSON", "0") == "1"
+JSON_SNAPSHOT_PATH = "hardware_data.json"
+
+# Pushes button/VOL/DHT events to jarvis.py over a Unix domain socket.
+bus = HardwareBusServer()
+
 # Global dictionary to store the latest data.
 latest_data = {
     "volume": None,   # Volume percentage (0-100)
     "dht": None,      # DHT sensor data as a string (e.g., "DHT:T:75F, H:40%")
+    "temperature": None,  # parsed from "dht": degrees F
+    "humidity": None,     # parsed from "dht": percent
     "button": None    # Button event (e.g., "BTN:STOP")
 }
 
+SET_VOLUME = ScriptTemplate("set_volume", '''
+on perform(volumeLevel)
+    set volume output volume (volumeLevel as integer)
+end perform
+''', params=("volume",))
+
 def set_system_volume(volume):
     """
     Sets the MacBook's system volume to the given percentage using AppleScript.
     """
-    script = f"set volume output volume {volume}"
-    subprocess.run(["osascript", "-e", script])
+    get_runner().run(SET_VOLUME, volume)
     print(f"System volume set to {volume}%")
 
+class VolumeDebouncer:
+    """
+    Coalesces bursts of VOL: readings. submit() only records the newest value;
+    a background thread applies it at most once every min_interval seconds,
+    so turning the trimpot doesn't run a volume script per reading.
+    """
+
+    def __init__(self, apply=set_system_volume, min_interval=0.2):
+        self.apply = apply
+        self.min_interval = min_interval
+        self.applied_count = 0
+        self._pending = None
+        self._last_applied = None
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, volume):
+        with self._cond:
+            self._pending = volume
+            self._cond.notify()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="volume-debouncer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                volume, self._pending = self._pending, None
+            if volume != self._last_applied:
+                try:
+                    self.apply(volume)
+                except Exception as e:
+                    print("Error setting volume:", e)
+                self._last_applied = volume
+                self.applied_count += 1
+                time.sleep(self.min_interval)
+
+volume_debouncer = VolumeDebouncer()
+
 def process_line(line):
     """
     Process a single line from the Arduino's Serial output.
@@ -37,45 +96,82 @@ def process_line(line):
         try:
             volume = int(line.split(":")[1])
             latest_data["volume"] = volume
-            set_system_volume(volume)
+            volume_debouncer.submit(volume)
+            bus.publish("volume", volume, latest_data)
         except ValueError:
             print("Error parsing volume from:", line)
+            return
     elif line.startswith("BTN:"):
         latest_data["button"] = line
         print("Button event received:", line)
+        bus.publish("button", line, latest_data)
     elif line.startswith("DHT:"):
+        reading = parse_dht(line)
+        if reading is None:
+            print("Error parsing DHT data from:", line)
+            return
         latest_data["dht"] = line
+        latest_data["temperature"], latest_data["humidity"] = reading
         print("DHT data received:", line)
+        bus.publish("dht", line, latest_data)
     else:
         print("Other message:", line)
-    
-    # Write the updated latest_data to a JSON file.
+        return
+
+    if WRITE_JSON_SNAPSHOT:
+        write_json_snapshot()
+
+def write_json_snapshot():
+    """Write latest_data to hardware_data.json (legacy consumers only)."""
+    tmp_path = JSON_SNAPSHOT_PATH + ".tmp"
     try:
-        with open("hardware_data.json", "w") as f:
+        with open(tmp_path, "w") as f:
             json.dump(latest_data, f)
+        os.replace(tmp_path, JSON_SNAPSHOT_PATH)
     except Exception as e:
-        print("Error writing hardware_data.json:", e)
+        print(f"Error writing {JSON_SNAPSHOT_PATH}:", e)
+
+def read_lines(ser):
+    """
+    Yield complete lines from the serial port as soon as they arrive.
+    Blocks in read() until data is available, then drains everything that
+    is already buffered, so a burst of lines is handled in one wakeup.
+    """
+    buffer = b""
+    while True:
+        chunk = ser.read(max(1, ser.in_waiting))
+        if not chunk:
+            continue  # read timeout, nothing arrived
+        buffer += chunk
+        if ser.in_waiting:
+            buffer += ser.read(ser.in_waiting)
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            yield raw.decode("utf-8", errors="replace")
 
-def serial_listener():
+def serial_listener(port=SERIAL_PORT):
     try:
-        ser = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=1)
+        ser = serial.Serial(port, BAUD_RATE, timeout=1)
     except Exception as e:
         print("Error opening serial port:", e)
         return
     time.sleep(2)  # Wait for the Arduino to initialize.
-    print("Serial listener running on", SERIAL_PORT)
-    
-    while True:
-        if ser.in_waiting > 0:
-            try:
-                line = ser.readline().decode("utf-8")
-                process_line(line)
-            except Exception as e:
-                print("Error reading line:", e)
-        time.sleep(0.1)
+    print("Serial listener running on", port)
+
+    for line in read_lines(ser):
+        try:
+            process_line(line)
+        except Exception as e:
+            print("Error processing line:", e)
 
 def main():
-    serial_listener()
+    port = os.getenv("JARVIS_SERIAL_PORT", SERIAL_PORT)  # e.g. the pty printed by fake_arduino.py
+    bus.start()
+    print("Hardware bus listening on", bus.path)
+    try:
+        serial_listener(port)
+    finally:
+        bus.close()
 
 if __name__ == "__main__":
     main()
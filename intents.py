@@ -0,0 +1,380 @@
+import re
+import time
+import argparse
+
+#############################
+# Declarative intents compiled into one Aho-Corasick matcher over words
+#############################
+WORD = re.compile(r"[a-z0-9@.']+")
+
+def tokenize(text):
+    """Lowercase words with their (start, end) character spans."""
+    return [(m.group().strip(".'"), m.start(), m.end()) for m in WORD.finditer(text.lower())]
+
+class Intent:
+    """
+    name      : what the router reports
+    phrases   : trigger phrases, matched on whole words ("temp" never matches "attempt")
+    priority  : the highest-priority intent found in an utterance wins
+    whole     : the trigger must be the entire utterance ("exit", not "exit the app and ...")
+    leading   : the trigger must start the utterance (after LEAD_IN words like "please") and
+                not be followed by a question word, so "call mom" matches but
+                "how do I call a function" and "remind me what you said" don't
+    slots     : regex with named groups, matched against the text after the trigger
+                (or a list of them, tried in order)
+    """
+
+    def __init__(self, name, phrases, priority=0, whole=False, leading=False, slots=None):
+        self.name = name
+        self.phrases = list(phrases)
+        self.priority = priority
+        self.whole = whole
+        self.leading = leading
+        if isinstance(slots, str):
+            slots = [slots]
+        self.slots = [re.compile(pattern, re.IGNORECASE) for pattern in slots or ()]
+
+# Words that may come before a leading trigger ("jarvis, please call mom")
+LEAD_IN = {"jarvis", "hey", "ok", "okay", "please", "can", "could", "would", "will", "you",
+           "i", "i'd", "want", "like", "need", "to", "go", "ahead", "and", "now"}
+QUESTION_WORDS = {"what", "what's", "whats", "who", "who's", "whose", "where", "where's", "when", "why",
+                  "how", "how's", "which", "whether", "if"}
+
+class IntentMatch:
+    def __init__(self, intent, phrase, start, end, slots):
+        self.intent = intent
+        self.name = intent.name
+        self.phrase = phrase
+        self.start = start      # character span of the trigger in the utterance
+        self.end = end
+        self.slots = slots
+
+    def __repr__(self):
+        return f"IntentMatch({self.name!r}, {self.phrase!r}, {self.slots})"
+
+class IntentRouter:
+    """
+    All trigger phrases go into one word-level Aho-Corasick automaton, so an
+    utterance is scanned once no matter how many intents are registered.
+    """
+
+    def __init__(self, intents=(), default=None):
+        self.intents = []
+        self.default = default
+        self._compiled = False
+        for intent in intents:
+            self.add(intent)
+
+    def add(self, intent):
+        self.intents.append(intent)
+        self._compiled = False
+        return intent
+
+    def compile(self):
+        goto = [{}]         # node -> {word: node}
+        output = [[]]       # node -> [(intent, phrase, length in words)]
+        for intent in self.intents:
+            for phrase in intent.phrases:
+                words = [w for w, _, _ in tokenize(phrase)]
+                node = 0
+                for word in words:
+                    if word not in goto[node]:
+                        goto.append({})
+                        output.append([])
+                        goto[node][word] = len(goto) - 1
+                    node = goto[node][word]
+                output[node].append((intent, phrase, len(words)))
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        while queue:
+            node = queue.pop(0)
+            for word, child in goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and word not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(word, 0) if goto[f].get(word, 0) != child else 0
+                output[child] = output[child] + output[fail[child]]
+        self._goto, self._fail, self._output = goto, fail, output
+        self._compiled = True
+
+    def match_all(self, text):
+        """Every trigger found in `text`, in order of where it ends."""
+        if not self._compiled:
+            self.compile()
+        goto, fail, output = self._goto, self._fail, self._output
+        tokens = tokenize(text)
+        lead = 0
+        while lead < len(tokens) and tokens[lead][0] in LEAD_IN:
+            lead += 1
+        found = []
+        node = 0
+        for i, (word, _, end) in enumerate(tokens):
+            while node and word not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(word, 0)
+            for intent, phrase, length in output[node]:
+                start = tokens[i - length + 1][1]
+                if intent.whole and (length != len(tokens)):
+                    continue
+                if intent.leading and (i - length + 1 > lead or
+                                       (i + 1 < len(tokens) and tokens[i + 1][0] in QUESTION_WORDS)):
+                    continue
+                found.append((intent, phrase, start, end))
+        return found
+
+    def match(self, text):
+        """Best intent for `text` (highest priority, then earliest, then longest), or the default."""
+        best = None
+        for intent, phrase, start, end in self.match_all(text):
+            key = (-intent.priority, start, -(end - start))
+            if best is None or key < best[0]:
+                best = (key, intent, phrase, start, end)
+        if best is None:
+            if self.default is None:
+                return None
+            return IntentMatch(self.default, "", 0, 0, {})
+        _, intent, phrase, start, end = best
+        slots = {}
+        rest = text[end:].strip(" ,")
+        for pattern in intent.slots:
+            m = pattern.match(rest)
+            if m:
+                slots = {k: v.strip() for k, v in m.groupdict().items() if v}
+                break
+        return IntentMatch(intent, phrase, start, end, slots)
+
+    def matches(self, text):
+        """True if any trigger occurs in `text`."""
+        return bool(text) and bool(self.match_all(text))
+
+#############################
+# Jarvis's commands
+#############################
+WHEN = r"(?P<when>(?:at|on|in|by|tomorrow|today|tonight|this|next|noon|midnight|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b.*)"
+
+WHEN_FIRST = WHEN.replace(r"\b.*)", r"\b.*?)")
+
+def split_recipient(text, is_recipient, max_words=4):
+    """
+    Split "mom i love you" into ("mom", "i love you") by taking the longest
+    leading run of words (up to `max_words`) that is_recipient() accepts.
+    A leading phone number is taken whole. Returns (text, "") if no prefix fits.
+    """
+    words = text.split()
+    digits = 0
+    while digits < len(words) and re.fullmatch(r"[+\d()-]+", words[digits]):
+        digits += 1
+    if digits:
+        return " ".join(words[:digits]), " ".join(words[digits:])
+    for n in range(min(max_words, len(words)), 0, -1):
+        candidate = " ".join(words[:n])
+        if is_recipient(candidate):
+            return candidate, " ".join(words[n:])
+    return text, ""
+
+def build_router():
+    return IntentRouter([
+        Intent("exit", ["exit", "quit", "goodbye", "shut down"], priority=100, whole=True),
+        Intent("shutdown", ["shut down mac", "shutdown mac", "turn off mac", "shut down my mac", "turn off my mac"],
+               priority=90),
+        Intent("message", ["send message to", "send a message to", "message", "text", "send text to", "send a text to"],
+               priority=80, leading=True, slots=r"(?:to\s+)?(?P<contact>.+?)(?:\s+(?:saying|that says|that|say)\s+(?P<body>.+))?$"),
+        Intent("call", ["call", "facetime", "phone", "ring"],
+               priority=80, leading=True, slots=r"(?:to\s+)?(?P<contact>.+)$"),
+        Intent("email", ["send email", "send an email", "email", "send mail"],
+               priority=85, leading=True, slots=r"(?:to\s+)?(?P<contact>.+?)(?:\s+(?:about|subject)\s+(?P<subject>.+))?$"),
+        Intent("reminder", ["remind me", "add reminder", "add a reminder", "set a reminder", "create reminder"],
+               priority=80, leading=True, slots=[
+                   r"(?:for\s+)?" + WHEN_FIRST + r"\s+(?:to|about)\s+(?P<task>.+)$",     # "for tomorrow at 9 to call the bank"
+                   r"(?:to\s+|about\s+)?(?P<task>.+?)(?:\s+" + WHEN + r")?$"]),
+        Intent("calendar", ["add event", "add an event", "create event", "create an event", "schedule",
+                            "add to calendar", "add to my calendar", "calendar event"],
+               priority=80, leading=True, slots=r"(?:an?\s+)?(?:event\s+)?(?:called\s+)?(?P<event>.+?)(?:\s+" + WHEN + r")?$"),
+        Intent("temperature", ["temperature", "temp", "how hot", "how cold"], priority=70),
+        Intent("humidity", ["humidity", "how humid"], priority=70),
+        Intent("search", ["news", "update", "updates", "latest", "who", "who's", "what", "what's", "whats",
+                          "where", "where's", "how", "how's"], priority=10),
+    ], default=Intent("chat", []))
+
+YES_SYNONYMS = [
+    "yes", "yes that is correct", "that's correct", "correct",
+    "sure", "absolutely", "go ahead", "send it", "send email",
+    "yes please", "create event", "add event", "okay",
+    "add", "confirm", "yes do it", "create it", "call", "call now", "make call"
+]
+NO_SYNONYMS = [
+    "no", "nope", "cancel", "stop", "never mind", "nah", "not", "don't", "do not", "dont",
+    "wrong", "incorrect", "wait"
+]
+
+def build_yes_no():
+    return IntentRouter([Intent("yes", YES_SYNONYMS, leading=True)]), IntentRouter([Intent("no", NO_SYNONYMS)])
+
+def is_yes(yes_router, no_router, text):
+    """A reply confirms only if it starts with a yes phrase and says no nowhere ("no, don't send it")."""
+    return bool(text) and not no_router.matches(text) and yes_router.matches(text)
+
+#############################
+# Regression corpus and micro-benchmark
+#############################
+CORPUS = [
+    ("exit", "exit"),
+    ("goodbye", "exit"),
+    ("shut down", "exit"),
+    ("shut down mac", "shutdown"),
+    ("please turn off my mac", "shutdown"),
+    ("what's the temperature", "temperature"),
+    ("what's the temp in here", "temperature"),
+    ("how humid is it", "humidity"),
+    ("what is the humidity", "humidity"),
+    ("what's the latest news", "search"),
+    ("who won the game last night", "search"),
+    ("where is the nearest pharmacy", "search"),
+    ("how tall is mount everest", "search"),
+    ("tell me a joke", "chat"),
+    ("i ate the whole pizza", "chat"),          # "who" must not match "whole"
+    ("that was a good attempt", "chat"),        # "temp" must not match "attempt"
+    ("somehow i feel tired", "chat"),           # "how" must not match "somehow"
+    ("write a poem about the sea", "chat"),
+    ("send message to mom saying i'll be late", "message"),
+    ("text john what time is dinner", "message"),
+    ("message sarah that the meeting moved", "message"),
+    ("call mom", "call"),
+    ("facetime dad", "call"),
+    ("send an email to alex about the report", "email"),
+    ("email my boss", "email"),
+    ("remind me to buy milk tomorrow at 5 pm", "reminder"),
+    ("set a reminder to check the news tonight", "reminder"),
+    ("add event dentist appointment on friday at 3 pm", "calendar"),
+    ("schedule lunch with bob next tuesday at noon", "calendar"),
+    ("please call mom", "call"),
+    ("jarvis can you text alex saying running late", "message"),
+    # questions that only mention an action word stay questions
+    ("who sang ring of fire", "search"),
+    ("how do i call a function in python", "search"),
+    ("what is the phone number of the nearest pizza place", "search"),
+    ("what does this text mean", "search"),
+    ("whats on my schedule today", "search"),
+    ("how do i send an email in gmail", "search"),
+    ("remind me what you said earlier", "search"),
+    ("tell me about the email scandal", "chat"),
+]
+
+SLOT_CORPUS = [
+    ("send message to mom saying i'll be late", {"contact": "mom", "body": "i'll be late"}),
+    ("call 555 123 4567", {"contact": "555 123 4567"}),
+    ("send an email to alex about the report", {"contact": "alex", "subject": "the report"}),
+    ("remind me to buy milk tomorrow at 5 pm", {"task": "buy milk", "when": "tomorrow at 5 pm"}),
+    ("add event dentist appointment on friday at 3 pm", {"event": "dentist appointment", "when": "on friday at 3 pm"}),
+    ("set a reminder for tomorrow at 9 to call the bank", {"when": "tomorrow at 9", "task": "call the bank"}),
+    ("remind me in 20 minutes to stretch", {"when": "in 20 minutes", "task": "stretch"}),
+]
+
+# Commands with no "saying" between who and what: the contact is the longest known prefix
+KNOWN_CONTACTS = {"mom", "john", "alex smith", "alex"}
+RECIPIENT_CORPUS = [
+    ("text mom i love you", ("mom", "i love you")),
+    ("text john what time is dinner", ("john", "what time is dinner")),
+    ("call mom at home", ("mom", "at home")),
+    ("message alex smith see you at 6", ("alex smith", "see you at 6")),
+    ("text 555 123 4567 running late", ("555 123 4567", "running late")),
+    ("call mom", ("mom", "")),
+]
+
+YES_NO_CORPUS = [
+    ("yes", True),
+    ("yes please", True),
+    ("okay send it", True),
+    ("sure go ahead", True),
+    ("that's correct", True),
+    ("call now", True),
+    ("no", False),
+    ("no, don't send it", False),
+    ("no do not call", False),
+    ("no that is not correct", False),
+    ("that is not correct", False),
+    ("don't send it", False),
+    ("cancel", False),
+    ("i said call her tomorrow instead", False),
+    ("", False),
+]
+
+def legacy_classify(user_input):
+    """The substring if-chain the router replaced, kept for comparison."""
+    if user_input in ["exit", "quit", "goodbye", "shut down"]:
+        return "exit"
+    if any(phrase in user_input for phrase in ["shut down mac", "shutdown mac", "turn off mac"]):
+        return "shutdown"
+    if "temperature" in user_input or "temp" in user_input:
+        return "temperature"
+    if "humidity" in user_input:
+        return "humidity"
+    if any(keyword in user_input for keyword in ["news", "update", "latest", "who", "what", "where", "how"]):
+        return "search"
+    return "chat"
+
+def check(router):
+    failures = 0
+    for text, expected in CORPUS:
+        got = router.match(text).name
+        if got != expected:
+            failures += 1
+            print(f"❌ {text!r}: expected {expected}, got {got}")
+    for text, expected in SLOT_CORPUS:
+        got = router.match(text).slots
+        if got != expected:
+            failures += 1
+            print(f"❌ {text!r}: expected slots {expected}, got {got}")
+    for text, expected in RECIPIENT_CORPUS:
+        got = split_recipient(router.match(text).slots.get("contact", ""), KNOWN_CONTACTS.__contains__)
+        if got != expected:
+            failures += 1
+            print(f"❌ {text!r}: expected recipient split {expected}, got {got}")
+    yes_router, no_router = build_yes_no()
+    for text, expected in YES_NO_CORPUS:
+        if is_yes(yes_router, no_router, text) != expected:
+            failures += 1
+            print(f"❌ {text!r}: expected {'yes' if expected else 'not yes'}")
+    total = len(CORPUS) + len(SLOT_CORPUS) + len(RECIPIENT_CORPUS) + len(YES_NO_CORPUS)
+    print(f"{total - failures}/{total} corpus checks passed")
+    legacy_wrong = sum(legacy_classify(text) != expected for text, expected in CORPUS)
+    print(f"(the old if-chain gets {legacy_wrong} of {len(CORPUS)} intents wrong)")
+    return failures
+
+def benchmark(router, rounds=2000):
+    texts = [text for text, _ in CORPUS]
+    for name, classify in (("if-chain", legacy_classify), ("router", lambda t: router.match(t).name)):
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            for text in texts:
+                classify(text)
+        per = (time.perf_counter() - t0) / (rounds * len(texts)) * 1e6
+        print(f"{name:<9}: {per:6.2f} µs per utterance")
+
+    # A substring chain costs one scan per phrase; the automaton's cost doesn't grow with the phrase count
+    for extra in (100, 1000):
+        phrases = [f"custom command {i}" for i in range(extra)]
+        big = build_router()
+        big.add(Intent("custom", phrases, priority=50))
+        big.compile()
+        t0 = time.perf_counter()
+        for _ in range(rounds // 10):
+            for text in texts:
+                any(phrase in text for phrase in phrases)
+        chain = (time.perf_counter() - t0) / (rounds // 10 * len(texts)) * 1e6
+        t0 = time.perf_counter()
+        for _ in range(rounds // 10):
+            for text in texts:
+                big.match(text)
+        routed = (time.perf_counter() - t0) / (rounds // 10 * len(texts)) * 1e6
+        print(f"+{extra} phrases: if-chain {chain:7.2f} µs, router {routed:6.2f} µs per utterance")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the intent router against its corpus and time it.")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+    router = build_router()
+    failed = check(router)
+    benchmark(router, args.rounds)
+    raise SystemExit(1 if failed else 0)
@@ -1,19 +1,36 @@
+from startup import Lazy, Warmup, lazy_module, report as startup_report
 import os
-import openai
 import pvporcupine
 import pyaudio
-import struct
-import speech_recognition as sr
-import requests
-import pyttsx3
-import subprocess
 from dotenv import load_dotenv
-from serpapi import GoogleSearch
-import dateparser
 import re
-import json
 import time
+import asyncio
 import threading
+import queue
+import datetime
+from tts import SpeechWorker
+from phrase_cache import PCMPlayer, create_phrase_cache
+from hardware_bus import HardwareBusClient
+from timeseries import create_sensor_store, describe_history, parse_dht
+from applescript import ScriptTemplate, get_runner
+from outbox import ActionQueue, AppleScriptExecutor
+from contacts import ContactIndex, create_source
+from search_cache import cached_search, create_search_cache, query_category
+from gpt_cache import get_gpt_cache
+from memory import create_memory, get_tokenizer
+from clients import get_openai_client, serpapi_search
+from intents import build_router, build_yes_no, is_yes, split_recipient
+from dates import DateResolver
+from dispatch import SpeculativeDispatcher
+from tracing import get_tracer
+from pipeline import (EXIT, AssistantPipeline, PipelineBackends, TurnCancelled, cancellable, check_cancelled,
+                      split_sentences)
+from audio_capture import AudioCapture
+from listening import NoiseFloorTracker, preroll_start, ring_frames, voice_follows
+from barge_in import BargeInDetector, BargeInMonitor
+from vad import Endpointer, create_vad
+from stt_backends import create_stt_backend, transcribe
 
 # Load environment variables
 load_dotenv()
@@ -28,257 +45,569 @@ if not PORCUPINE_ACCESS_KEY:
 if not SERPAPI_KEY:
     raise ValueError("❌ Missing SerpAPI Key! Please set SERPAPI_KEY in your .env file.")
 
-# Initialize OpenAI client
-import openai
-client = openai.OpenAI(api_key=OPENAI_API_KEY)
+#############################
+# Porcupine: Wake Word
+#############################
+# The wake-word path is built first; everything else below is created lazily
+# or by the warmup thread, so Jarvis can hear "Jarvis" right after launch.
+# JARVIS_WAKE_WORD=/path/to/keyword.ppn (default: jarvis_mac.ppn next to this file,
+# falling back to Porcupine's built-in "jarvis" keyword).
+WAKE_WORD_PATH = os.getenv("JARVIS_WAKE_WORD",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), "jarvis_mac.ppn"))
+if os.path.exists(WAKE_WORD_PATH):
+    porcupine = pvporcupine.create(access_key=PORCUPINE_ACCESS_KEY, keyword_paths=[WAKE_WORD_PATH])
+else:
+    print(f"Wake word file {WAKE_WORD_PATH} not found; using the built-in 'jarvis' keyword.")
+    porcupine = pvporcupine.create(access_key=PORCUPINE_ACCESS_KEY, keywords=["jarvis"])
+pa = pyaudio.PyAudio()
+# Audio is captured on PortAudio's callback thread into a ring buffer, so no
+# frames are dropped while a conversation turn is running.
+capture = AudioCapture(pa, porcupine.sample_rate, porcupine.frame_length)
+wake_reader = capture.ring.reader()
+startup_report.mark("audio capture running")
+
+# Everything that isn't needed to hear the wake word is resolved here in the background
+# (JARVIS_FAST_START=0 waits for it before listening, like before)
+FAST_START = os.getenv("JARVIS_FAST_START", "1") != "0"
+warmup = Warmup()
+
+# Shared, pooled OpenAI client (OPENAI_BASE_URL can point it at fake_openai_server.py)
+client = Lazy("openai client", get_openai_client)
+
+# Stream GPT answers into speech sentence by sentence (set JARVIS_STREAM_GPT=0 to disable)
+STREAM_GPT = os.getenv("JARVIS_STREAM_GPT", "1") != "0"
+
+# Run the asyncio wake -> STT -> intent -> TTS pipeline (set JARVIS_PIPELINE=0 for the old blocking loop)
+USE_PIPELINE = os.getenv("JARVIS_PIPELINE", "1") != "0"
+
+# Lines Jarvis always says the same way are rendered to WAV once per voice and rate
+# and played from memory; other lines are too once they've been said twice
+# (JARVIS_PHRASE_CACHE=0 disables this, JARVIS_PHRASE_CACHE_DIR=tts_cache)
+SPELLING_INSTRUCTIONS = ("Please spell each letter or number in one phrase. "
+                         "For example, if you want to send to JohnDoe at yahoo dot com, "
+                         "you would say: 'j o h n d o e at yahoo'.")
+FIXED_PHRASES = (
+    "Hello, Creator.", "Goodbye, Creator.", "Let's try again.", "Shutdown cancelled.",
+    "Message cancelled.", "Call cancelled.", "Email cancelled.", "Sending your message.", "Sending your email.",
+    "I couldn't find that contact.", "Who should I message?", "What should the message say?",
+    "Who should I call?", "What's the subject?", "What should the email say?",
+    "What should I remind you about?", "When should I remind you?", "What's the event called?", "When is it?",
+    "Are you sure you want to shut down your Mac? Yes or no?",
+    "I'm sorry, I couldn't process that request.", "I'm sorry, I couldn't fetch live data.",
+    "I'm sorry, that took too long. Please ask again.",
+    "I'm sorry, temperature data is not available right now.",
+    "I'm sorry, humidity data is not available right now.",
+    "I did not recognize a domain like 'gmail' or 'yahoo'. Let's try again.",
+    SPELLING_INSTRUCTIONS,
+)
+phrases = Lazy("phrase cache", create_phrase_cache)
 
-engine = pyttsx3.init()
-engine.setProperty('rate', 160)
-engine.setProperty('volume', 1.0)
+# One long-lived speech worker owns the TTS engine for the whole session
+speech = warmup.add(Lazy("speech engine", lambda: SpeechWorker(cache=phrases, player=PCMPlayer(pa)).start()))
+warmup.add(lambda: phrases.preload(FIXED_PHRASES))
+
+# Per-stage timings for every turn go to jarvis_trace.jsonl (summarize with: python tracing.py)
+tracer = get_tracer()
 
 #############################
 # Global states
 #############################
 muted = False          # If True, Jarvis won't listen or speak
-last_button = None     # To avoid repeated triggers
+last_button = None     # Most recent button event from the hardware bus
 stop_flag = False      # If True, we forcibly stop speech mid-sentence
 
-def speak(text):
-    """Speak text in a British male AI voice."""
+def speak(text, on_start=None):
+    """
+    Queue text to be spoken in a British male AI voice. Returns immediately.
+    Raises TurnCancelled if the pipeline turn asking for it was interrupted.
+    """
     global muted
+    check_cancelled()
     if muted:
         print(f"(Muted) Would have spoken: {text}")
         return
-    engine = pyttsx3.init()
-    engine.setProperty('rate', 165)
-    engine.setProperty('volume', 1.2)
-    engine.setProperty('voice', "com.apple.voice.compact.en-GB.Daniel")
-    engine.say(text)
-    engine.runAndWait()
+
+    def started():
+        tracer.mark("first_audio")
+        if on_start:
+            on_start()
+    speech.say(text, on_start=started)
+
+def stop_speaking():
+    """Drop queued speech and silence the current utterance."""
+    if speech.is_ready():
+        speech.cancel()
 
 #############################
-# AppleScript to Query Contacts
+# AppleScript runner
+#############################
+# All AppleScript runs through one long-lived runner that caches compiled templates.
+# Parameters are passed as handler arguments, so they never need quoting here.
+applescript = Lazy("applescript runner", get_runner)
+
 #############################
+# Contacts
+#############################
+# The address book is indexed in memory once and refreshed in the background.
+# Set JARVIS_CONTACTS_VCF to use a .vcf file instead of Contacts.app.
+def load_contacts():
+    index = ContactIndex(create_source())
+    index.start_background_refresh()
+    return index
+
+contacts = Lazy("contacts", load_contacts)
+
 def lookup_contact_in_mac_contacts(name: str):
-    applescript = f'''
-    tell application "Contacts"
-        set matches to every person whose name contains "{name}"
-        if (count of matches) > 0 then
-            set phoneValue to value of phone 1 of item 1 of matches
-            return phoneValue
-        else
-            return "NOT FOUND"
-        end if
-    end tell
-    '''
-    result = subprocess.run(["osascript", "-e", applescript], capture_output=True, text=True)
-    phone_str = result.stdout.strip()
-    if phone_str == "NOT FOUND" or phone_str == "":
+    """First phone number of the best-matching contact, or None."""
+    contact = contacts.lookup(name)
+    if contact is None or not contact.phones:
         return None
-    return phone_str
+    return contact.phones[0]
 
 def speak_phone_number_digits(number_str: str):
     spaced = " ".join(number_str)
     speak(f"The phone number is {spaced}.")
 
+def describe_recipient(name, number):
+    """How a confirmation names who will actually get it: the resolved contact and the number used."""
+    spaced = " ".join(number)
+    return f"{name} at {spaced}" if name else spaced
+
 #############################
 # YES / NO synonyms
 #############################
-YES_SYNONYMS = [
-    "yes", "yes that is correct", "that's correct", "correct", 
-    "sure", "absolutely", "go ahead", "send it", "send email", 
-    "yes please", "create event", "add event", "okay", 
-    "add", "confirm", "yes do it", "create it", "call", "call now", "make call"
-]
-NO_SYNONYMS = [
-    "no", "nope", "cancel", "stop", "never mind", "nah"
-]
+# Matched on whole words, so "no" doesn't fire on "know" and "add" not on "address"
+yes_router, no_router = build_yes_no()
 
 def is_affirmative(user_text):
-    if not user_text:
-        return False
-    lt = user_text.lower()
-    for syn in YES_SYNONYMS:
-        if syn in lt:
-            return True
-    return False
+    return is_yes(yes_router, no_router, user_text)
 
 def is_negative(user_text):
-    if not user_text:
-        return False
-    lt = user_text.lower()
-    for syn in NO_SYNONYMS:
-        if syn in lt:
-            return True
-    return False
+    return no_router.matches(user_text)
 
 #############################
 # AppleScript Automations
 #############################
-def shutdown_mac():
-    applescript = '''tell application "System Events" to shut down'''
-    subprocess.run(["osascript", "-e", applescript])
+SHUTDOWN_MAC = ScriptTemplate("shutdown_mac", '''
+on perform()
+    tell application "System Events" to shut down
+end perform
+''')
 
-def send_imessage(contact_or_number, message_body):
-    applescript = f'''
+SEND_IMESSAGE = ScriptTemplate("send_imessage", '''
+on perform(contactOrNumber, messageBody)
     tell application "Messages"
         set targetService to 1st service whose service type = iMessage
-        set targetBuddy to buddy "{contact_or_number}" of targetService
-        send "{message_body}" to targetBuddy
+        set targetBuddy to buddy contactOrNumber of targetService
+        send messageBody to targetBuddy
     end tell
-    '''
-    subprocess.run(["osascript", "-e", applescript])
+end perform
+''', params=("contact_or_number", "message_body"))
 
-def facetime_call(contact_or_number):
-    applescript = f'''
+FACETIME_CALL = ScriptTemplate("facetime_call", '''
+on perform(contactOrNumber)
     tell application "FaceTime"
         activate
     end tell
     tell application "System Events"
-        keystroke "{contact_or_number}"
+        keystroke contactOrNumber
         delay 1
         keystroke return
     end tell
-    '''
-    subprocess.run(["osascript", "-e", applescript])
+end perform
+''', params=("contact_or_number",))
 
-def send_email_outlook(recipient_email, subject, body):
-    applescript = f'''
+SEND_EMAIL_OUTLOOK = ScriptTemplate("send_email_outlook", '''
+on perform(recipientEmail, subjectText, bodyText)
     tell application "Microsoft Outlook"
         set newMessage to make new outgoing message
         tell newMessage
-            make new recipient with properties {{email address:{{address:"{recipient_email}"}}}}
-            set subject to "{subject}"
-            set content to "{body}"
+            make new recipient with properties {email address:{address:recipientEmail}}
+            set subject to subjectText
+            set content to bodyText
             send
         end tell
     end tell
-    '''
-    subprocess.run(["osascript", "-e", applescript])
+end perform
+''', params=("recipient_email", "subject", "body"))
 
-def add_reminder(task_name, date_str):
-    applescript = f'''
+ADD_REMINDER = ScriptTemplate("add_reminder", '''
+on perform(taskName, dateText)
     tell application "Reminders"
-        set newReminder to make new reminder with properties {{name:"{task_name}", remind me date:date "{date_str}"}}
+        set newReminder to make new reminder with properties {name:taskName, remind me date:date dateText}
     end tell
-    '''
-    subprocess.run(["osascript", "-e", applescript])
+end perform
+''', params=("task_name", "date_str"))
 
-def add_calendar_event(event_name, start_date, end_date):
-    applescript = f'''
+ADD_CALENDAR_EVENT = ScriptTemplate("add_calendar_event", '''
+on perform(eventName, startText, endText)
     tell application "Calendar"
         tell calendar "Home"
-            make new event with properties {{summary:"{event_name}", start date: date "{start_date}", end date: date "{end_date}"}}
+            make new event with properties {summary:eventName, start date:date startText, end date:date endText}
         end tell
     end tell
-    '''
-    subprocess.run(["osascript", "-e", applescript])
+end perform
+''', params=("event_name", "start_date", "end_date"))
+
+def shutdown_mac():
+    applescript.run(SHUTDOWN_MAC)
+
+# Outbound actions are queued (JARVIS_OUTBOX, SQLite) and run by a worker pool,
+# so the conversation doesn't wait for them; failures are spoken when they happen.
+def report_failed_action(job, error):
+    speak(f"Sorry, I couldn't {job.label}.")
+
+outbox = Lazy("outbox", lambda: ActionQueue(
+    os.getenv("JARVIS_OUTBOX", "jarvis_outbox.db") or None,
+    AppleScriptExecutor(applescript, (SEND_IMESSAGE, FACETIME_CALL, SEND_EMAIL_OUTLOOK, ADD_REMINDER, ADD_CALENDAR_EVENT)),
+    on_failed=report_failed_action,
+).start())
+
+def enqueue_action(name, args, label):
+    """Queue an outbound action, unless the turn that asked for it was interrupted."""
+    check_cancelled()
+    return outbox.enqueue(name, args, label=label)
+
+def send_imessage(contact_or_number, message_body, label="send your message"):
+    return enqueue_action(SEND_IMESSAGE.name, (contact_or_number, message_body), label)
+
+def facetime_call(contact_or_number, label="start the call"):
+    return enqueue_action(FACETIME_CALL.name, (contact_or_number,), label)
+
+def send_email_outlook(recipient_email, subject, body, label="send your email"):
+    return enqueue_action(SEND_EMAIL_OUTLOOK.name, (recipient_email, subject, body), label)
+
+def add_reminder(task_name, date_str, label="set your reminder"):
+    return enqueue_action(ADD_REMINDER.name, (task_name, date_str), label)
+
+def add_calendar_event(event_name, start_date, end_date, label="add that event to your calendar"):
+    return enqueue_action(ADD_CALENDAR_EVENT.name, (event_name, start_date, end_date), label)
 
 #############################
 # dateparser
 #############################
+APPLESCRIPT_DATE = "%B %d, %Y at %I:%M %p"
+
+# "tomorrow at 5", "in 20 minutes", "next Monday 9am" are resolved by regex rules;
+# other phrases go to dateparser (loaded by the warmup thread) and are memoized
+date_resolver = DateResolver()
+
+def natural_datetime(user_text):
+    return date_resolver.resolve(user_text)
+
 def parse_natural_datetime(user_text):
-    import dateparser
-    dt = dateparser.parse(user_text, languages=["en"])
+    dt = natural_datetime(user_text)
     if not dt:
         return None
-    return dt.strftime("%B %d, %Y at %I:%M %p")
+    return dt.strftime(APPLESCRIPT_DATE)
 
 #############################
 # Hardware Data Integration
 #############################
+# Button/VOL/DHT events are pushed by hardware_listener.py over a Unix socket
+hardware = HardwareBusClient()
+
 def get_hardware_data():
-    """Reads and returns the hardware data from hardware_data.json."""
-    try:
-        with open("hardware_data.json", "r") as f:
-            data = json.load(f)
-        return data
-    except Exception as e:
-        print("Error reading hardware_data.json:", e)
-        return None
+    """Returns the latest hardware state pushed by hardware_listener.py (or None)."""
+    data = hardware.latest()
+    if data is None:
+        print("Hardware data is not available yet (is hardware_listener.py running?)")
+    return data
 
-def answer_temperature_query():
-    data = get_hardware_data()
-    if data and data.get("dht"):
-        try:
-            dht_str = data["dht"]  # e.g. "DHT:T:75F, H:40%"
-            parts = dht_str[4:].split(',')
-            temp_part = parts[0].strip()  # e.g., "T:75F"
-            temp_str = temp_part.replace("T:", "").replace("F", "").strip()
-            return f"The temperature in your room is {temp_str}°F."
-        except Exception as e:
-            print("Error parsing DHT data:", e)
-            return "I'm sorry, I couldn't retrieve the temperature."
-    return "I'm sorry, temperature data is not available right now."
-
-def answer_humidity_query():
+# Readings are kept as time series (raw, per-minute, per-hour) for questions about history
+sensors = Lazy("sensor history", create_sensor_store)
+
+def record_reading(event_type, value, state):
+    if event_type == "dht":
+        reading = (state["temperature"], state["humidity"]) if state.get("temperature") is not None else parse_dht(value)
+        if reading:
+            sensors.add_dht(*reading)
+    elif event_type == "volume":
+        sensors.add("volume", value)
+
+def current_reading(name):
     data = get_hardware_data()
-    if data and data.get("dht"):
-        try:
-            dht_str = data["dht"]
-            parts = dht_str[4:].split(',')
-            hum_part = parts[1].strip()  # e.g., "H:40%"
-            hum_str = hum_part.replace("H:", "").replace("%", "").strip()
-            return f"The humidity in your room is {hum_str}%."
-        except Exception as e:
-            print("Error parsing humidity data:", e)
-            return "I'm sorry, I couldn't retrieve the humidity."
-    return "I'm sorry, humidity data is not available right now."
+    if not data:
+        return None
+    if data.get(name) is not None:
+        return data[name]
+    reading = parse_dht(data.get("dht"))  # from a hardware_listener.py that doesn't parse readings yet
+    return reading and reading[0 if name == "temperature" else 1]
+
+def answer_temperature_query(user_input=""):
+    history = describe_history(sensors, "temperature", user_input)
+    if history:
+        return history
+    temperature = current_reading("temperature")
+    if temperature is None:
+        return "I'm sorry, temperature data is not available right now."
+    return f"The temperature in your room is {temperature:g}°F."
+
+def answer_humidity_query(user_input=""):
+    history = describe_history(sensors, "humidity", user_input)
+    if history:
+        return history
+    humidity = current_reading("humidity")
+    if humidity is None:
+        return "I'm sorry, humidity data is not available right now."
+    return f"The humidity in your room is {humidity:g}%."
 
 #############################
 # Speech Recognition
 #############################
-recognizer = sr.Recognizer()
-recognizer.pause_threshold = 1.5
-recognizer.dynamic_energy_threshold = True
+# speech_recognition is imported by the warmup thread, not at launch
+sr = lazy_module("speech_recognition")
+recognizer = warmup.add(Lazy("speech recognizer", lambda: sr.Recognizer()))
 
-def recognize_speech(phrase_time=30):
-    global muted
+# STT reads the same captured audio as the wake word, starting this far back
+PREROLL_SECONDS = float(os.getenv("JARVIS_PREROLL", "0.5"))
+noise_floor = NoiseFloorTracker()
+# End of speech is decided by a VAD with context-dependent trailing silence (JARVIS_VAD=energy|webrtc)
+vad = create_vad(noise_floor, os.getenv("JARVIS_VAD", "energy"))
+listen_from_frame = None   # set after a wake word so the first command starts right after "Jarvis"
+
+# JARVIS_STT=vosk recognizes offline and streams partial results; the default is Google
+stt_backend = warmup.add(Lazy("stt backend", lambda: create_stt_backend(recognizer=recognizer)))
+
+def recognize_speech(phrase_time=30, on_stable_partial=None, context="command"):
+    """
+    Listen for one phrase. `context` ("confirm", "command" or "dictation")
+    picks how much trailing silence ends it.
+    """
+    global muted, listen_from_frame
     if muted:
         print("(Muted) Not listening.")
         return None
-    with sr.Microphone() as source:
-        print("🎤 Listening for a command...")
-        recognizer.adjust_for_ambient_noise(source, duration=1)
-        audio = recognizer.listen(source, phrase_time_limit=phrase_time)
+    # Don't listen to ourselves: let queued speech finish first, and don't
+    # reach back into audio that was recorded while Jarvis was talking
+    # (unless the user talked over it, then listen from where they started)
+    was_speaking = speech.is_busy()
+    listen_pending.set()
+    with tracer.span("speech_drain"):
+        speech.wait()
+    listen_pending.clear()
+    check_cancelled()
+    if context == "command":
+        tracer.begin_turn()
+    start_frame = listen_from_frame
+    listen_from_frame = None
+    barged_in.clear()
+    if start_frame is None:
+        if was_speaking:
+            start_frame = capture.ring.frames_written
+        else:
+            start_frame = preroll_start(capture.ring, capture.sample_rate, PREROLL_SECONDS)
+    endpointer = Endpointer(vad, capture.sample_rate, capture.frame_length, context,
+                            phrase_time_limit=phrase_time)
+    frames = cancellable(ring_frames(capture.ring, start_frame, endpointer))
+    print("🎤 Listening for a command...")
     try:
-        command = recognizer.recognize_google(audio).lower()
-        print(f"🗣️ You said: {command}")
-        return command
+        with tracer.span("listen"):
+            if stt_backend.streaming:
+                command = transcribe(stt_backend, frames, capture.sample_rate, on_stable=on_stable_partial)
+            else:
+                audio = sr.AudioData(b"".join(frames), capture.sample_rate, 2)
+                if endpointer.reason == "timeout":
+                    command = None
+                else:
+                    command = recognizer.recognize_google(audio).lower()
+    except TurnCancelled:
+        if context == "command":
+            tracer.discard_turn()
+        raise
     except sr.UnknownValueError:
-        print("❌ Sorry, I couldn't understand that.")
-        return None
+        command = None
     except sr.RequestError as e:
         print(f"❌ Could not request results; {e}")
+        if context == "command":
+            tracer.discard_turn()
         return None
+    latency = endpointer.latency()
+    if latency is not None:
+        tracer.record("end_of_speech", latency)
+        tracer.record("stt", time.perf_counter() - endpointer.ended_at, endpointer.ended_at)
+        print(f"⏱️ End of speech detected {latency * 1000:.0f} ms after you stopped talking ({context})")
+    if not command:
+        print("❌ Sorry, I couldn't understand that.")
+        if context == "command":
+            tracer.discard_turn()   # nothing was heard; don't log an empty turn
+        return None
+    print(f"🗣️ You said: {command}")
+    return command
+
+GPT_MODEL = "gpt-4"
+SYSTEM_PROMPT = "You are Jarvis, a helpful AI assistant."
+
+# Repeated questions are answered from a local cache (memory + SQLite)
+gpt_cache = Lazy("gpt cache", get_gpt_cache)
+
+# Follow-up questions see recent turns verbatim and a summary of older ones, within a token budget
+SUMMARY_MODEL = "gpt-3.5-turbo"
+memory = Lazy("conversation memory", lambda: create_memory(
+    count_tokens=get_tokenizer(GPT_MODEL),
+    complete=lambda messages: client.chat.completions.create(
+        model=SUMMARY_MODEL, messages=messages, max_tokens=200).choices[0].message.content,
+))
+
+def gpt_messages(prompt):
+    messages = memory.messages(SYSTEM_PROMPT, prompt)
+    tracer.annotate(prompt_tokens=memory.last_prompt_tokens, history_turns=len(memory.turns))
+    return messages
+
+def remember(user_input, reply):
+    """Add the exchange to the conversation memory once the reply has been read (or cut off)."""
+    if isinstance(reply, str):
+        memory.add(user_input, reply)
+        return reply
+
+    def chunks():
+        pieces = []
+        try:
+            for chunk in reply:
+                pieces.append(chunk)
+                yield chunk
+        finally:
+            if hasattr(reply, "close"):
+                reply.close()
+            memory.add(user_input, "".join(pieces).strip())
+    return chunks()
 
-def chat_with_gpt(prompt):
+def chat_with_gpt(prompt, use_cache=True):
+    def create():
+        with tracer.span("openai"):
+            response = client.chat.completions.create(
+                model=GPT_MODEL,
+                messages=gpt_messages(prompt)
+            )
+        tokens = response.usage.total_tokens if response.usage else 0
+        return response.choices[0].message.content.strip(), tokens
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are Jarvis, a helpful AI assistant."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response.choices[0].message.content.strip()
+        return gpt_cache.complete(prompt, GPT_MODEL, memory.context_key(SYSTEM_PROMPT), create, use_cache=use_cache)
     except Exception as e:
         print(f"❌ Error communicating with OpenAI: {e}")
         return "I'm sorry, I couldn't process that request."
 
-def search_google(query):
+#############################
+# Streaming GPT -> speech
+#############################
+def stream_chat_with_gpt(prompt, use_cache=True):
+    """Yield pieces of the GPT-4 response as they arrive (or all at once from the cache)."""
+    context = memory.context_key(SYSTEM_PROMPT)
+    if use_cache:
+        cached = gpt_cache.lookup(prompt, GPT_MODEL, context)
+        if cached is not None:
+            yield cached
+            return
+    pieces = []
+    tokens = 0
+    started = time.perf_counter()
+    try:
+        stream = client.chat.completions.create(
+            model=GPT_MODEL,
+            messages=gpt_messages(prompt),
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        try:
+            for chunk in stream:
+                if chunk.usage:
+                    tokens = chunk.usage.total_tokens
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if not pieces:
+                        tracer.record("openai_first_token", time.perf_counter() - started, started)
+                    pieces.append(delta)
+                    yield delta
+        finally:
+            stream.close()  # also runs when the consumer abandons the stream mid-answer
+            tracer.record("openai", time.perf_counter() - started, started)
+    except Exception as e:
+        print(f"❌ Error communicating with OpenAI: {e}")
+        if not pieces:
+            yield "I'm sorry, I couldn't process that request."
+        return
+    if use_cache and pieces:
+        gpt_cache.store(prompt, GPT_MODEL, context, "".join(pieces).strip(),
+                        time.perf_counter() - started, tokens)
+
+def speak_streamed(chunks):
+    """
+    Speak each sentence as soon as it is complete. The stream is read on a
+    separate thread so later tokens keep arriving while earlier ones are spoken.
+    Returns the text that was spoken.
+    """
+    sentences = queue.Queue()
+
+    def read_stream():
+        try:
+            for sentence in split_sentences(chunks):
+                sentences.put(sentence)
+        finally:
+            sentences.put(None)
+
+    start = time.perf_counter()
+
+    def log_first_audio():
+        print(f"⏱️ Time to first audio: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    threading.Thread(target=read_stream, daemon=True).start()
+    spoken = []
+    while True:
+        sentence = sentences.get()
+        if sentence is None or stop_flag or barged_in.is_set():
+            break
+        print(f"🤖 JARVIS: {sentence}")
+        speak(sentence, on_start=None if spoken else log_first_audio)
+        spoken.append(sentence)
+    return " ".join(spoken)
+
+# Search answers are cached by normalized query, with shorter TTLs for news
+search_cache = Lazy("search cache", create_search_cache)
+NO_RESULTS = "❌ No real-time results found."
+SEARCH_ERROR = "I'm sorry, I couldn't fetch live data."
+
+def fetch_search_snippet(query):
+    # Goes through the pooled SerpAPI session (SERPAPI_BASE_URL can point it at fake_serpapi_server.py)
     params = {"q": query, "hl": "en", "gl": "us", "api_key": os.getenv("SERPAPI_KEY")}
+    with tracer.span("serpapi"):
+        results = serpapi_search(params)
+    if "organic_results" in results:
+        return results["organic_results"][0].get("snippet", "")
+    return NO_RESULTS
+
+def search_google(query):
+    hits_before = search_cache.hits
     try:
-        from serpapi import GoogleSearch
-        gs = GoogleSearch(params)
-        results = gs.get_dict()
-        if "organic_results" in results:
-            return results["organic_results"][0].get("snippet", "")
-        else:
-            return "❌ No real-time results found."
+        snippet = cached_search(search_cache, query, fetch_search_snippet,
+                                should_cache=lambda result: result and result != NO_RESULTS)
     except Exception as e:
         print(f"❌ Error fetching search results: {e}")
-        return "I'm sorry, I couldn't fetch live data."
+        return SEARCH_ERROR
+    if search_cache.hits > hits_before:
+        print(f"⚡ Search cache hit ({search_cache.stats()['hit_rate']:.0%} hit rate)")
+    return snippet
+
+#############################
+# Search and GPT raced against each other
+#############################
+# Open questions start a search and a GPT answer together (JARVIS_SPECULATE=0 to pick one up front)
+SPECULATE = os.getenv("JARVIS_SPECULATE", "1") != "0"
+
+def answer_stream(prompt):
+    if STREAM_GPT:
+        yield from stream_chat_with_gpt(prompt)
+    else:
+        yield chat_with_gpt(prompt)
+
+dispatcher = Lazy("dispatcher", lambda: SpeculativeDispatcher(
+    search_google,
+    answer_stream,
+    is_useful=lambda snippet: bool(snippet) and snippet not in (NO_RESULTS, SEARCH_ERROR),
+    deadline=float(os.getenv("JARVIS_TURN_DEADLINE", "6")),
+    tracer=tracer,
+))
 
 #############################
 # Single-utterance email parse
@@ -291,12 +620,8 @@ DOMAIN_MAP = {
     "hotmail": "@hotmail.com"
 }
 def parse_email_in_one_utterance():
-    speak(
-        "Please spell each letter or number in one phrase. "
-        "For example, if you want to send to JohnDoe at yahoo dot com, "
-        "you would say: 'j o h n d o e at yahoo'."
-    )
-    full_utterance = recognize_speech(30) or ""
+    speak(SPELLING_INSTRUCTIONS)
+    full_utterance = recognize_speech(30, context="dictation") or ""
     if not full_utterance:
         return None
     speak(f"I heard: {full_utterance}. Let me parse that now.")
@@ -343,167 +668,374 @@ def parse_email_in_one_utterance():
         final_email = spelled_local + domain_part
 
     speak(f"You spelled out {final_email}. Is that correct?")
-    confirm = recognize_speech(5) or ""
+    confirm = recognize_speech(5, context="confirm") or ""
     if is_affirmative(confirm):
         return final_email
     else:
         speak("Let's try again.")
         return None
 
+def read_wake_frame():
+    """Next captured frame as a zero-copy int16 view."""
+    return wake_reader.read()
+
+last_wake_frame = 0
+
+def detect_wake_in_frame(pcm):
+    global last_wake_frame
+    keyword_index = porcupine.process(pcm)
+    capture.record_processed(wake_reader)
+    noise_floor.update(pcm)
+    if keyword_index >= 0:
+        tracer.record("wake_detect", capture.detection_latency_last)
+        last_wake_frame = wake_reader.position
+        return True
+    return False
+
+def greet_after_wake():
+    """
+    Greet only if the user paused after "Jarvis". If they kept talking,
+    skip the greeting and listen from the end of the wake word instead.
+    """
+    global listen_from_frame
+    if voice_follows(capture.ring, last_wake_frame, noise_floor, capture.sample_rate):
+        listen_from_frame = last_wake_frame
+        return None
+    return "Hello, Creator."
+
 #############################
-# Porcupine: Wake Word
+# Barge-in
 #############################
-import pvporcupine
-porcupine = pvporcupine.create(
-    access_key=PORCUPINE_ACCESS_KEY,
-    keyword_paths=["/Users/dawitk/Documents/jarvis-ai-assistant/jarvis_mac.ppn"]
-)
-import pyaudio
-pa = pyaudio.PyAudio()
-audio_stream = pa.open(
-    rate=porcupine.sample_rate,
-    channels=1,
-    format=pyaudio.paInt16,
-    input=True,
-    frames_per_buffer=porcupine.frame_length
-)
+# While Jarvis speaks, a monitor keeps reading the microphone; talking over
+# it silences the speech and listens from where the user started.
+# JARVIS_BARGE_IN=0 turns this off; JARVIS_BARGE_IN_MARGIN is how much louder
+# than Jarvis's own voice (as the mic hears it) the user has to be.
+BARGE_IN = os.getenv("JARVIS_BARGE_IN", "1") != "0"
+BARGE_IN_PREROLL = 0.2
+listen_pending = threading.Event()   # recognize_speech() is waiting for speech to finish
+barged_in = threading.Event()        # stops speak_streamed() after a barge-in
+
+def on_barge_in(onset_frame, captured_at):
+    global listen_from_frame
+    detected = time.perf_counter()
+    listen_from_frame = max(0, onset_frame - int(BARGE_IN_PREROLL * capture.sample_rate / capture.frame_length))
+    barged_in.set()
+    if listen_pending.is_set() or pipeline is None or not pipeline.running:
+        # Someone is already waiting to listen (or the blocking loop will next)
+        stop_speaking()
+    else:
+        pipeline.barge_in()
+    speech.wait(1)
+    silenced = time.perf_counter()
+    tracer.record("barge_in", silenced - captured_at, captured_at)
+    print(f"✋ Interrupted: silent {(silenced - captured_at) * 1000:.0f} ms after your voice was confirmed "
+          f"({(silenced - detected) * 1000:.1f} ms to stop speaking)")
+
+barge_in = Lazy("barge-in monitor", lambda: BargeInMonitor(
+    capture.ring,
+    BargeInDetector(noise_floor, margin=float(os.getenv("JARVIS_BARGE_IN_MARGIN", "1.4"))),
+    is_speaking=lambda: not muted and speech.is_ready() and speech.is_speaking(),
+    on_barge_in=on_barge_in,
+).start())
 
 ###################################
 # Combined logic for messages/calls
 ###################################
 def parse_contact_or_number(user_command: str):
-    pattern = r"(send message to|message|text|call|facetime|to)\s*"
-    cleaned = re.sub(pattern, "", user_command, flags=re.IGNORECASE).strip()
-    result = lookup_contact_in_mac_contacts(cleaned)
-    if result:
-        phone = re.sub(r"\D", "", result)
-        return phone if phone else None
+    """(contact name, digits) for who was meant; the name is None for a spoken number."""
+    cleaned = re.sub(r"^to\s+", "", user_command.strip(), flags=re.IGNORECASE)
+    contact = contacts.lookup(cleaned) if cleaned else None
+    if contact is not None and contact.phones:
+        phone = re.sub(r"\D", "", contact.phones[0])
+        return (contact.name, phone) if phone else (None, None)
     phone_number = re.sub(r"\D", "", cleaned)
-    if phone_number:
-        return phone_number
-    else:
-        return None
+    return (None, phone_number) if phone_number else (None, None)
 
 def speak_phone_number_digits(number_str: str):
     spaced = " ".join(number_str)
     speak(f"The phone number is {spaced}.")
 
 ###################################
-# BACKGROUND THREAD: Watch hardware_data.json for button events
+# HARDWARE EVENTS: pushed from hardware_listener.py
 ###################################
-def watch_hardware_data():
+def on_hardware_event(event_type, value, state):
     global muted, stop_flag, last_button
-    while True:
-        data = get_hardware_data()
-        if data and data.get("button"):
-            button_val = data["button"]
-            if button_val != last_button:
-                last_button = button_val
-                if button_val == "BTN:STOP":
-                    print("🛑 Physical Stop Button pressed.")
-                    stop_flag = True
-                elif button_val == "BTN:MUTE":
-                    print("🔇 Physical Mute Button pressed.")
-                    muted = True
-                elif button_val == "BTN:DEBUG":
-                    print("⚙️ Physical Debug Button pressed.")
-                    # Add your debug mode toggles here if needed
-        time.sleep(0.5)
+    if event_type != "button":
+        record_reading(event_type, value, state)
+        return
+    last_button = value
+    if value == "BTN:STOP":
+        print("🛑 Physical Stop Button pressed.")
+        stop_speaking()
+        tracer.annotate(stopped=True)
+        if pipeline is not None and pipeline.running:
+            pipeline.interrupt()
+        else:
+            stop_flag = True
+    elif value == "BTN:MUTE":
+        print("🔇 Physical Mute Button pressed.")
+        muted = True
+    elif value == "BTN:DEBUG":
+        print("⚙️ Physical Debug Button pressed.")
+        print("🎙️ Audio capture:", capture.stats(wake_reader))
+        if barge_in.is_ready():
+            print("✋ Barge-in:", barge_in.stats())
+        print("⏱️ Latency:", tracer.summary())
+        if outbox.is_ready():
+            print("📤 Outbox:", outbox.stats())
+        if phrases.is_ready():
+            print("🔈 Phrase cache:", phrases.stats())
+        startup_report.print()
+        # Add your debug mode toggles here if needed
 
 ###################################
 # MAIN PROCESS
 ###################################
+def announce_listening():
+    startup_report.mark("listening for the wake word")
+    print(f"🔊 JARVIS is listening for the wake word... ({startup_report.milestones[-1][1]:.0f} ms after launch)")
+
 def detect_wake_word():
     global stop_flag
-    print("🔊 JARVIS is listening for the wake word...")
+    announce_listening()
     while True:
         # If user pressed STOP, forcibly stop any speech
         if stop_flag:
-            try:
-                engine.stop()
-            except:
-                pass
+            stop_speaking()
             print("Speech forcibly stopped by button.")
             stop_flag = False
             # Return to listening for next wake word
-        pcm = audio_stream.read(porcupine.frame_length, exception_on_overflow=False)
-        import struct
-        pcm_unpacked = struct.unpack_from("h" * porcupine.frame_length, pcm)
-        keyword_index = porcupine.process(pcm_unpacked)
-        if keyword_index >= 0:
+        pcm = read_wake_frame()
+        if detect_wake_in_frame(pcm):
             print("\n✅ Wake word detected! JARVIS is ready.")
             if not muted:
-                speak("Hello, Creator.")
+                greeting = greet_after_wake()
+                if greeting:
+                    speak(greeting)
                 process_conversation()
+                # Skip audio buffered during the conversation rather than scanning it for wake words
+                wake_reader.position = capture.ring.frames_written
             else:
                 print("(Muted) ignoring conversation...")
 
+# Every command is declared in intents.py and matched in one pass over the words
+router = build_router()
+
+# Warm up in the order things are needed after a wake word
+for component in (client, contacts, applescript, outbox, gpt_cache, memory, search_cache, dispatcher, sensors):
+    warmup.add(component)
+warmup.add(router.compile)
+warmup.add(date_resolver.warm)
+if BARGE_IN:
+    warmup.add(barge_in)
+
+def classify_intent(user_input):
+    """Which handler respond_to() will use for this text. Has no side effects."""
+    return router.match(user_input).name
+
+def search_prefetcher():
+    """
+    An on_stable_partial callback for one utterance. The first stable
+    partial that reads as a search is fetched early, and the cache coalesces
+    it with the request respond_to() makes once the final transcript
+    arrives. Later partials aren't fetched again, and live queries aren't
+    fetched at all since their answers are never cached.
+    """
+    started = threading.Event()
+
+    def prefetch(partial):
+        if started.is_set() or classify_intent(partial) != "search" or query_category(partial) == "live":
+            return
+        started.set()
+        threading.Thread(target=search_google, args=(partial,), daemon=True).start()
+    return prefetch
+
+def ask_yes_no(question):
+    speak(question)
+    answer = recognize_speech(5, context="confirm") or ""
+    check_cancelled()    # a "yes" heard as the turn was interrupted doesn't count
+    return is_affirmative(answer)
+
+def ask(question, context="command"):
+    speak(question)
+    return recognize_speech(30, context=context)
+
+def is_known_recipient(text):
+    return contacts.lookup(text) is not None
+
+def handle_message(slots):
+    contact, rest = split_recipient(slots.get("contact") or "", is_known_recipient)
+    contact = contact or ask("Who should I message?")
+    name, number = parse_contact_or_number(contact or "")
+    if not number:
+        return "I couldn't find that contact."
+    body = slots.get("body") or rest or ask("What should the message say?", "dictation")
+    if not body:
+        return "Message cancelled."
+    if not ask_yes_no(f"Send {body} to {describe_recipient(name, number)}? Yes or no?"):
+        return "Message cancelled."
+    send_imessage(number, body, label=f"send your message to {name or contact}")
+    return "Sending your message."
+
+def handle_call(slots):
+    contact, _ = split_recipient(slots.get("contact") or "", is_known_recipient)
+    contact = contact or ask("Who should I call?")
+    name, number = parse_contact_or_number(contact or "")
+    if not number:
+        return "I couldn't find that contact."
+    if not ask_yes_no(f"Call {describe_recipient(name, number)}? Yes or no?"):
+        return "Call cancelled."
+    facetime_call(number, label=f"call {name or contact}")
+    return f"Calling {name or contact}."
+
+def handle_email(slots):
+    found = contacts.lookup(slots["contact"]) if slots.get("contact") else None
+    recipient = found.emails[0] if found and found.emails else parse_email_in_one_utterance()
+    if not recipient:
+        return "Email cancelled."
+    subject = slots.get("subject") or ask("What's the subject?")
+    body = ask("What should the email say?", "dictation")
+    if not subject or not body:
+        return "Email cancelled."
+    to = f"{found.name} at {recipient}" if found and found.emails else recipient
+    if not ask_yes_no(f"Send the email about {subject} to {to}? Yes or no?"):
+        return "Email cancelled."
+    send_email_outlook(recipient, subject, body, label=f"send your email about {subject}")
+    return "Sending your email."
+
+def handle_reminder(slots):
+    task = slots.get("task") or ask("What should I remind you about?")
+    when = slots.get("when") or ask("When should I remind you?")
+    date_str = parse_natural_datetime(when) if when else None
+    if not task or not date_str:
+        return "I couldn't set that reminder."
+    add_reminder(task, date_str, label=f"set your reminder to {task}")
+    return f"Reminder set: {task}, {date_str}."
+
+def handle_calendar(slots):
+    event = slots.get("event") or ask("What's the event called?")
+    when = slots.get("when") or ask("When is it?")
+    start = natural_datetime(when) if when else None
+    if not event or not start:
+        return "I couldn't add that event."
+    end = start + datetime.timedelta(hours=1)
+    add_calendar_event(event, start.strftime(APPLESCRIPT_DATE), end.strftime(APPLESCRIPT_DATE),
+                       label=f"add {event} to your calendar")
+    return f"Added {event} to your calendar, {start.strftime(APPLESCRIPT_DATE)}."
+
+ACTION_HANDLERS = {
+    "message": handle_message,
+    "call": handle_call,
+    "email": handle_email,
+    "reminder": handle_reminder,
+    "calendar": handle_calendar,
+}
+
+def respond_to(user_input):
+    """
+    Handle one command. Returns EXIT to end the conversation, None if the
+    command was handled already, a reply string, or an iterator of streamed
+    reply chunks.
+    """
+    with tracer.span("route"):
+        match = router.match(user_input)
+    intent = match.name
+    tracer.annotate(intent=intent)
+
+    # QUIT triggers
+    if intent == "exit":
+        return EXIT
+
+    # SHUT DOWN MAC
+    if intent == "shutdown":
+        if ask_yes_no("Are you sure you want to shut down your Mac? Yes or no?"):
+            shutdown_mac()
+            return None
+        return "Shutdown cancelled."
+
+    # Messages, calls, email, reminders and calendar events
+    if intent in ACTION_HANDLERS:
+        return ACTION_HANDLERS[intent](match.slots)
+
+    # Environment Queries
+    if intent == "temperature":
+        return answer_temperature_query(user_input)
+    if intent == "humidity":
+        return answer_humidity_query(user_input)
+
+    # Real-time search or GPT
+    if SPECULATE:
+        reply, winner = dispatcher.answer(user_input, prefer_search=intent == "search")
+        if reply is None:
+            return "I'm sorry, that took too long. Please ask again."
+        return remember(user_input, reply)
+    if intent == "search":
+        return remember(user_input, search_google(user_input))
+    if STREAM_GPT:
+        return remember(user_input, stream_chat_with_gpt(user_input))
+    return remember(user_input, chat_with_gpt(user_input))
+
 def process_conversation():
     global stop_flag, muted
     while True:
         if stop_flag:
-            try:
-                engine.stop()
-            except:
-                pass
+            stop_speaking()
             print("Conversation forcibly stopped by button.")
             stop_flag = False
             return
-        user_input = recognize_speech(30) or ""
+        user_input = recognize_speech(30, search_prefetcher()) or ""
         if user_input:
             if stop_flag:
-                try:
-                    engine.stop()
-                except:
-                    pass
+                stop_speaking()
                 print("Conversation forcibly stopped by button.")
                 stop_flag = False
                 return
 
-            # QUIT triggers
-            if user_input in ["exit", "quit", "goodbye", "shut down"]:
+            response = respond_to(user_input)
+            if response is EXIT:
                 print("👋 JARVIS: Goodbye, Creator.")
                 speak("Goodbye, Creator.")
+                speech.wait()
                 cleanup()
                 break
-
-            # SHUT DOWN MAC
-            if any(phrase in user_input for phrase in ["shut down mac", "shutdown mac", "turn off mac"]):
-                speak("Are you sure you want to shut down your Mac? Yes or no?")
-                c = recognize_speech(5) or ""
-                if is_affirmative(c):
-                    shutdown_mac()
-                else:
-                    speak("Shutdown cancelled.")
-                continue
-
-            # Environment Queries
-            if "temperature" in user_input or "temp" in user_input:
-                response = answer_temperature_query()
-                print(f"🤖 JARVIS: {response}")
-                speak(response)
-                continue
-            if "humidity" in user_input:
-                response = answer_humidity_query()
+            if isinstance(response, str):
                 print(f"🤖 JARVIS: {response}")
                 speak(response)
-                continue
+            elif response is not None:
+                speak_streamed(response)
 
-            # Real-time search or GPT
-            if any(keyword in user_input for keyword in ["news", "update", "latest", "who","what", "where", "how"]):
-                response = search_google(user_input)
-            else:
-                response = chat_with_gpt(user_input)
+###################################
+# ASYNC PIPELINE
+###################################
+pipeline = None
 
-            print(f"🤖 JARVIS: {response}")
-            speak(response)
+def run_pipeline():
+    """Wake word, STT, intent/LLM and TTS as concurrent stages; STOP cancels the whole turn."""
+    global pipeline
+    pipeline = AssistantPipeline(PipelineBackends(
+        read_frame=read_wake_frame,
+        detect_wake=detect_wake_in_frame,
+        listen=lambda: recognize_speech(30, search_prefetcher()),
+        respond=respond_to,
+        speak=speak,
+        wait_speech=speech.wait,
+        stop_speech=stop_speaking,
+        is_muted=lambda: muted,
+        greet=greet_after_wake,
+    ))
+    announce_listening()
+    asyncio.run(pipeline.run())
+    cleanup()
 
 def cleanup():
-    global audio_stream, pa, porcupine
+    global capture, pa, porcupine
     try:
-        if audio_stream and audio_stream.is_active():
-            audio_stream.stop_stream()
-            audio_stream.close()
+        for component in (barge_in, outbox, speech, phrases, applescript, dispatcher, sensors):
+            if component.is_ready():
+                component.close()
+        tracer.close()
+        if capture:
+            capture.close()
         if pa:
             pa.terminate()
         if porcupine:
@@ -513,12 +1045,19 @@ def cleanup():
 
 if __name__ == "__main__":
     print("🔊 Starting JARVIS with macOS Contacts integration, hardware integration, and dateparser.")
-    # Start a background thread to watch hardware_data.json for button events
-    watch_thread = threading.Thread(target=watch_hardware_data, daemon=True)
-    watch_thread.start()
+    # Subscribe to button events pushed by hardware_listener.py
+    hardware.subscribe(on_hardware_event)
+    hardware.start()
+    # JARVIS_STARTUP_REPORT=1 prints what loaded when, once warmup is done
+    warmup.start(on_done=startup_report.print if os.getenv("JARVIS_STARTUP_REPORT") == "1" else None)
+    if not FAST_START:
+        warmup.done.wait()
 
     try:
-        detect_wake_word()
+        if USE_PIPELINE:
+            run_pipeline()
+        else:
+            detect_wake_word()
     except KeyboardInterrupt:
         print("\n🛑 JARVIS: Shutting down...")
         cleanup()
@@ -0,0 +1,187 @@
+import math
+import time
+import wave
+import argparse
+
+from audio_capture import AudioRing, RingReader
+
+#############################
+# Continuous noise-floor estimate
+#############################
+def frame_rms(frame):
+    """Root-mean-square energy of an int16 frame."""
+    if not len(frame):
+        return 0.0
+    return math.sqrt(sum(s * s for s in frame) / len(frame))
+
+class NoiseFloorTracker:
+    """
+    Tracks background energy from every captured frame, so listening can
+    start with a ready-made energy threshold instead of a 1 s calibration.
+    The floor drops quickly to quieter frames and rises slowly, so speech
+    barely moves it while a noisier room still pulls it up over a few seconds.
+    """
+
+    def __init__(self, ratio=1.5, minimum=150.0, initial=300.0, fall=0.1, rise=0.005):
+        self.ratio = ratio
+        self.minimum = minimum
+        self.floor = initial
+        self.fall = fall
+        self.rise = rise
+
+    def update(self, frame):
+        energy = frame_rms(frame)
+        rate = self.fall if energy < self.floor else self.rise
+        self.floor += (energy - self.floor) * rate
+        return energy
+
+    def threshold(self):
+        """Energy above which a frame counts as speech."""
+        return max(self.minimum, self.floor * self.ratio)
+
+#############################
+# Recognizer audio source backed by the capture ring
+#############################
+class _ReaderStream:
+    def __init__(self, reader, timeout):
+        self.reader = reader
+        self.timeout = timeout
+
+    def read(self, size):
+        frame = self.reader.read(self.timeout)
+        return b"" if frame is None else frame.tobytes()
+
+_ring_audio_source = None
+
+def ring_audio_source(ring, sample_rate, start_frame, read_timeout=1.0):
+    """
+    A speech_recognition source that reads from the same AudioRing that
+    feeds Porcupine, starting at `start_frame`, so audio that was captured
+    before listening began (the pre-roll) is heard too. speech_recognition
+    is only imported when the first one is made.
+    """
+    global _ring_audio_source
+    if _ring_audio_source is None:
+        import speech_recognition as sr
+
+        class RingAudioSource(sr.AudioSource):
+            def __init__(self, ring, sample_rate, start_frame, read_timeout):
+                self.SAMPLE_RATE = sample_rate
+                self.SAMPLE_WIDTH = 2
+                self.CHUNK = ring.frame_length
+                self.reader = RingReader(ring, start_frame)
+                self.read_timeout = read_timeout
+                self.stream = None
+
+            def __enter__(self):
+                self.stream = _ReaderStream(self.reader, self.read_timeout)
+                return self
+
+            def __exit__(self, exc_type, exc_value, traceback):
+                self.stream = None
+
+        _ring_audio_source = RingAudioSource
+    return _ring_audio_source(ring, sample_rate, start_frame, read_timeout)
+
+def ring_frames(ring, start_frame, endpointer, read_timeout=1.0):
+    """
+    PCM bytes from the ring, starting at `start_frame`, until `endpointer`
+    decides the user has finished (or never started) talking.
+    """
+    reader = RingReader(ring, start_frame)
+    while True:
+        frame = reader.read(read_timeout)
+        if frame is None:
+            return
+        yield frame.tobytes()
+        if endpointer.update(frame, reader.last_captured_at):
+            return
+
+def preroll_start(ring, sample_rate, preroll_seconds):
+    """Frame index `preroll_seconds` before the newest captured audio."""
+    frames = int(preroll_seconds * sample_rate / ring.frame_length)
+    return max(0, ring.frames_written - frames, ring.frames_written - ring.capacity + 1)
+
+def voice_follows(ring, start_frame, noise_floor, sample_rate, seconds=0.3):
+    """
+    True if the user keeps talking within `seconds` after `start_frame`
+    (e.g. "Jarvis, what's the weather" said in one breath).
+    """
+    frames = max(1, int(seconds * sample_rate / ring.frame_length))
+    threshold = noise_floor.threshold()
+    reader = RingReader(ring, start_frame)
+    for _ in range(frames):
+        frame = reader.read(timeout=seconds + 0.5)
+        if frame is None:
+            return False
+        if frame_rms(frame) > threshold:
+            return True
+    return False
+
+#############################
+# Harness: WAV fixture -> ring -> recognizer
+#############################
+def load_wav_into_ring(path, frame_length=512, realtime=False):
+    """Write a 16-bit mono WAV into a new AudioRing. Returns (ring, sample_rate)."""
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise ValueError("Expected a 16-bit mono WAV file")
+        sample_rate = wav.getframerate()
+        total_frames = wav.getnframes() // frame_length + 1
+        ring = AudioRing(frame_length, capacity_frames=total_frames + 1)
+        while True:
+            data = wav.readframes(frame_length)
+            if not data:
+                break
+            ring.write(data)
+            if realtime:
+                time.sleep(frame_length / sample_rate)
+    return ring, sample_rate
+
+def run_fixture(path, wake_at=0.0, preroll=0.5, recognize=False):
+    """
+    Pretend the wake word ended `wake_at` seconds into the WAV and listen
+    from there with `preroll` seconds of earlier audio included.
+    """
+    ring, sample_rate = load_wav_into_ring(path)
+    noise_floor = NoiseFloorTracker()
+    wake_frame = int(wake_at * sample_rate / ring.frame_length)
+    for index in range(wake_frame):
+        noise_floor.update(ring.frame(index))
+    start = max(0, wake_frame - int(preroll * sample_rate / ring.frame_length))
+
+    import speech_recognition as sr
+    recognizer = sr.Recognizer()
+    recognizer.dynamic_energy_threshold = False
+    recognizer.energy_threshold = noise_floor.threshold()
+    t0 = time.perf_counter()
+    with ring_audio_source(ring, sample_rate, start, read_timeout=0.05) as source:
+        audio = recognizer.listen(source, phrase_time_limit=30)
+    print(f"Noise floor {noise_floor.floor:.0f} -> threshold {recognizer.energy_threshold:.0f}")
+    print(f"Voice right after wake word: {voice_follows(ring, wake_frame, noise_floor, sample_rate)}")
+    print(f"Captured {len(audio.frame_data) / 2 / sample_rate:.2f} s of speech "
+          f"in {(time.perf_counter() - t0) * 1000:.0f} ms (no calibration delay)")
+
+    # The adaptive endpointer against speech_recognition's fixed pause_threshold
+    from vad import ENDPOINT_PROFILES, EnergyVAD, Endpointer  # vad imports this module
+    print(f"pause_threshold: phrase ends after {recognizer.pause_threshold:.2f} s of silence")
+    for context in ENDPOINT_PROFILES:
+        endpointer = Endpointer(EnergyVAD(noise_floor), sample_rate, ring.frame_length, context)
+        heard = b"".join(ring_frames(ring, start, endpointer, read_timeout=0.05))
+        print(f"{context:<10}: {endpointer.reason or 'eof'} after {endpointer.silence:.2f} s of silence, "
+              f"{len(heard) / 2 / sample_rate:.2f} s captured")
+    if recognize:
+        try:
+            print("Recognized:", recognizer.recognize_google(audio))
+        except (sr.UnknownValueError, sr.RequestError) as e:
+            print("Recognition failed:", e)
+    return audio
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Listen to a WAV fixture through the capture ring.")
+    parser.add_argument("wav", help="16-bit mono WAV file")
+    parser.add_argument("--wake-at", type=float, default=0.0, help="seconds into the file where the wake word ends")
+    parser.add_argument("--preroll", type=float, default=0.5)
+    parser.add_argument("--recognize", action="store_true", help="also send the phrase to Google STT")
+    args = parser.parse_args()
+    run_fixture(args.wav, args.wake_at, args.preroll, args.recognize)
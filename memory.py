@@ -0,0 +1,299 @@
+import os
+import re
+import time
+import json
+import hashlib
+import argparse
+import threading
+
+#############################
+# Token counting
+#############################
+_PIECES = re.compile(r"\s?\w+|\s?[^\w\s]+|\s+")
+
+def approximate_tokens(text):
+    """Close to the OpenAI tokenizers for English: a word is one token, long words about one per 4 characters."""
+    return sum(max(1, (len(piece) + 2) // 5) for piece in _PIECES.findall(text))
+
+def get_tokenizer(model="gpt-4"):
+    """count_tokens(text) using tiktoken when it is installed, else approximate_tokens."""
+    try:
+        import tiktoken
+    except ImportError:
+        return approximate_tokens
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+def message_tokens(messages, count_tokens=approximate_tokens, priming=3):
+    """Prompt tokens for a chat request: each message costs its content plus about 3 tokens of framing."""
+    return sum(3 + count_tokens(m["content"]) for m in messages) + priming
+
+#############################
+# Summaries of older turns
+#############################
+def first_sentence(text, max_words=20):
+    sentence = re.split(r"(?<=[.!?])\s", text.strip(), maxsplit=1)[0]
+    words = sentence.split()
+    return " ".join(words[:max_words]) + ("..." if len(words) > max_words else "")
+
+def extractive_summary(summary, turns):
+    """No model call: one line per folded turn, the question and the first sentence of the answer."""
+    lines = [summary] if summary else []
+    lines += [f"- User asked: {first_sentence(user)} You said: {first_sentence(assistant)}" for user, assistant in turns]
+    return "\n".join(lines)
+
+SUMMARY_INSTRUCTIONS = ("Update the running summary of this conversation with the new turns. "
+                        "Keep names, numbers, decisions and open questions; drop small talk. "
+                        "Answer with the summary only, at most {words} words.")
+
+def llm_summarizer(complete, words=120):
+    """Summarize with a model: complete(messages) -> text. Falls back to the extractive summary on errors."""
+    def summarize(summary, turns):
+        transcript = "\n".join(f"User: {user}\nAssistant: {assistant}" for user, assistant in turns)
+        try:
+            return complete([
+                {"role": "system", "content": SUMMARY_INSTRUCTIONS.format(words=words)},
+                {"role": "user", "content": f"Summary so far:\n{summary or '(none)'}\n\nNew turns:\n{transcript}"},
+            ]).strip()
+        except Exception as e:
+            print(f"⚠️ Could not summarize the conversation: {e}")
+            return extractive_summary(summary, turns)
+    return summarize
+
+#############################
+# Conversation memory
+#############################
+class ConversationMemory:
+    """
+    Keeps the last `recent_turns` exchanges verbatim and folds older ones
+    into a running summary, so a request never goes over `budget` prompt
+    tokens however long the conversation gets.
+
+    Messages are sent as [system prompt, summary, recent turns..., question].
+    The system prompt never changes and the summary only changes when turns
+    are folded (several at a time), so the start of the prompt stays the same
+    from one request to the next and the API can reuse its prompt cache.
+
+    The memory is forgotten after `max_idle` seconds without a turn.
+    """
+
+    def __init__(self, budget=1200, recent_turns=6, summary_budget=300, max_idle=600,
+                 count_tokens=approximate_tokens, summarize=extractive_summary, background=False):
+        self.budget = budget
+        self.recent_turns = recent_turns
+        self.summary_budget = summary_budget
+        self.max_idle = max_idle
+        self.count_tokens = count_tokens
+        self.summarize = summarize
+        self.background = background     # fold on a thread (for model summaries)
+        self.turns = []
+        self.summary = ""
+        self._costs = []                 # prompt tokens of each turn, counted once
+        self._summary_cost = 0
+        self.folds = 0
+        self.last_turn_at = None
+        self.last_prompt_tokens = 0
+        self._folding = False
+        self._lock = threading.Lock()
+
+    def messages(self, system_prompt, prompt):
+        """The chat messages for `prompt`: the newest turns that fit the budget, oldest dropped first."""
+        with self._lock:
+            self._expire()
+            head = [{"role": "system", "content": system_prompt}]
+            used = message_tokens(head + [{"role": "user", "content": prompt}], self.count_tokens)
+            if self.summary:
+                head.append({"role": "system", "content": f"Earlier in this conversation:\n{self.summary}"})
+                used += self._summary_cost
+            history = []
+            for (user, assistant), cost in zip(reversed(self.turns), reversed(self._costs)):
+                if used + cost > self.budget:
+                    break
+                history[:0] = [{"role": "user", "content": user}, {"role": "assistant", "content": assistant}]
+                used += cost
+            self.last_prompt_tokens = used
+            return head + history + [{"role": "user", "content": prompt}]
+
+    def context_key(self, system_prompt):
+        """
+        Stands in for the system prompt in response cache keys: the same
+        question only gets the same cached answer in the same context.
+        """
+        with self._lock:
+            if not self.turns and not self.summary:
+                return system_prompt
+            history = json.dumps([self.summary, self.turns])
+        return system_prompt + "#" + hashlib.sha256(history.encode("utf-8")).hexdigest()[:16]
+
+    def add(self, user, assistant):
+        if self.recent_turns <= 0 or not assistant:
+            return
+        with self._lock:
+            self._expire()
+            self.turns.append((user, assistant))
+            self._costs.append(6 + self.count_tokens(user) + self.count_tokens(assistant))
+            self.last_turn_at = time.monotonic()
+            folded = self._take_fold()
+        if folded:
+            if self.background:
+                threading.Thread(target=self._fold, args=(folded,), name="memory-fold", daemon=True).start()
+            else:
+                self._fold(folded)
+
+    def _expire(self):
+        if self.last_turn_at is not None and time.monotonic() - self.last_turn_at > self.max_idle:
+            self.clear(locked=True)
+
+    def _take_fold(self):
+        """Turns to fold into the summary, if there are too many or they no longer fit."""
+        if self._folding:
+            return None
+        over_budget = sum(self._costs) > max(self.budget - self.summary_budget, self.budget // 2)
+        if len(self.turns) <= self.recent_turns and not over_budget:
+            return None
+        # Fold down to half the window at once, so the summary changes every few turns rather than every turn
+        keep = min(self.recent_turns // 2, len(self.turns) - 1)
+        self._folding = True
+        return self.turns[:len(self.turns) - keep]
+
+    def _fold(self, folded):
+        summary = None
+        try:
+            summary = self.summarize(self.summary, folded)
+        finally:
+            with self._lock:
+                self._folding = False
+                if summary is not None and self.turns[:len(folded)] == folded:    # not cleared meanwhile
+                    del self.turns[:len(folded)], self._costs[:len(folded)]
+                    self.summary = self._trim(summary)
+                    self._summary_cost = 3 + self.count_tokens(f"Earlier in this conversation:\n{self.summary}")
+                    self.folds += 1
+
+    def _trim(self, summary):
+        """Drop the oldest summary lines (or words) until it fits summary_budget."""
+        lines = summary.splitlines()
+        while len(lines) > 1 and self.count_tokens("\n".join(lines)) > self.summary_budget:
+            lines.pop(0)
+        summary = "\n".join(lines)
+        words = summary.split(" ")
+        while len(words) > 1 and self.count_tokens(" ".join(words)) > self.summary_budget:
+            words = words[len(words) // 10 + 1:]
+        return " ".join(words)
+
+    def clear(self, locked=False):
+        if not locked:
+            with self._lock:
+                return self.clear(locked=True)
+        self.turns, self._costs, self.summary, self._summary_cost, self.last_turn_at = [], [], "", 0, None
+
+    def stats(self):
+        return {"turns": len(self.turns), "summary_tokens": self._summary_cost,
+                "folds": self.folds, "last_prompt_tokens": self.last_prompt_tokens}
+
+def create_memory(count_tokens=approximate_tokens, complete=None):
+    """
+    Configure with JARVIS_MEMORY_BUDGET (prompt tokens, default 1200),
+    JARVIS_MEMORY_TURNS (turns kept verbatim, default 6; 0 turns memory off),
+    JARVIS_MEMORY_IDLE (seconds before forgetting, default 600) and
+    JARVIS_MEMORY_SUMMARY ("local", or "gpt" to summarize with complete(messages)).
+    """
+    use_model = os.getenv("JARVIS_MEMORY_SUMMARY", "local") == "gpt" and complete is not None
+    return ConversationMemory(
+        budget=int(os.getenv("JARVIS_MEMORY_BUDGET", "1200")),
+        recent_turns=int(os.getenv("JARVIS_MEMORY_TURNS", "6")),
+        max_idle=float(os.getenv("JARVIS_MEMORY_IDLE", "600")),
+        count_tokens=count_tokens,
+        summarize=llm_summarizer(complete) if use_model else extractive_summary,
+        background=use_model,
+    )
+
+#############################
+# Benchmark: prompt size and latency over a long session
+#############################
+QUESTIONS = [
+    "What's a good way to start learning the piano as an adult?",
+    "How long should I practice each day?",
+    "Can you suggest a few easy songs to begin with?",
+    "What about finger exercises?",
+    "Remind me what you said about practice time.",
+    "Is it worth buying a digital piano instead of an acoustic one?",
+    "Which brands are reliable for beginners?",
+    "How much should I expect to spend?",
+]
+
+def fake_answer(question, turn):
+    sentences = [f"Here is my answer to turn {turn}.",
+                 f"You asked: {question.lower()}",
+                 "Most people find that short, regular sessions work better than long, occasional ones,",
+                 "and it helps to keep a small notebook of what you practiced and how it felt."]
+    return " ".join(sentences[:2 + turn % 3])
+
+class _Strategy:
+    def __init__(self, name, budget, count_tokens):
+        self.name = name
+        self.count_tokens = count_tokens
+        self.turns = []
+        self.memory = ConversationMemory(budget=budget, count_tokens=count_tokens) if name == "memory" else None
+
+    def messages(self, system_prompt, prompt):
+        if self.memory:
+            return self.memory.messages(system_prompt, prompt)
+        history = [] if self.name == "stateless" else [
+            m for user, assistant in self.turns
+            for m in ({"role": "user", "content": user}, {"role": "assistant", "content": assistant})]
+        return [{"role": "system", "content": system_prompt}] + history + [{"role": "user", "content": prompt}]
+
+    def add(self, user, assistant):
+        if self.memory:
+            self.memory.add(user, assistant)
+        else:
+            self.turns.append((user, assistant))
+
+def run_benchmark(turns=100, budget=1200, live=False, model="gpt-4"):
+    from tracing import percentile
+    count_tokens = get_tokenizer(model)
+    print(f"Tokenizer: {'tiktoken' if count_tokens is not approximate_tokens else 'approximate'}, "
+          f"budget {budget} tokens, {turns} turns{' (live requests)' if live else ''}")
+    client = None
+    if live:
+        from clients import get_openai_client
+        client = get_openai_client()
+    checkpoints = sorted({1, 10, 25, 50, turns} & set(range(1, turns + 1)))
+    print(f"{'strategy':<10}" + "".join(f"{'turn ' + str(n):>10}" for n in checkpoints)
+          + f"{'total':>10}{'build µs':>10}" + (f"{'p50 ms':>9}{'p95 ms':>9}" if live else ""))
+    for name in ("stateless", "full", "memory"):
+        strategy = _Strategy(name, budget, count_tokens)
+        sizes, latencies, build = [], [], 0.0
+        for turn in range(1, turns + 1):
+            question = QUESTIONS[(turn - 1) % len(QUESTIONS)]
+            t0 = time.perf_counter()
+            messages = strategy.messages("You are Jarvis, a helpful AI assistant.", question)
+            build += time.perf_counter() - t0
+            sizes.append(message_tokens(messages, count_tokens))
+            if client:
+                t0 = time.perf_counter()
+                answer = client.chat.completions.create(model=model, messages=messages,
+                                                        max_tokens=60).choices[0].message.content
+                latencies.append(time.perf_counter() - t0)
+            else:
+                answer = fake_answer(question, turn)
+            strategy.add(question, answer)
+        latencies.sort()
+        print(f"{name:<10}" + "".join(f"{sizes[n - 1]:>10}" for n in checkpoints)
+              + f"{sum(sizes):>10}{build / turns * 1e6:>10.1f}"
+              + (f"{percentile(latencies, 50) * 1000:>9.0f}{percentile(latencies, 95) * 1000:>9.0f}" if live else ""))
+        if strategy.memory:
+            print(f"           memory: {strategy.memory.stats()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prompt tokens per turn with no history, full history and ConversationMemory.")
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--budget", type=int, default=1200)
+    parser.add_argument("--live", action="store_true",
+                        help="also send every request to the OpenAI API (or OPENAI_BASE_URL) and time it")
+    parser.add_argument("--model", default="gpt-4")
+    args = parser.parse_args()
+    run_benchmark(args.turns, args.budget, args.live, args.model)
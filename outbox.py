@@ -0,0 +1,347 @@
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import argparse
+import tempfile
+import threading
+from collections import Counter, namedtuple
+
+from tracing import LatencyStats
+
+# Messages, emails, reminders, calendar events and calls are queued here
+# instead of being run inside the conversation. Jarvis acknowledges right
+# away; a worker pool runs the automations, retries failures with backoff
+# and reports the ones that finally fail.
+#
+# Jobs are stored in SQLite. A job that was running when Jarvis stopped is
+# not run again, because the automation may already have gone through;
+# it is reported as interrupted instead. Each job has an idempotency key.
+# By default it is the action and its arguments, and only a job that is
+# still queued or running absorbs a repeat: asking for the same call again
+# after the first one went through queues a new one. A key given by the
+# caller holds for as long as the job is kept.
+
+Job = namedtuple("Job", "id kind args key label attempts created_at")
+
+# Lower runs first. Calls are interactive, so they go ahead of everything else.
+PRIORITIES = {"facetime_call": 0, "send_imessage": 1}
+
+class ActionQueue:
+    """
+    execute(kind, jobs) -> one exception-or-None per job. It is given up to
+    `batch_size` queued jobs of the same kind at once (calls one at a time).
+
+    on_failed(job, error) is called when a job has used up its attempts or
+    was interrupted by a restart.
+    """
+
+    def __init__(self, path=None, execute=None, workers=2, max_attempts=4, base_delay=1.0, max_delay=60.0,
+                 batch_size=8, on_failed=None, unbatched=("facetime_call",)):
+        self.execute = execute
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.batch_size = batch_size
+        self.on_failed = on_failed
+        self.unbatched = set(unbatched)
+        self.wait_stats = LatencyStats()     # enqueue -> first attempt starts
+        self.run_stats = LatencyStats()      # one execute() call
+        self.done_stats = LatencyStats()     # enqueue -> done
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._running = False
+        self._threads = []
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        if path:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")   # survives a crash of Jarvis, not of the OS
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY, kind TEXT, args TEXT, key TEXT UNIQUE, label TEXT, priority INTEGER, "
+            "state TEXT, attempts INTEGER, next_at REAL, created_at REAL, finished_at REAL, error TEXT)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_due ON jobs (state, priority, next_at)")
+        self._db.execute("DELETE FROM jobs WHERE state IN ('done', 'failed') AND finished_at < ?",
+                         (time.time() - 7 * 86400,))
+        self._interrupted = self._rows("SELECT * FROM jobs WHERE state = 'running'")
+        self._db.execute("UPDATE jobs SET state = 'failed', finished_at = ?, error = 'interrupted' "
+                         "WHERE state = 'running'", (time.time(),))
+        self._db.commit()
+
+    #############################
+    # Producer side
+    #############################
+    def enqueue(self, kind, args, key=None, label=None):
+        """
+        Queue an action and return its Job right away: the existing one if
+        the same action is still queued or running, or if `key` was given
+        and seen before.
+        """
+        args = [str(a) for a in args]
+        now = time.time()
+        repeatable = key is None
+        if repeatable:
+            key = hashlib.sha256(json.dumps([kind, args]).encode("utf-8")).hexdigest()
+        with self._lock:
+            if repeatable:   # free the key of a finished job so the same action can run again
+                self._db.execute("UPDATE jobs SET key = key || '#' || id WHERE key = ? AND state IN ('done', 'failed')",
+                                 (key,))
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO jobs (kind, args, key, label, priority, state, attempts, next_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', 0, ?, ?)",
+                (kind, json.dumps(args), key, label or kind, PRIORITIES.get(kind, 2), now, now))
+            self._db.commit()
+            if cursor.rowcount:
+                self.counts["enqueued"] += 1
+                self._wakeup.notify()
+            elif self._db.execute("UPDATE jobs SET state = 'queued', attempts = 0, next_at = ?, error = NULL "
+                                  "WHERE key = ? AND state = 'failed' AND error != 'interrupted'", (now, key)).rowcount:
+                self._db.commit()         # asked again after it failed for good: try again
+                self.counts["requeued"] += 1
+                self._wakeup.notify()
+            else:
+                self.counts["deduplicated"] += 1
+            return self._rows("SELECT * FROM jobs WHERE key = ?", (key,))[0]
+
+    def state(self, job_id):
+        with self._lock:
+            row = self._db.execute("SELECT state, attempts, error FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row and {"state": row[0], "attempts": row[1], "error": row[2]}
+
+    #############################
+    # Workers
+    #############################
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        for job in self._interrupted:
+            self.counts["interrupted"] += 1
+            self._report(job, RuntimeError("interrupted by a restart; not retried in case it already went through"))
+        self._interrupted = []
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"outbox-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _work(self):
+        while True:
+            with self._lock:
+                batch = None
+                while self._running:
+                    batch = self._claim()
+                    if batch:
+                        break
+                    self._wakeup.wait(self._next_due())
+                if not self._running:
+                    return
+            started = time.perf_counter()
+            try:
+                errors = self.execute(batch[0].kind, batch)
+            except Exception as e:
+                errors = [e] * len(batch)
+            self.run_stats.record(batch[0].kind, time.perf_counter() - started)
+            self._complete(batch, errors)
+
+    def _claim(self):
+        """Mark the next due job (and compatible ones behind it) as running. Called with the lock held."""
+        now = time.time()
+        first = self._rows("SELECT * FROM jobs WHERE state = 'queued' AND next_at <= ? "
+                           "ORDER BY priority, id LIMIT 1", (now,))
+        if not first:
+            return None
+        kind = first[0].kind
+        limit = 1 if kind in self.unbatched else self.batch_size
+        batch = self._rows("SELECT * FROM jobs WHERE state = 'queued' AND next_at <= ? AND kind = ? "
+                           "ORDER BY id LIMIT ?", (now, kind, limit))
+        self._db.executemany("UPDATE jobs SET state = 'running', attempts = attempts + 1 WHERE id = ?",
+                             [(job.id,) for job in batch])
+        self._db.commit()
+        for job in batch:
+            if job.attempts == 0:
+                self.wait_stats.record(kind, now - job.created_at)
+        self.counts["batches"] += 1
+        return [job._replace(attempts=job.attempts + 1) for job in batch]
+
+    def _next_due(self):
+        row = self._db.execute("SELECT MIN(next_at) FROM jobs WHERE state = 'queued'").fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def _complete(self, batch, errors):
+        now = time.time()
+        failed = []
+        with self._lock:
+            for job, error in zip(batch, errors):
+                if error is None:
+                    self._db.execute("UPDATE jobs SET state = 'done', finished_at = ?, error = NULL WHERE id = ?",
+                                     (now, job.id))
+                    self.done_stats.record(job.kind, now - job.created_at)
+                    self.counts["done"] += 1
+                elif job.attempts < self.max_attempts:
+                    delay = min(self.max_delay, self.base_delay * 2 ** (job.attempts - 1)) * random.uniform(0.5, 1.0)
+                    self._db.execute("UPDATE jobs SET state = 'queued', next_at = ?, error = ? WHERE id = ?",
+                                     (now + delay, str(error), job.id))
+                    self.counts["retried"] += 1
+                    print(f"🔁 {job.label} failed ({error}); retrying in {delay:.1f} s")
+                else:
+                    self._db.execute("UPDATE jobs SET state = 'failed', finished_at = ?, error = ? WHERE id = ?",
+                                     (now, str(error), job.id))
+                    self.counts["failed"] += 1
+                    failed.append((job, error))
+            self._db.commit()
+            self._wakeup.notify_all()
+        for job, error in failed:
+            self._report(job, error)
+
+    def _report(self, job, error):
+        print(f"❌ {job.label} failed: {error}")
+        if self.on_failed:
+            try:
+                self.on_failed(job, error)
+            except Exception as e:
+                print(f"Error in on_failed: {e}")
+
+    def _rows(self, sql, params=()):
+        return [Job(row[0], row[1], json.loads(row[2]), row[3], row[4], row[7], row[9])
+                for row in self._db.execute(sql, params)]
+
+    #############################
+    # Metrics
+    #############################
+    def depth(self):
+        with self._lock:
+            return dict(self._db.execute("SELECT state, COUNT(*) FROM jobs WHERE state IN ('queued', 'running') "
+                                         "GROUP BY state").fetchall())
+
+    def stats(self):
+        def table(stats):
+            return {kind: {p: round(stats.percentile(kind, p) * 1000, 1) for p in (50, 95)} for kind in stats.samples}
+        return {"depth": self.depth(), "counts": dict(self.counts), "wait_ms": table(self.wait_stats),
+                "run_ms": table(self.run_stats), "done_ms": table(self.done_stats)}
+
+    def drain(self, timeout=None):
+        """Wait until nothing is queued or running. Returns False on timeout."""
+        deadline = None if timeout is None else time.time() + timeout
+        while self.depth():
+            if deadline is not None and time.time() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self):
+        with self._lock:
+            self._running = False
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+        with self._lock:
+            self._db.close()
+
+#############################
+# Executors
+#############################
+class AppleScriptExecutor:
+    """Runs each job's template on the AppleScript runner; a batch is submitted all at once."""
+
+    def __init__(self, runner, templates):
+        self.runner = runner
+        self.templates = {template.name: template for template in templates}
+
+    def __call__(self, kind, jobs):
+        futures = [self.runner.submit(self.templates[kind], *job.args) for job in jobs]
+        errors = []
+        for future in futures:
+            try:
+                future.result()
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+class FakeExecutor:
+    """
+    Records what it "sent". Each batch costs `batch_delay` (opening the app)
+    plus `delay` per job. Each attempt fails with probability `fail_rate`.
+    """
+
+    def __init__(self, delay=0.01, batch_delay=0.05, fail_rate=0.0, seed=1):
+        self.delay = delay
+        self.batch_delay = batch_delay
+        self.fail_rate = fail_rate
+        self.sent = []          # (kind, key)
+        self.batches = []       # batch sizes
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, kind, jobs):
+        time.sleep(self.batch_delay)
+        errors = []
+        for job in jobs:
+            time.sleep(self.delay)
+            with self._lock:
+                if self._rng.random() < self.fail_rate:
+                    errors.append(RuntimeError(f"{kind} is not responding"))
+                    continue
+                self.sent.append((kind, job.key))
+            errors.append(None)
+        with self._lock:
+            self.batches.append(len(jobs))
+        return errors
+
+#############################
+# Harness: fake executor, failures and a crash
+#############################
+def run_harness(jobs=60, fail_rate=0.2):
+    path = tempfile.mktemp(prefix="jarvis-outbox-", suffix=".db")
+    kinds = ["send_imessage", "add_reminder", "send_email_outlook", "add_calendar_event", "facetime_call"]
+    failed = []
+
+    # 1. A burst of actions, some failing, acknowledged immediately
+    executor = FakeExecutor(fail_rate=fail_rate)
+    queue = ActionQueue(path, executor, base_delay=0.05, on_failed=lambda job, e: failed.append(job.id)).start()
+    t0 = time.perf_counter()
+    first = [queue.enqueue(kinds[i % len(kinds)], [f"contact {i % 7}", f"body {i}"]) for i in range(jobs)]
+    ack_us = (time.perf_counter() - t0) / jobs * 1e6
+    for i in range(0, jobs, 10):      # the same requests again, e.g. a repeated confirmation
+        queue.enqueue(kinds[i % len(kinds)], [f"contact {i % 7}", f"body {i}"])
+    queue.drain(timeout=30)
+    print(f"Enqueue (acknowledge) took {ack_us:.0f} µs per action")
+    print(f"Sent {len(executor.sent)} of {jobs} jobs in {len(executor.batches)} batches "
+          f"(mean batch {sum(executor.batches) / len(executor.batches):.1f}); "
+          f"{len(failed)} gave up after {queue.max_attempts} attempts")
+    print(f"Stats: {queue.stats()}")
+    duplicates = [key for key, n in Counter(key for _, key in executor.sent).items() if n > 1]
+    again = queue.enqueue(kinds[0], ["contact 0", "body 0"])     # asked again once the first one was sent
+    queue.drain(timeout=30)
+    print(f"Asked again after it finished: queued anew {again.id != first[0].id}, "
+          f"ran {queue.state(again.id)['state'] == 'done'}")
+    queue.close()
+
+    # 2. A crash while a slow job is running, then a restart on the same file
+    executor = FakeExecutor(delay=3600, batch_delay=0)     # never finishes
+    queue = ActionQueue(path, executor, workers=1).start()
+    job = queue.enqueue("send_imessage", ["mom", "running when the crash happened"])
+    queued = queue.enqueue("add_reminder", ["buy milk", "tomorrow"])
+    time.sleep(0.3)
+    # Simulate the process dying: the job stays 'running' in the file and a new queue opens it
+    interrupted = []
+    executor = FakeExecutor()
+    restarted = ActionQueue(path, executor, on_failed=lambda job, e: interrupted.append(job.id)).start()
+    restarted.enqueue("send_imessage", ["mom", "running when the crash happened"], key=job.key)
+    restarted.drain(timeout=10)
+    print(f"After restart: interrupted job reported {interrupted == [job.id]}, re-enqueue deduplicated "
+          f"{restarted.counts['deduplicated'] == 1}, queued job ran {restarted.state(queued.id)['state'] == 'done'}, "
+          f"duplicates sent {len(duplicates)}")
+    restarted.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run actions through the queue with a fake executor.")
+    parser.add_argument("--jobs", type=int, default=60)
+    parser.add_argument("--fail-rate", type=float, default=0.2)
+    args = parser.parse_args()
+    run_harness(args.jobs, args.fail_rate)
@@ -0,0 +1,359 @@
+import os
+import time
+import wave
+import queue
+import shutil
+import hashlib
+import argparse
+import tempfile
+import threading
+import subprocess
+from collections import OrderedDict, namedtuple
+
+from tts import RATE, VOICE_ID, VOLUME
+
+# Lines Jarvis says over and over are rendered to WAV once per voice, rate
+# and volume and played from memory instead of being synthesized again.
+# Fixed phrases are rendered ahead of time and kept on disk. Other lines are
+# rendered in the background once they have been spoken `min_hits` times
+# and kept in an in-memory LRU of `max_dynamic` clips; they may be message
+# bodies or answers, so they are never written to the cache directory.
+
+Clip = namedtuple("Clip", "pcm sample_rate channels")
+
+#############################
+# Rendering text to WAV
+#############################
+def say_renderer(voice=VOICE_ID, rate=RATE, volume=VOLUME):
+    """macOS `say`, with the same voice, rate and volume as pyttsx3 (which caps volume at 1.0)."""
+    name = voice.rsplit(".", 1)[-1]
+    prefix = f"[[volm {min(volume, 1.0):g}]] "
+
+    def render(text, path):
+        subprocess.run(["say", "-v", name, "-r", str(rate), "--file-format=WAVE",
+                        "--data-format=LEI16@22050", "-o", path, prefix + text], check=True, capture_output=True)
+    return render
+
+def espeak_renderer(command, rate=RATE, volume=VOLUME):
+    amplitude = str(round(min(volume, 1.0) * 100))    # espeak's default amplitude is 100
+
+    def render(text, path):
+        subprocess.run([command, "-v", "en-gb", "-s", str(rate), "-a", amplitude, "-w", path, text],
+                       check=True, capture_output=True)
+    return render
+
+def create_renderer(voice=VOICE_ID, rate=RATE, volume=VOLUME):
+    """A render(text, wav_path) function for this platform, or None if there is no offline synthesizer."""
+    if shutil.which("say"):
+        return say_renderer(voice, rate, volume)
+    for command in ("espeak-ng", "espeak"):
+        if shutil.which(command):
+            return espeak_renderer(command, rate, volume)
+    return None
+
+def read_clip(path):
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit PCM")
+        return Clip(wav.readframes(wav.getnframes()), wav.getframerate(), wav.getnchannels())
+
+#############################
+# Cache
+#############################
+class PhraseCache:
+    """
+    get(text) -> Clip or None. Fixed clips live under
+    `directory/<voice>-<rate>-<volume>/`, so changing the voice settings
+    renders everything again; `render` must use the same settings.
+    Rendering happens on one background thread.
+    """
+
+    def __init__(self, directory, render, voice=VOICE_ID, rate=RATE, volume=VOLUME,
+                 max_dynamic=64, min_hits=2, max_chars=300, max_tracked=1024):
+        self.render = render
+        self.enabled = render is not None
+        self.directory = os.path.join(directory, f"{voice.rsplit('.', 1)[-1]}-{rate}-{volume}")
+        self.max_dynamic = max_dynamic
+        self.min_hits = min_hits
+        self.max_chars = max_chars
+        self.max_tracked = max_tracked
+        self.counts = {"hits": 0, "misses": 0, "rendered": 0, "evicted": 0}
+        self._fixed = {}
+        self._dynamic = OrderedDict()       # text -> Clip, least recently played first
+        self._seen = OrderedDict()          # text -> times spoken without a clip
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+        if self.enabled:
+            os.makedirs(os.path.join(self.directory, "fixed"), exist_ok=True)
+            # Earlier versions kept dynamic lines on disk too
+            shutil.rmtree(os.path.join(self.directory, "dynamic"), ignore_errors=True)
+
+    def path(self, text):
+        digest = hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.directory, "fixed", digest + ".wav")
+
+    def preload(self, phrases):
+        """Load fixed phrases into memory, rendering the ones not on disk yet in the background."""
+        if not self.enabled:
+            return
+        for text in phrases:
+            path = self.path(text)
+            if os.path.exists(path):
+                try:
+                    self._fixed[text] = read_clip(path)
+                    continue
+                except (OSError, ValueError, EOFError, wave.Error):
+                    pass
+            self._submit(text, "fixed")
+
+    def get(self, text):
+        if not self.enabled:
+            return None
+        with self._lock:
+            clip = self._fixed.get(text) or self._dynamic.get(text)
+            if clip is not None:
+                if text in self._dynamic:
+                    self._dynamic.move_to_end(text)
+                self.counts["hits"] += 1
+                return clip
+            self.counts["misses"] += 1
+            if len(text) > self.max_chars:
+                return None
+            seen = self._seen.pop(text, 0) + 1
+            self._seen[text] = seen
+            while len(self._seen) > self.max_tracked:
+                self._seen.popitem(last=False)
+        if seen >= self.min_hits:
+            self._submit(text, "dynamic")
+        return None
+
+    def _submit(self, text, kind):
+        with self._lock:
+            if text in self._pending:
+                return
+            self._pending.add(text)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._render_loop, name="phrase-render", daemon=True)
+            self._thread.start()
+        self._queue.put((text, kind))
+
+    def _render_loop(self):
+        while True:
+            text, kind = self._queue.get()
+            if text is None:
+                break
+            if kind == "fixed":
+                path = self.path(text)
+                partial = path + ".part"
+            else:
+                fd, partial = tempfile.mkstemp(prefix="jarvis-phrase-", suffix=".wav")
+                os.close(fd)
+                path = None
+            try:
+                self.render(text, partial)
+                if path is not None:
+                    os.replace(partial, path)
+                clip = read_clip(path or partial)
+            except (OSError, ValueError, EOFError, wave.Error, subprocess.CalledProcessError) as e:
+                print(f"⚠️ Could not pre-render {text!r}: {e}")
+                clip = None
+            finally:
+                if path is None:
+                    try:
+                        os.remove(partial)
+                    except OSError:
+                        pass
+            with self._lock:
+                self._pending.discard(text)
+                if clip is None:
+                    continue
+                self.counts["rendered"] += 1
+                if kind == "fixed":
+                    self._fixed[text] = clip
+            if kind == "dynamic":
+                self._add_dynamic(text, clip)
+
+    def _add_dynamic(self, text, clip):
+        with self._lock:
+            self._dynamic[text] = clip
+            self._seen.pop(text, None)
+            while len(self._dynamic) > self.max_dynamic:
+                self._dynamic.popitem(last=False)
+                self.counts["evicted"] += 1
+
+    def wait_rendered(self, timeout=None):
+        """Block until nothing is waiting to be rendered."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self._pending:
+            if deadline is not None and time.perf_counter() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts, fixed=len(self._fixed), dynamic=len(self._dynamic), pending=len(self._pending))
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put((None, None))
+            self._thread.join(timeout=1)
+            self._thread = None
+
+def create_phrase_cache():
+    """JARVIS_PHRASE_CACHE=0 disables it; JARVIS_PHRASE_CACHE_DIR is where clips are kept (default tts_cache)."""
+    render = create_renderer() if os.getenv("JARVIS_PHRASE_CACHE", "1") != "0" else None
+    if render is None:
+        print("⚠️ No offline synthesizer for the phrase cache; every line is synthesized live.")
+    return PhraseCache(os.getenv("JARVIS_PHRASE_CACHE_DIR", "tts_cache"), render,
+                       max_dynamic=int(os.getenv("JARVIS_PHRASE_CACHE_SIZE", "64")))
+
+#############################
+# Playback
+#############################
+class PCMPlayer:
+    """
+    Plays clips through a PyAudio output stream that stays open between
+    clips, in `chunk_seconds` pieces so should_stop() is checked often.
+    """
+
+    def __init__(self, pa, chunk_seconds=0.02):
+        self.pa = pa
+        self.chunk_seconds = chunk_seconds
+        self._streams = {}
+
+    def _stream(self, sample_rate, channels):
+        key = (sample_rate, channels)
+        stream = self._streams.get(key)
+        if stream is None:
+            import pyaudio
+            stream = self.pa.open(format=pyaudio.paInt16, channels=channels, rate=sample_rate, output=True)
+            self._streams[key] = stream
+        return stream
+
+    def play(self, clip, should_stop=lambda: False, on_start=None):
+        """Returns False if should_stop() cut playback short."""
+        stream = self._stream(clip.sample_rate, clip.channels)
+        step = int(clip.sample_rate * self.chunk_seconds) * 2 * clip.channels
+        for start in range(0, len(clip.pcm), step):
+            if should_stop():
+                return False
+            stream.write(clip.pcm[start:start + step])
+            if start == 0 and on_start is not None:
+                on_start()
+        return True
+
+    def close(self):
+        for stream in self._streams.values():
+            try:
+                stream.stop_stream()
+                stream.close()
+            except Exception:
+                pass
+        self._streams.clear()
+
+#############################
+# Benchmark: time to first audio, cached vs fresh
+#############################
+PHRASES = ["Hello, Creator.", "Goodbye, Creator.", "Let's try again.", "Shutdown cancelled.",
+           "I'm sorry, I couldn't process that request.", "Sending your message."]
+
+class _FakePlayer:
+    """Sleeps through the clip in real time, like a sound card would."""
+
+    def __init__(self, chunk_seconds=0.02):
+        self.chunk_seconds = chunk_seconds
+
+    def play(self, clip, should_stop=lambda: False, on_start=None):
+        step = int(clip.sample_rate * self.chunk_seconds) * 2 * clip.channels
+        for start in range(0, len(clip.pcm), step):
+            if should_stop():
+                return False
+            if start == 0 and on_start is not None:
+                on_start()
+            time.sleep(self.chunk_seconds)
+        return True
+
+    def close(self):
+        pass
+
+def _fake_render(text, path):
+    from fake_devices import synth_speech
+    time.sleep(0.05 + 0.01 * len(text.split()))     # synthesis isn't free
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(synth_speech(0.3 * len(text.split()), seed=len(text)).tobytes())
+
+def _time_to_first_audio(worker, text):
+    started = threading.Event()
+    t0 = time.perf_counter()
+    t_start = [None]
+
+    def mark():
+        t_start[0] = time.perf_counter()
+        started.set()
+
+    worker.say(text, on_start=mark)
+    started.wait(10)
+    worker.cancel()
+    worker.wait()
+    return (t_start[0] or time.perf_counter()) - t0
+
+def benchmark(runs=5, fake=False):
+    from tts import SpeechWorker, create_engine
+    from tracing import percentile
+    directory = tempfile.mkdtemp(prefix="phrase_cache_")
+    if fake:
+        from fake_devices import FakeTTSEngine
+        engine_factory = lambda: FakeTTSEngine(startup=0.15)
+        render, player = _fake_render, _FakePlayer()
+    else:
+        import pyaudio
+        engine_factory, render, player = create_engine, create_renderer(), PCMPlayer(pyaudio.PyAudio())
+        if render is None:
+            print("No offline synthesizer (say / espeak) found; use --fake to try the harness.")
+            return
+    cache = PhraseCache(directory, render)
+    t0 = time.perf_counter()
+    cache.preload(PHRASES)
+    cache.wait_rendered()
+    print(f"Rendered {len(PHRASES)} phrases in {(time.perf_counter() - t0) * 1000:.0f} ms (once per voice and rate)")
+
+    fresh = SpeechWorker(engine_factory).start()
+    cached = SpeechWorker(engine_factory, cache=cache, player=player).start()
+    rows = {"fresh": [], "cached": []}
+    print(f"\n{'phrase':<46}{'fresh ms':>10}{'cached ms':>11}")
+    for text in PHRASES:
+        times = [(_time_to_first_audio(fresh, text), _time_to_first_audio(cached, text)) for _ in range(runs)]
+        f = sorted(t[0] for t in times)[runs // 2]
+        c = sorted(t[1] for t in times)[runs // 2]
+        rows["fresh"] += [t[0] for t in times]
+        rows["cached"] += [t[1] for t in times]
+        print(f"{text:<46}{f * 1000:>10.1f}{c * 1000:>11.1f}")
+
+    # A dynamic answer gets cached after it has been said min_hits times
+    answer = "The temperature is 22 degrees Celsius."
+    first = [_time_to_first_audio(cached, answer) for _ in range(cache.min_hits)]
+    cache.wait_rendered()
+    repeat = _time_to_first_audio(cached, answer)
+    print(f"\nDynamic answer: {first[0] * 1000:.1f} ms the first time, {repeat * 1000:.1f} ms once cached")
+    for name, values in rows.items():
+        values.sort()
+        print(f"Time to first audio, {name:<6}: p50 {percentile(values, 50) * 1000:.1f} ms, "
+              f"p95 {percentile(values, 95) * 1000:.1f} ms")
+    print(f"Cache: {cache.stats()}")
+    fresh.close()
+    cached.close()
+    cache.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time to first audio for pre-rendered phrases vs fresh synthesis.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--fake", action="store_true", help="fake engine, renderer and sound card (no audio needed)")
+    args = parser.parse_args()
+    benchmark(args.runs, args.fake)
@@ -0,0 +1,439 @@
+import re
+import time
+import random
+import asyncio
+import argparse
+import threading
+import contextvars
+
+# respond() returns this to end the conversation (after the farewell is spoken).
+EXIT = object()
+
+#############################
+# Sentence splitting for streamed replies
+#############################
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+def split_sentences(chunks):
+    """Regroup streamed text pieces into whole sentences."""
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        parts = SENTENCE_BOUNDARY.split(buffer)
+        for sentence in parts[:-1]:
+            if sentence.strip():
+                yield sentence.strip()
+        buffer = parts[-1]
+    if buffer.strip():
+        yield buffer.strip()
+
+#############################
+# Pipeline
+#############################
+class TurnCancelled(Exception):
+    """The work in flight belonged to a turn that was interrupted."""
+
+# The cancel token of the turn a worker thread is working for (None outside the pipeline)
+_turn_token = contextvars.ContextVar("turn_token", default=None)
+
+def turn_cancelled():
+    """True if the turn the calling thread is working for has been interrupted."""
+    token = _turn_token.get()
+    return token is not None and token.is_set()
+
+def check_cancelled():
+    """Raise TurnCancelled if the calling thread's turn has been interrupted."""
+    if turn_cancelled():
+        raise TurnCancelled()
+
+def cancellable(items):
+    """Yield from `items` until the calling thread's turn is interrupted."""
+    for item in items:
+        check_cancelled()
+        yield item
+
+class PipelineBackends:
+    """
+    Everything the pipeline needs from the outside world. All of these are
+    plain blocking functions; the pipeline runs them on worker threads.
+
+    read_frame()            -> one frame of PCM audio
+    detect_wake(frame)      -> True if the wake word ends in this frame
+    listen()                -> recognized text, or None
+    respond(text)           -> None, a reply string, an iterator of reply chunks, or EXIT
+    speak(text, on_start)   -> queue text for speech (must not block)
+    wait_speech()           -> block until queued speech has finished
+    stop_speech()           -> silence speech immediately
+    greet()                 -> greeting to speak after the wake word, or None to skip it
+
+    If one of these raises, the error is logged, `error_message` is spoken
+    and the pipeline carries on with the next turn.
+    """
+
+    def __init__(self, read_frame, detect_wake, listen, respond, speak, wait_speech, stop_speech,
+                 is_muted=lambda: False, greeting="Hello, Creator.", farewell="Goodbye, Creator.", greet=None,
+                 error_message="Sorry, something went wrong. Please try again."):
+        self.read_frame = read_frame
+        self.detect_wake = detect_wake
+        self.listen = listen
+        self.respond = respond
+        self.speak = speak
+        self.wait_speech = wait_speech
+        self.stop_speech = stop_speech
+        self.is_muted = is_muted
+        self.greeting = greeting
+        self.farewell = farewell
+        self.greet = greet or (lambda: self.greeting)
+        self.error_message = error_message
+
+class AssistantPipeline:
+    """
+    wake word -> STT -> intent/LLM -> TTS, one asyncio task per stage,
+    connected by bounded queues:
+
+        capture thread --wake--> listen --utterances--> respond --sentences--> speak
+
+    Audio frames are read on their own thread for the whole session, so the
+    wake word is heard even mid-turn. interrupt() (STOP button) or a new wake
+    word cancels everything belonging to the current turn: queued items are
+    dropped, in-flight STT/LLM/search work is abandoned and speech is silenced.
+    barge_in() does the same and then listens straight away.
+
+    Each turn has a cancel token (a threading.Event). Backends run by the
+    pipeline can't be killed from outside, so they call check_cancelled()
+    (or turn_cancelled()) at the points where they would speak, listen or
+    act, and unwind with TurnCancelled once their turn is over.
+    """
+
+    def __init__(self, backends, queue_size=4):
+        self.backends = backends
+        self.queue_size = queue_size
+        self.loop = None
+        self.turn = 0
+        self._token = threading.Event()   # set when self.turn is cancelled
+        self.running = False
+        self._active = set()        # in-flight worker-thread tasks for the current turn
+        self._done = None
+        self.errors = 0
+
+    async def run(self):
+        """Run until respond() returns EXIT or stop() is called. Re-raises if a stage itself crashed."""
+        self.loop = asyncio.get_running_loop()
+        self._wake_queue = asyncio.Queue(maxsize=1)
+        self._listen_queue = asyncio.Queue(maxsize=1)
+        self._utterance_queue = asyncio.Queue(maxsize=self.queue_size)
+        self._speak_queue = asyncio.Queue(maxsize=self.queue_size)
+        self._done = asyncio.Event()
+        self.running = True
+        threading.Thread(target=self._capture_loop, name="wake-capture", daemon=True).start()
+        stages = [asyncio.create_task(stage()) for stage in
+                  (self._wake_stage, self._listen_stage, self._respond_stage, self._speak_stage)]
+        done = asyncio.create_task(self._done.wait())
+        try:
+            await asyncio.wait([done, *stages], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.running = False
+            self._cancel_turn()
+            done.cancel()
+            for stage in stages:
+                stage.cancel()
+            results = await asyncio.gather(*stages, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+    def interrupt(self):
+        """Cancel the current turn. Safe to call from any thread."""
+        if self.loop is not None and self.running:
+            self.loop.call_soon_threadsafe(self._cancel_turn)
+
+    def barge_in(self):
+        """The user talked over the reply: drop the rest of the turn and listen. Safe to call from any thread."""
+        if self.loop is not None and self.running:
+            self.loop.call_soon_threadsafe(self._on_barge_in)
+
+    def stop(self):
+        """End run(). Safe to call from any thread."""
+        if self.loop is not None and self.running:
+            self.loop.call_soon_threadsafe(self._done.set)
+
+    #############################
+    # Stages
+    #############################
+    def _capture_loop(self):
+        while self.running:
+            frame = self.backends.read_frame()
+            if frame is None:
+                break
+            if self.backends.detect_wake(frame):
+                self.loop.call_soon_threadsafe(self._on_wake, time.perf_counter())
+
+    def _on_wake(self, detected_at):
+        if self.backends.is_muted():
+            print("(Muted) ignoring conversation...")
+            return
+        if self._wake_queue.empty():
+            self._wake_queue.put_nowait(detected_at)
+
+    def _on_barge_in(self):
+        self._cancel_turn()
+        self._listen_queue.put_nowait(self.turn)
+
+    async def _wake_stage(self):
+        while True:
+            await self._wake_queue.get()
+            print("\n✅ Wake word detected! JARVIS is ready.")
+            self._cancel_turn()  # a new wake word replaces whatever was in flight
+            turn = self.turn
+            try:
+                greeting = await self._work(self.backends.greet)
+            except TurnCancelled:
+                continue
+            except Exception as e:
+                self._failed("greet", e)
+                greeting = None
+            if greeting:
+                await self._speak_queue.put((turn, greeting, None))
+            await self._listen_queue.put(turn)
+
+    async def _listen_stage(self):
+        while True:
+            turn = await self._listen_queue.get()
+            if turn != self.turn:
+                continue
+            try:
+                await self._speak_queue.join()
+                if turn != self.turn:
+                    continue
+                await self._work(self.backends.wait_speech)  # don't listen to ourselves
+                text = await self._work(self.backends.listen)
+            except TurnCancelled:
+                continue
+            except Exception as e:
+                self._failed("listen", e, turn)    # no retry here: a broken mic would loop forever
+                continue
+            if turn != self.turn or self.backends.is_muted():
+                continue
+            if not text:
+                await self._listen_queue.put(turn)
+                continue
+            await self._utterance_queue.put((turn, text, time.perf_counter()))
+
+    async def _respond_stage(self):
+        while True:
+            turn, text, heard_at = await self._utterance_queue.get()
+            if turn != self.turn:
+                continue
+
+            def log_first_audio():
+                print(f"⏱️ Time to first audio: {(time.perf_counter() - heard_at) * 1000:.0f} ms")
+
+            try:
+                reply = await self._work(self.backends.respond, text)
+                if reply is EXIT:
+                    await self._speak_queue.put((turn, self.backends.farewell, None))
+                    await self._speak_queue.join()
+                    await self._work(self.backends.wait_speech)
+                    self._done.set()
+                    return
+                if isinstance(reply, str):
+                    await self._speak_queue.put((turn, reply, log_first_audio))
+                elif reply is not None:
+                    await self._stream_reply(turn, reply, log_first_audio)
+            except TurnCancelled:
+                continue
+            except Exception as e:
+                self._failed("respond", e, turn)
+            if turn == self.turn:
+                await self._listen_queue.put(turn)
+
+    async def _stream_reply(self, turn, chunks, on_first_audio):
+        """Feed sentences into the speak queue while later chunks are still arriving."""
+        cancelled = threading.Event()
+
+        def pump():
+            sentences = split_sentences(chunks)
+            on_start = on_first_audio
+            try:
+                for sentence in sentences:
+                    if cancelled.is_set():
+                        break
+                    put = asyncio.run_coroutine_threadsafe(self._speak_queue.put((turn, sentence, on_start)), self.loop)
+                    while not cancelled.is_set():
+                        try:
+                            put.result(timeout=0.1)
+                            break
+                        except TimeoutError:
+                            continue
+                    on_start = None
+            finally:
+                sentences.close()
+                if hasattr(chunks, "close"):
+                    chunks.close()
+
+        try:
+            await self._work(pump)
+        except TurnCancelled:
+            cancelled.set()
+            raise
+
+    async def _speak_stage(self):
+        while True:
+            turn, sentence, on_start = await self._speak_queue.get()
+            try:
+                if turn == self.turn:
+                    print(f"🤖 JARVIS: {sentence}")
+                    self.backends.speak(sentence, on_start)
+            except Exception as e:
+                self._failed("speak", e)
+            finally:
+                self._speak_queue.task_done()
+
+    def _failed(self, stage, error, turn=None):
+        """Log a backend failure and, if the turn is still current, say so."""
+        self.errors += 1
+        print(f"❌ {stage} failed: {error!r}")
+        if turn is not None and turn == self.turn:
+            try:
+                print(f"🤖 JARVIS: {self.backends.error_message}")
+                self.backends.speak(self.backends.error_message, None)
+            except Exception as e:
+                print(f"❌ speak failed: {e!r}")
+
+    #############################
+    # Cancellation
+    #############################
+    async def _work(self, func, *args):
+        """Run a blocking call on a worker thread; raises TurnCancelled if the turn is interrupted."""
+        task = asyncio.ensure_future(asyncio.to_thread(self._run_for_turn, self._token, func, *args))
+        self._active.add(task)
+        try:
+            await asyncio.wait({task})
+        finally:
+            self._active.discard(task)
+            if not task.done():
+                task.cancel()
+        if task.cancelled():
+            raise TurnCancelled()
+        return task.result()
+
+    @staticmethod
+    def _run_for_turn(token, func, *args):
+        _turn_token.set(token)    # to_thread runs us in a copy of the context, so this stays local
+        return func(*args)
+
+    def _cancel_turn(self):
+        self.turn += 1
+        self._token.set()
+        self._token = threading.Event()
+        self.backends.stop_speech()
+        for task in list(self._active):
+            task.cancel()
+        for q in (self._listen_queue, self._utterance_queue, self._speak_queue):
+            while not q.empty():
+                q.get_nowait()
+                if q is self._speak_queue:
+                    q.task_done()
+
+#############################
+# Harness: fake audio and fake backends
+#############################
+class FakeBackends(PipelineBackends):
+    """
+    Scripted stand-ins for the microphone, Porcupine, STT, the LLM and TTS.
+    `wake_frames` are the frame numbers at which the wake word "ends";
+    `utterances` are returned by listen() in order.
+    """
+
+    def __init__(self, wake_frames, utterances, frame_seconds=0.032, listen_seconds=0.3,
+                 first_chunk_seconds=0.4, chunk_seconds=0.08, speak_seconds_per_word=0.02):
+        super().__init__(self._read_frame, self._detect_wake, self._listen, self._respond,
+                         self._speak, self._wait_speech, self._stop_speech)
+        self.wake_frames = set(wake_frames)
+        self.utterances = list(utterances)
+        self.frame_seconds = frame_seconds
+        self.listen_seconds = listen_seconds
+        self.first_chunk_seconds = first_chunk_seconds
+        self.chunk_seconds = chunk_seconds
+        self.speak_seconds_per_word = speak_seconds_per_word
+        self.frame = 0
+        self.spoken = []
+        self.stopped_at = []
+        self._speaking_until = 0.0
+
+    def _read_frame(self):
+        time.sleep(self.frame_seconds)
+        self.frame += 1
+        return bytes(1024)
+
+    def _detect_wake(self, frame):
+        return self.frame in self.wake_frames
+
+    def _listen(self):
+        time.sleep(self.listen_seconds)
+        return self.utterances.pop(0) if self.utterances else None
+
+    def _respond(self, text):
+        if text in ("exit", "goodbye"):
+            return EXIT
+        if text.startswith("crash"):
+            raise RuntimeError("the LLM is down")
+        if text.startswith("what"):
+            time.sleep(0.2)
+            return f"Here is a quick answer about {text}."
+
+        def stream():
+            time.sleep(self.first_chunk_seconds)
+            for i in range(12):
+                yield f"This is streamed sentence number {i}. "
+                time.sleep(self.chunk_seconds)
+        return stream()
+
+    def _speak(self, text, on_start=None):
+        if on_start:
+            on_start()
+        start = max(time.perf_counter(), self._speaking_until)
+        self._speaking_until = start + self.speak_seconds_per_word * len(text.split())
+        self.spoken.append(text)
+
+    def _wait_speech(self):
+        while time.perf_counter() < self._speaking_until:
+            time.sleep(0.005)
+
+    def _stop_speech(self):
+        self._speaking_until = 0.0
+        self.stopped_at.append(time.perf_counter())
+
+def run_harness(stop_after=1.5, seed=None):
+    """
+    Scripted session: wake word, a streamed LLM answer that gets interrupted
+    by STOP, a second wake word, a quick answer, a request whose backend
+    raises, then "goodbye".
+    """
+    rng = random.Random(seed)
+    backends = FakeBackends(wake_frames=[10, 10 + int((stop_after + 1.0) / 0.032)],
+                            utterances=["tell me a story", None, "what time is it", "crash please", "goodbye"],
+                            listen_seconds=0.2 + rng.random() * 0.1)
+    pipeline = AssistantPipeline(backends)
+
+    def press_stop():
+        time.sleep(0.32 + stop_after)
+        pressed = time.perf_counter()
+        pipeline.interrupt()
+        time.sleep(0.05)
+        silenced = [t for t in backends.stopped_at if t >= pressed]
+        if silenced:
+            print(f"🛑 STOP pressed: speech stopped after {(silenced[0] - pressed) * 1000:.2f} ms")
+
+    threading.Thread(target=press_stop, daemon=True).start()
+    started = time.perf_counter()
+    asyncio.run(asyncio.wait_for(pipeline.run(), timeout=30))
+    print(f"Session finished in {time.perf_counter() - started:.2f} s; spoke {len(backends.spoken)} sentences, "
+          f"recovered from {pipeline.errors} backend error(s).")
+    return backends
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the assistant pipeline against fake audio and backends.")
+    parser.add_argument("--stop-after", type=float, default=1.5, help="seconds into the first answer to press STOP")
+    args = parser.parse_args()
+    run_harness(args.stop_after)
@@ -0,0 +1,67 @@
+import os
+import re
+
+from cache import ResponseCache
+
+# How long a search answer stays fresh, by kind of question (seconds).
+# Live answers (the time, prices, scores) are never cached, and only questions
+# that look like settled facts keep an answer for a day; anything else gets
+# the short "other" TTL.
+SEARCH_TTLS = {
+    "live": 0,
+    "news": 10 * 60,
+    "weather": 30 * 60,
+    "sports": 15 * 60,
+    "facts": 24 * 60 * 60,
+    "other": 10 * 60,
+}
+
+# Checked in this order; the first category with a marker word wins
+CATEGORY_WORDS = {
+    "live": ("time", "date", "day", "clock", "now", "currently", "live", "price", "prices", "cost", "stock",
+             "stocks", "shares", "market", "bitcoin", "crypto", "exchange", "rate", "score", "scores",
+             "winning", "leading", "election", "traffic", "open"),
+    "news": ("news", "latest", "headline", "headlines", "today", "update", "updates", "breaking"),
+    "weather": ("weather", "forecast", "rain", "snow", "sunny"),
+    "sports": ("game", "match", "won", "playing"),
+    "facts": ("capital", "born", "died", "invented", "founded", "wrote", "author", "tall", "height",
+              "population", "meaning", "define", "definition", "distance", "far", "old", "discovered"),
+}
+
+# Words that don't change what is being searched for.
+FILLER_WORDS = {
+    "jarvis", "hey", "please", "can", "could", "you", "tell", "me", "show", "search", "for",
+    "look", "up", "google", "the", "a", "an", "whats", "what", "is", "are", "s",
+}
+
+def normalize_query(query):
+    """"Jarvis, what's the LATEST news?" and "latest news" map to the same cache key."""
+    words = re.sub(r"[^a-z0-9 ]+", " ", query.lower().replace("'", "")).split()
+    kept = [w for w in words if w not in FILLER_WORDS]
+    return " ".join(kept or words)
+
+def query_category(query):
+    words = set(normalize_query(query).split())
+    for category, markers in CATEGORY_WORDS.items():
+        if words.intersection(markers):
+            return category
+    return "other"
+
+def search_ttl(query):
+    """Seconds to keep the answer; 0 means don't cache it."""
+    return SEARCH_TTLS[query_category(query)]
+
+def cached_search(cache, query, fetch, should_cache=None):
+    """fetch(query) through `cache`, kept for search_ttl(query) seconds. Live queries always call fetch()."""
+    ttl = search_ttl(query)
+    if not ttl:
+        return fetch(query)
+    return cache.get_or_compute(normalize_query(query), lambda: fetch(query), ttl=ttl, should_cache=should_cache)
+
+def create_search_cache():
+    """JARVIS_SEARCH_CACHE=/path/to/search_cache.db keeps results across restarts."""
+    return ResponseCache(
+        max_entries=int(os.getenv("JARVIS_SEARCH_CACHE_SIZE", "256")),
+        path=os.getenv("JARVIS_SEARCH_CACHE"),
+        name="search",
+    )
@@ -0,0 +1,131 @@
+import sys
+import time
+import argparse
+import threading
+
+# Launch time bookkeeping for jarvis.py: the wake-word path is built first and
+# everything else is created lazily or by a background warmup thread.
+STARTED = time.perf_counter()
+
+class StartupReport:
+    """Milestones (ms since launch) and how long each lazily created component took."""
+
+    def __init__(self):
+        self.milestones = []
+        self.components = []
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        with self._lock:
+            self.milestones.append((name, (time.perf_counter() - STARTED) * 1000))
+
+    def component(self, name, seconds, where):
+        with self._lock:
+            self.components.append((name, seconds * 1000, where))
+
+    def print(self):
+        print("⏱️ Startup report (ms since launch)")
+        for name, ms in self.milestones:
+            print(f"   {ms:8.1f}  {name}")
+        for name, ms, where in sorted(self.components, key=lambda c: -c[1]):
+            print(f"   {ms:8.1f}  {name} ({where})")
+
+report = StartupReport()
+
+class Lazy:
+    """
+    Stands in for an object that is expensive to create. The factory runs on
+    first attribute access (or when warmup resolves it), exactly once.
+    """
+
+    def __init__(self, name, factory):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_value", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def resolve(self, where="on demand"):
+        value = self._value
+        if value is None:
+            with self._lock:
+                value = self._value
+                if value is None:
+                    t0 = time.perf_counter()
+                    value = self._factory()
+                    report.component(self._name, time.perf_counter() - t0, where)
+                    object.__setattr__(self, "_value", value)
+        return value
+
+    def is_ready(self):
+        return self._value is not None
+
+    def __getattr__(self, attr):
+        return getattr(self.resolve(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self.resolve(), attr, value)
+
+    def __repr__(self):
+        return f"<Lazy {self._name} {'ready' if self.is_ready() else 'pending'}>"
+
+def lazy_module(name):
+    import importlib
+    return Lazy(f"import {name}", lambda: importlib.import_module(name))
+
+class Warmup:
+    """Resolves Lazy objects (and runs plain callables) in order on a background thread."""
+
+    def __init__(self):
+        self.tasks = []
+        self.done = threading.Event()
+
+    def add(self, task):
+        self.tasks.append(task)
+        return task
+
+    def start(self, on_done=None):
+        threading.Thread(target=self._run, args=(on_done,), name="warmup", daemon=True).start()
+        return self
+
+    def _run(self, on_done):
+        for task in self.tasks:
+            try:
+                if isinstance(task, Lazy):
+                    task.resolve("warmup")
+                else:
+                    t0 = time.perf_counter()
+                    task()
+                    report.component(getattr(task, "__name__", repr(task)), time.perf_counter() - t0, "warmup")
+            except Exception as e:
+                print(f"⚠️ Warmup of {task!r} failed: {e}")
+        report.mark("warmup finished")
+        self.done.set()
+        if on_done:
+            on_done()
+
+#############################
+# CLI: summarize `python -X importtime jarvis.py 2> importtime.log`
+#############################
+def summarize_importtime(lines, top=25):
+    """Top-level imports by cumulative time, from -X importtime output."""
+    rows = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].rstrip("\n").split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2   # nested imports are indented two spaces per level
+        rows.append((int(cumulative_us), int(self_us), depth, name.strip()))
+    top_level = sorted((r for r in rows if r[2] == 0), reverse=True)
+    total = sum(r[0] for r in top_level)
+    print(f"{len(rows)} modules imported, {total / 1000:.1f} ms in top-level imports")
+    print(f"{'cumulative':>11} {'self':>9}  module")
+    for cumulative, self_us, _, name in top_level[:top]:
+        print(f"{cumulative / 1000:9.1f}ms {self_us / 1000:7.1f}ms  {name}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize -X importtime output (python -X importtime jarvis.py 2> importtime.log).")
+    parser.add_argument("log", nargs="?", help="importtime log (default: stdin)")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+    with (open(args.log) if args.log else sys.stdin) as f:
+        summarize_importtime(f, args.top)
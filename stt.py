@@ -1,26 +1,39 @@
 import speech_recognition as sr
 
+from stt_backends import create_stt_backend, transcribe
+
+def microphone_frames(source, seconds=8):
+    """Raw PCM chunks from an open sr.Microphone for `seconds`."""
+    for _ in range(int(seconds * source.SAMPLE_RATE / source.CHUNK)):
+        yield source.stream.read(source.CHUNK)
+
 def recognize_speech():
     recognizer = sr.Recognizer()
+    backend = create_stt_backend(recognizer=recognizer)  # JARVIS_STT=vosk for offline, streaming STT
     mic = sr.Microphone()
 
-    with mic as source:
-        print("Listening... Speak now.")
-        recognizer.adjust_for_ambient_noise(source)
-        audio = recognizer.listen(source)
-
     try:
-        # Convert speech to text using Google Web Speech API (default)
-        text = recognizer.recognize_google(audio)
-        print(f"You said: {text}")
-        return text
+        with mic as source:
+            print("Listening... Speak now.")
+            if backend.streaming:
+                text = transcribe(backend, microphone_frames(source), source.SAMPLE_RATE,
+                                  on_partial=lambda partial: print(f"  ... {partial}"))
+            else:
+                recognizer.adjust_for_ambient_noise(source)
+                audio = recognizer.listen(source)
+                # Convert speech to text using Google Web Speech API (default)
+                text = recognizer.recognize_google(audio)
     except sr.UnknownValueError:
-        print("Could not understand audio")
-        return None
+        text = None
     except sr.RequestError:
         print("Error connecting to speech recognition service")
         return None
 
+    if not text:
+        print("Could not understand audio")
+        return None
+    print(f"You said: {text}")
+    return text
+
 if __name__ == "__main__":
     recognize_speech()
-
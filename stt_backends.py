@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import wave
+import argparse
+
+# Speech-to-text backends behind one small interface:
+#
+#   session = backend.session(sample_rate)
+#   ended = session.accept(pcm_bytes)   # feed audio; True once the backend hears the end of the phrase
+#   session.partial()                   # current hypothesis while the user is still talking
+#   session.result()                    # final text (or None)
+#
+# Streaming backends (Vosk) produce partials as audio arrives; the Google
+# backend only has a result once the whole clip has been sent.
+
+class GoogleRecognizer:
+    """Google Web Speech via speech_recognition. Needs internet; no partials."""
+
+    name = "google"
+    streaming = False
+
+    def __init__(self, recognizer=None):
+        if recognizer is None:
+            import speech_recognition as sr
+            recognizer = sr.Recognizer()
+        self.recognizer = recognizer
+
+    def session(self, sample_rate):
+        return _GoogleSession(self.recognizer, sample_rate)
+
+class _GoogleSession:
+    def __init__(self, recognizer, sample_rate):
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self.chunks = []
+
+    def accept(self, pcm):
+        self.chunks.append(pcm)
+        return False
+
+    def partial(self):
+        return ""
+
+    def result(self):
+        import speech_recognition as sr
+        audio = sr.AudioData(b"".join(self.chunks), self.sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio).lower()
+        except sr.UnknownValueError:
+            return None
+
+class VoskRecognizer:
+    """Offline, CPU-only streaming recognition with Vosk (pip install vosk + a model directory)."""
+
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path):
+        import vosk
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self.model = vosk.Model(model_path)
+
+    def session(self, sample_rate):
+        return _VoskSession(self._vosk.KaldiRecognizer(self.model, sample_rate))
+
+class _VoskSession:
+    def __init__(self, kaldi):
+        self.kaldi = kaldi
+        self.texts = []
+
+    def accept(self, pcm):
+        if self.kaldi.AcceptWaveform(pcm):
+            text = json.loads(self.kaldi.Result()).get("text", "")
+            if text:
+                self.texts.append(text)
+                return True
+        return False
+
+    def partial(self):
+        partial = json.loads(self.kaldi.PartialResult()).get("partial", "")
+        return " ".join(self.texts + [partial]).strip()
+
+    def result(self):
+        text = json.loads(self.kaldi.FinalResult()).get("text", "")
+        return " ".join(self.texts + [text]).strip() or None
+
+def create_stt_backend(name=None, recognizer=None):
+    """JARVIS_STT=google|vosk (JARVIS_VOSK_MODEL=/path/to/model for vosk)."""
+    name = name or os.getenv("JARVIS_STT", "google")
+    if name == "vosk":
+        return VoskRecognizer(os.getenv("JARVIS_VOSK_MODEL", "vosk-model-small-en-us-0.15"))
+    return GoogleRecognizer(recognizer)
+
+#############################
+# Stable partials
+#############################
+class StablePartials:
+    """
+    Reports a partial hypothesis once it has stayed the same for `hold`
+    consecutive updates, i.e. once it's safe to start matching intents on it.
+    Each distinct stable text is reported once.
+    """
+
+    def __init__(self, hold=3):
+        self.hold = hold
+        self._last = ""
+        self._count = 0
+        self._reported = ""
+
+    def update(self, text):
+        if not text:
+            return None
+        if text == self._last:
+            self._count += 1
+        else:
+            self._last, self._count = text, 1
+        if self._count >= self.hold and text != self._reported:
+            self._reported = text
+            return text
+        return None
+
+def transcribe(backend, frames, sample_rate, on_partial=None, on_stable=None):
+    """
+    Feed an iterable of PCM byte frames to `backend` until it detects the end
+    of the phrase (or the frames run out). Returns the final text or None.
+    """
+    session = backend.session(sample_rate)
+    stable = StablePartials()
+    for pcm in frames:
+        ended = session.accept(pcm)
+        if backend.streaming:
+            partial = session.partial()
+            if on_partial and partial:
+                on_partial(partial)
+            stable_text = stable.update(partial)
+            if on_stable and stable_text:
+                on_stable(stable_text)
+        if ended:
+            break
+    return session.result()
+
+#############################
+# Benchmark: word error rate and latency on recorded fixtures
+#############################
+def word_error_rate(reference, hypothesis):
+    ref, hyp = reference.lower().split(), (hypothesis or "").lower().split()
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1] / max(1, len(ref))
+
+def _wav_frames(path, frame_length, realtime):
+    with wave.open(path, "rb") as wav:
+        rate = wav.getframerate()
+        while True:
+            data = wav.readframes(frame_length)
+            if not data:
+                return
+            if realtime:
+                time.sleep(frame_length / rate)
+            yield data
+
+def benchmark(backend, fixtures_dir, frame_length=512, realtime=False):
+    """
+    Each fixture is NAME.wav (16-bit mono) with its transcript in NAME.txt.
+    Reports WER, time to first partial and time from end of audio to final text.
+    """
+    names = sorted(f[:-4] for f in os.listdir(fixtures_dir) if f.endswith(".wav"))
+    total_wer = 0.0
+    for name in names:
+        wav_path = os.path.join(fixtures_dir, name + ".wav")
+        with open(os.path.join(fixtures_dir, name + ".txt")) as f:
+            reference = f.read().strip()
+        with wave.open(wav_path, "rb") as wav:
+            rate = wav.getframerate()
+        first_partial = []
+        started = time.perf_counter()
+        audio_done = [started]
+
+        def tracked():
+            yield from _wav_frames(wav_path, frame_length, realtime)
+            audio_done[0] = time.perf_counter()
+
+        text = transcribe(backend, tracked(), rate,
+                          on_partial=lambda p: first_partial or first_partial.append(time.perf_counter()))
+        finished = time.perf_counter()
+        wer = word_error_rate(reference, text)
+        total_wer += wer
+        partial_ms = f"{(first_partial[0] - started) * 1000:6.0f} ms" if first_partial else "     n/a"
+        print(f"{name:<20} WER {wer:5.1%}   first partial {partial_ms}"
+              f"   final {(finished - audio_done[0]) * 1000:6.0f} ms after audio   -> {text!r}")
+    if names:
+        print(f"{backend.name}: mean WER {total_wer / len(names):.1%} over {len(names)} fixtures")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark STT backends on WAV fixtures (NAME.wav + NAME.txt).")
+    parser.add_argument("fixtures", help="directory of fixtures")
+    parser.add_argument("--backend", choices=["google", "vosk"], default="vosk")
+    parser.add_argument("--realtime", action="store_true", help="feed audio at real-time speed")
+    args = parser.parse_args()
+    benchmark(create_stt_backend(args.backend), args.fixtures, realtime=args.realtime)
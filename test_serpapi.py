@@ -1,4 +1,4 @@
-from serpapi import GoogleSearch
+from clients import serpapi_search
 import os
 
 params = {
@@ -8,7 +8,6 @@ params = {
     "api_key": os.getenv("SERPAPI_KEY")
 }
 
-search = GoogleSearch(params)
-results = search.get_dict()
+results = serpapi_search(params)
 print(results)
 
@@ -0,0 +1,69 @@
+import os
+from array import array
+
+import pytest
+
+from barge_in import FIXTURES, FRAME_LENGTH, SAMPLE_RATE, BargeInDetector, run_fixture, write_fixtures
+from fake_devices import FakeTTSEngine, read_wav
+
+FRAME_SECONDS = FRAME_LENGTH / SAMPLE_RATE
+
+@pytest.fixture(scope="module")
+def fixtures(tmp_path_factory):
+    directory = write_fixtures(str(tmp_path_factory.mktemp("barge_in")))
+    names = sorted(f[:-4] for f in os.listdir(directory) if f.endswith(".wav"))
+    assert len(names) == len(FIXTURES)
+    return directory, names
+
+def load(directory, name):
+    with open(os.path.join(directory, name + ".txt")) as f:
+        text = f.read().strip()
+    return read_wav(os.path.join(directory, name + ".wav")), None if text == "-" else float(text)
+
+def first_detection(samples, detector):
+    """Seconds into the clip of the frame that confirmed a barge-in, or None."""
+    for start in range(0, len(samples) - FRAME_LENGTH + 1, FRAME_LENGTH):
+        if detector.update(samples[start:start + FRAME_LENGTH]):
+            return (start + FRAME_LENGTH) / SAMPLE_RATE
+    return None
+
+def test_detects_talking_over_every_fixture_within_a_few_frames(fixtures):
+    directory, names = fixtures
+    for name in names:
+        samples, onset = load(directory, name)
+        if onset is None:
+            continue
+        detected = first_detection(samples, BargeInDetector())
+        assert detected is not None, f"{name}: missed"
+        assert onset <= detected <= onset + 4 * FRAME_SECONDS, f"{name}: detected at {detected:.2f}s"
+
+def test_playback_alone_never_triggers(fixtures):
+    directory, names = fixtures
+    for name in names:
+        samples, onset = load(directory, name)
+        if onset is None:
+            assert first_detection(samples, BargeInDetector()) is None, f"{name}: false trigger"
+
+def test_loud_echo_late_in_the_utterance_is_caught(fixtures):
+    # Missed at the old margin of 1.6: the echo level had grown by 2.3 s
+    directory, _ = fixtures
+    samples, onset = load(directory, "echo45_talk_at_2.3s")
+    assert first_detection(samples, BargeInDetector(margin=1.6)) is None
+    assert first_detection(samples, BargeInDetector()) is not None
+
+def test_one_loud_frame_is_not_enough():
+    detector = BargeInDetector(min_frames=2, settle_frames=1)
+    quiet, loud = array("h", [100] * FRAME_LENGTH), array("h", [8000] * FRAME_LENGTH)
+    assert not detector.update(quiet)      # learns the echo level
+    assert not detector.update(loud)
+    assert not detector.update(quiet)
+    assert not detector.update(loud)
+    assert detector.update(loud)
+
+def test_monitor_silences_speech_on_barge_in(fixtures):
+    directory, _ = fixtures
+    path = os.path.join(directory, "echo15_talk_at_0.9s.wav")
+    result = run_fixture(path, 0.9, lambda: FakeTTSEngine(words_per_second=3.0), speed=4.0)
+    assert result is not None
+    assert 0 <= result["detection"] <= 4 * FRAME_SECONDS
+    assert result["reaction"] + result["silence"] < 0.2
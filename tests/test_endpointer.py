@@ -0,0 +1,91 @@
+import wave
+import random
+from array import array
+
+import pytest
+
+from fake_devices import synth_speech
+from listening import NoiseFloorTracker, load_wav_into_ring, preroll_start, ring_frames, voice_follows
+from vad import ENDPOINT_PROFILES, EnergyVAD, Endpointer
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 512
+FRAME_SECONDS = FRAME_LENGTH / SAMPLE_RATE
+
+def noise(seconds, seed=0, level=30):
+    rng = random.Random(seed)
+    return array("h", (rng.randint(-level, level) for _ in range(int(seconds * SAMPLE_RATE))))
+
+def write_wav(path, *parts):
+    samples = array("h")
+    for part in parts:
+        samples.extend(part)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(samples.tobytes())
+    return str(path)
+
+def endpoint(path, context="command", **kwargs):
+    """Run the endpointer over a WAV fixture; returns it and the seconds of audio it consumed."""
+    ring, sample_rate = load_wav_into_ring(path, FRAME_LENGTH)
+    noise_floor = NoiseFloorTracker()
+    for index in range(4):                     # the noise floor is already tracking when listening starts
+        noise_floor.update(ring.frame(index))
+    endpointer = Endpointer(EnergyVAD(noise_floor), sample_rate, FRAME_LENGTH, context, **kwargs)
+    heard = b"".join(ring_frames(ring, 0, endpointer, read_timeout=0.01))
+    return endpointer, len(heard) / 2 / sample_rate
+
+@pytest.fixture
+def command_wav(tmp_path):
+    # 0.3 s of room noise, 1.5 s of speech, 2 s of room noise
+    return write_wav(tmp_path / "command.wav", noise(0.3), synth_speech(1.5, SAMPLE_RATE, seed=1), noise(2, seed=1))
+
+@pytest.mark.parametrize("context", list(ENDPOINT_PROFILES))
+def test_phrase_ends_after_the_context_silence(command_wav, context):
+    endpointer, heard = endpoint(command_wav, context)
+    assert endpointer.reason == "end"
+    assert ENDPOINT_PROFILES[context] <= endpointer.silence <= 2 * ENDPOINT_PROFILES[context] + FRAME_SECONDS
+    assert heard < 0.3 + 1.5 + 2
+
+def test_confirm_ends_sooner_than_dictation(command_wav):
+    _, confirm = endpoint(command_wav, "confirm")
+    _, dictation = endpoint(command_wav, "dictation")
+    assert confirm < dictation
+
+def test_mid_phrase_pause_stretches_the_trailing_silence(tmp_path):
+    pause = 0.5
+    path = write_wav(tmp_path / "pause.wav", noise(0.3), synth_speech(0.8, SAMPLE_RATE, seed=2),
+                     noise(pause, seed=2), synth_speech(0.8, SAMPLE_RATE, seed=3), noise(2, seed=3))
+    endpointer, heard = endpoint(path, "command")
+    assert endpointer.reason == "end"
+    assert heard > 0.3 + 0.8 + pause + 0.8           # the pause didn't end the phrase
+    assert endpointer.longest_pause >= pause - 2 * FRAME_SECONDS
+    assert endpointer.silence >= 1.25 * endpointer.longest_pause - FRAME_SECONDS
+
+def test_silence_times_out(tmp_path):
+    path = write_wav(tmp_path / "silence.wav", noise(3))
+    endpointer, heard = endpoint(path, "command", no_speech_timeout=1.0)
+    assert endpointer.reason == "timeout"
+    assert heard == pytest.approx(1.0, abs=FRAME_SECONDS)
+
+def test_endless_talking_hits_the_phrase_limit(tmp_path):
+    path = write_wav(tmp_path / "talk.wav", synth_speech(4, SAMPLE_RATE, seed=4))
+    endpointer, heard = endpoint(path, "command", phrase_time_limit=2.0)
+    assert endpointer.reason == "limit"
+    assert heard == pytest.approx(2.0, abs=FRAME_SECONDS)
+
+def test_preroll_starts_listening_before_the_newest_audio(command_wav):
+    ring, sample_rate = load_wav_into_ring(command_wav, FRAME_LENGTH)
+    start = preroll_start(ring, sample_rate, 0.5)
+    assert ring.frames_written - start == int(0.5 * sample_rate / FRAME_LENGTH)
+    assert preroll_start(ring, sample_rate, 60) == 0
+
+def test_voice_right_after_the_wake_word(command_wav):
+    ring, sample_rate = load_wav_into_ring(command_wav, FRAME_LENGTH)
+    noise_floor = NoiseFloorTracker()
+    for index in range(4):
+        noise_floor.update(ring.frame(index))
+    assert voice_follows(ring, int(0.3 / FRAME_SECONDS), noise_floor, sample_rate)
+    assert not voice_follows(ring, int(2.5 / FRAME_SECONDS), noise_floor, sample_rate)
@@ -0,0 +1,36 @@
+import pytest
+
+from intents import (CORPUS, KNOWN_CONTACTS, RECIPIENT_CORPUS, SLOT_CORPUS, YES_NO_CORPUS, build_router,
+                     build_yes_no, is_yes, split_recipient)
+
+@pytest.fixture(scope="module")
+def router():
+    return build_router()
+
+@pytest.fixture(scope="module")
+def yes_no():
+    return build_yes_no()
+
+@pytest.mark.parametrize("text, expected", CORPUS)
+def test_intent(router, text, expected):
+    assert router.match(text).name == expected
+
+@pytest.mark.parametrize("text, expected", SLOT_CORPUS)
+def test_slots(router, text, expected):
+    assert router.match(text).slots == expected
+
+@pytest.mark.parametrize("text, expected", RECIPIENT_CORPUS)
+def test_recipient_is_split_from_the_body(router, text, expected):
+    assert split_recipient(router.match(text).slots.get("contact", ""), KNOWN_CONTACTS.__contains__) == expected
+
+@pytest.mark.parametrize("text, expected", YES_NO_CORPUS)
+def test_yes_no(yes_no, text, expected):
+    assert is_yes(*yes_no, text) == expected
+
+def test_names_are_not_cut_up(router):
+    # "tom" used to lose its "to"
+    assert router.match("call tom").slots == {"contact": "tom"}
+    assert split_recipient("tom", {"tom"}.__contains__) == ("tom", "")
+
+def test_unknown_recipient_is_left_whole():
+    assert split_recipient("someone new hello", KNOWN_CONTACTS.__contains__) == ("someone new hello", "")
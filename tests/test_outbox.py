@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+from outbox import ActionQueue, FakeExecutor
+
+class FlakyExecutor:
+    """Fails each job's first `failures` attempts, then succeeds."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.attempts = {}
+        self.sent = []
+
+    def __call__(self, kind, jobs):
+        errors = []
+        for job in jobs:
+            self.attempts[job.id] = self.attempts.get(job.id, 0) + 1
+            if self.attempts[job.id] <= self.failures:
+                errors.append(RuntimeError(f"{kind} is not responding"))
+            else:
+                self.sent.append((kind, job.args))
+                errors.append(None)
+        return errors
+
+@pytest.fixture
+def queues():
+    opened = []
+
+    def open_queue(*args, **kwargs):
+        queue = ActionQueue(*args, **kwargs)
+        opened.append(queue)
+        return queue
+    yield open_queue
+    for queue in opened:
+        queue.close()
+
+def test_failed_job_is_retried_until_it_goes_through(queues):
+    executor = FlakyExecutor(failures=2)
+    queue = queues(None, executor, base_delay=0.01).start()
+    job = queue.enqueue("send_imessage", ["mom", "hi"])
+    assert queue.drain(timeout=5)
+    assert queue.state(job.id) == {"state": "done", "attempts": 3, "error": None}
+    assert executor.sent == [("send_imessage", ["mom", "hi"])]
+    assert queue.counts["retried"] == 2
+
+def test_job_that_keeps_failing_is_reported_once(queues):
+    failed = []
+    queue = queues(None, FlakyExecutor(failures=100), max_attempts=3, base_delay=0.01,
+                   on_failed=lambda job, error: failed.append((job.label, str(error)))).start()
+    job = queue.enqueue("add_reminder", ["buy milk", "tomorrow"], label="set your reminder")
+    assert queue.drain(timeout=5)
+    assert queue.state(job.id)["state"] == "failed"
+    assert queue.state(job.id)["attempts"] == 3
+    assert failed == [("set your reminder", "add_reminder is not responding")]
+
+def test_repeat_while_queued_is_deduplicated(queues):
+    executor = FakeExecutor(batch_delay=0.05)
+    queue = queues(None, executor)
+    first = queue.enqueue("facetime_call", ["mom"])
+    again = queue.enqueue("facetime_call", ["mom"])
+    assert again.id == first.id
+    assert queue.counts["deduplicated"] == 1
+    queue.start()
+    assert queue.drain(timeout=5)
+    assert len(executor.sent) == 1
+
+def test_repeat_after_it_finished_runs_again(queues):
+    executor = FakeExecutor(batch_delay=0)
+    queue = queues(None, executor).start()
+    first = queue.enqueue("facetime_call", ["mom"])
+    assert queue.drain(timeout=5)
+    again = queue.enqueue("facetime_call", ["mom"])
+    assert again.id != first.id
+    assert queue.drain(timeout=5)
+    assert len(executor.sent) == 2
+    assert queue.state(first.id)["state"] == queue.state(again.id)["state"] == "done"
+
+def test_explicit_key_is_never_run_twice(queues):
+    executor = FakeExecutor(batch_delay=0)
+    queue = queues(None, executor).start()
+    first = queue.enqueue("send_imessage", ["mom", "hi"], key="confirmation-1")
+    assert queue.drain(timeout=5)
+    assert queue.enqueue("send_imessage", ["mom", "hi"], key="confirmation-1").id == first.id
+    assert queue.drain(timeout=5)
+    assert len(executor.sent) == 1
+
+def test_job_running_at_a_crash_is_reported_not_rerun(queues, tmp_path):
+    path = str(tmp_path / "outbox.db")
+    hung, release = threading.Event(), threading.Event()
+
+    def hang(kind, jobs):
+        hung.set()
+        release.wait(10)
+        return [None] * len(jobs)
+    crashed = queues(path, hang, workers=1).start()
+    job = crashed.enqueue("send_imessage", ["mom", "sent when it crashed?"])
+    waiting = crashed.enqueue("add_reminder", ["buy milk", "tomorrow"])
+    assert hung.wait(5)
+
+    # A second queue on the same file stands in for Jarvis after a restart
+    interrupted = []
+    executor = FakeExecutor(batch_delay=0)
+    restarted = ActionQueue(path, executor, on_failed=lambda job, error: interrupted.append(job.id)).start()
+    try:
+        assert restarted.drain(timeout=5)
+        assert interrupted == [job.id]
+        assert restarted.state(job.id) == {"state": "failed", "attempts": 1, "error": "interrupted"}
+        assert restarted.state(waiting.id)["state"] == "done"
+        assert [kind for kind, _ in executor.sent] == ["add_reminder"]
+    finally:
+        restarted.close()
+        release.set()
@@ -0,0 +1,84 @@
+import time
+import asyncio
+import threading
+
+from pipeline import AssistantPipeline, FakeBackends, TurnCancelled, check_cancelled, split_sentences
+
+def fake_backends(utterances, wake_frames=(3,)):
+    return FakeBackends(wake_frames=wake_frames, utterances=utterances, frame_seconds=0.005,
+                        listen_seconds=0.02, first_chunk_seconds=0.02, chunk_seconds=0.01)
+
+def run(pipeline, during=None, timeout=10):
+    """Run the pipeline until it exits; `during(pipeline)` runs on the loop alongside it."""
+    async def main():
+        task = asyncio.create_task(pipeline.run())
+        if during is not None:
+            await during(pipeline)
+        await asyncio.wait_for(task, timeout)
+    asyncio.run(main())
+
+def test_split_sentences_regroups_chunks():
+    assert list(split_sentences(["Hel", "lo there. How", " are you? Fine"])) == ["Hello there.", "How are you?", "Fine"]
+
+def test_answers_then_exits():
+    backends = fake_backends(["what time is it", "goodbye"])
+    run(AssistantPipeline(backends))
+    assert backends.spoken[0] == backends.greeting
+    assert "Here is a quick answer about what time is it." in backends.spoken
+    assert backends.spoken[-1] == backends.farewell
+
+def test_backend_error_is_spoken_and_the_session_goes_on():
+    backends = fake_backends(["crash please", "what time is it", "goodbye"])
+    pipeline = AssistantPipeline(backends)
+    run(pipeline)
+    assert pipeline.errors == 1
+    assert backends.error_message in backends.spoken
+    assert "Here is a quick answer about what time is it." in backends.spoken
+    assert backends.spoken[-1] == backends.farewell
+
+def test_interrupt_cancels_the_handler_through_its_token():
+    backends = fake_backends(["do the thing"])
+    log = []
+    started = threading.Event()
+
+    def respond(text):
+        started.set()
+        try:
+            for _ in range(200):
+                time.sleep(0.01)
+                check_cancelled()
+            log.append("finished")
+        except TurnCancelled:
+            log.append("cancelled")
+            raise
+    backends.respond = respond
+    pipeline = AssistantPipeline(backends)
+
+    async def interrupt_then_stop(pipeline):
+        while not started.is_set():
+            await asyncio.sleep(0.005)
+        pipeline.interrupt()
+        await asyncio.sleep(0.1)
+        pipeline.stop()
+    run(pipeline, interrupt_then_stop)
+    assert log == ["cancelled"]
+    assert backends.stopped_at, "speech was not silenced"
+
+def test_interrupt_drops_the_rest_of_a_streamed_answer():
+    backends = fake_backends(["tell me a story"])
+    pipeline = AssistantPipeline(backends)
+
+    async def interrupt_then_stop(pipeline):
+        while not any(s.startswith("This is streamed") for s in backends.spoken):
+            await asyncio.sleep(0.005)
+        pipeline.interrupt()
+        spoken = len(backends.spoken)
+        await asyncio.sleep(0.3)
+        assert len(backends.spoken) == spoken
+        pipeline.stop()
+    run(pipeline, interrupt_then_stop)
+    assert sum(s.startswith("This is streamed") for s in backends.spoken) < 12
+    assert pipeline.errors == 0
+
+def test_token_is_unset_outside_the_pipeline():
+    check_cancelled()     # no turn: never raises
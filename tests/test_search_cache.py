@@ -0,0 +1,55 @@
+import time
+
+from cache import ResponseCache
+from search_cache import SEARCH_TTLS, cached_search, normalize_query, query_category, search_ttl
+
+class Fetcher:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, query):
+        self.calls.append(query)
+        return f"answer {len(self.calls)}"
+
+def test_categories_pick_the_ttl():
+    assert query_category("what time is it") == "live"
+    assert query_category("what's the bitcoin price") == "live"
+    assert query_category("latest news") == "news"
+    assert query_category("will it rain tomorrow") == "weather"
+    assert query_category("who won the game last night") == "sports"
+    assert query_category("what is the capital of france") == "facts"
+    assert query_category("best pizza near me") == "other"
+    assert search_ttl("what time is it") == 0
+    assert search_ttl("what is the capital of france") == SEARCH_TTLS["facts"]
+    assert search_ttl("best pizza near me") == SEARCH_TTLS["other"] < SEARCH_TTLS["facts"]
+
+def test_rephrasings_share_a_key():
+    assert normalize_query("Jarvis, what's the LATEST news?") == normalize_query("latest news")
+
+def test_repeat_is_answered_from_the_cache():
+    cache, fetch = ResponseCache(), Fetcher()
+    assert cached_search(cache, "what is the capital of france", fetch) == "answer 1"
+    assert cached_search(cache, "Jarvis, what is the capital of France?", fetch) == "answer 1"
+    assert len(fetch.calls) == 1
+    assert cache.hits == 1
+
+def test_live_queries_are_never_cached():
+    cache, fetch = ResponseCache(), Fetcher()
+    assert cached_search(cache, "what time is it", fetch) == "answer 1"
+    assert cached_search(cache, "what time is it", fetch) == "answer 2"
+    assert cache.stats()["entries"] == 0
+
+def test_answer_expires_after_its_ttl(monkeypatch):
+    monkeypatch.setitem(SEARCH_TTLS, "news", 0.05)
+    cache, fetch = ResponseCache(), Fetcher()
+    cached_search(cache, "latest news", fetch)
+    cached_search(cache, "latest news", fetch)
+    assert len(fetch.calls) == 1
+    time.sleep(0.1)
+    assert cached_search(cache, "latest news", fetch) == "answer 2"
+
+def test_vetoed_answers_are_not_kept():
+    cache, fetch = ResponseCache(), Fetcher()
+    no_results = lambda query: "No results found."
+    cached_search(cache, "best pizza near me", no_results, should_cache=lambda r: r != "No results found.")
+    assert cached_search(cache, "best pizza near me", fetch) == "answer 1"
@@ -0,0 +1,453 @@
+import os
+import re
+import math
+import mmap
+import time
+import zlib
+import random
+import struct
+import argparse
+import datetime
+import threading
+
+#############################
+# Parsing (once, at ingest)
+#############################
+DHT_PATTERN = re.compile(r"T:\s*(-?\d+(?:\.\d+)?)\s*F?\s*,\s*H:\s*(\d+(?:\.\d+)?)\s*%?")
+
+def parse_dht(line):
+    """"DHT:T:75F, H:40%" -> (75.0, 40.0), or None if the line is malformed."""
+    match = DHT_PATTERN.search(line or "")
+    if not match:
+        return None
+    return float(match.group(1)), float(match.group(2))
+
+#############################
+# Storage
+#############################
+# Every number lives in one flat array of doubles, backed by a bytearray or,
+# with a path, by a memory-mapped file so history survives restarts.
+MAGIC = b"JTSTORE1"
+HEADER = struct.Struct("<8sQ")     # magic, layout fingerprint
+
+RAW_CAPACITY = 4096
+TIERS = (("minute", 60, 7 * 24 * 60), ("hour", 3600, 90 * 24))
+
+class Tier:
+    """
+    Fixed-size buckets (`seconds` wide) in a ring of `capacity`. Each bucket
+    holds count/sum/min/max plus running totals of count and sum, so the
+    mean over any window in the ring is two lookups.
+    """
+
+    COUNT, SUM, MIN, MAX, CUM_COUNT, CUM_SUM = range(6)
+
+    def __init__(self, name, seconds, capacity, data, offset):
+        self.name = name
+        self.seconds = seconds
+        self.capacity = capacity
+        self.data = data
+        self.head = offset          # data[head] = newest bucket number, -1 while empty
+        self.base = offset + 1
+
+    @staticmethod
+    def size(capacity):
+        return 1 + 6 * capacity
+
+    def reset(self):
+        self.data[self.head] = -1
+
+    @property
+    def newest(self):
+        return int(self.data[self.head])
+
+    def _at(self, bucket, field):
+        return self.base + field * self.capacity + bucket % self.capacity
+
+    def add(self, t, value):
+        data = self.data
+        newest = self.newest
+        bucket = max(int(t // self.seconds), newest)    # a clock step backwards lands in the newest bucket
+        if bucket > newest:
+            self._advance(newest, bucket)
+        at = self.base + bucket % self.capacity
+        cap = self.capacity
+        data[at] += 1
+        data[at + cap] += value
+        if value < data[at + 2 * cap]:
+            data[at + 2 * cap] = value
+        if value > data[at + 3 * cap]:
+            data[at + 3 * cap] = value
+        data[at + 4 * cap] += 1
+        data[at + 5 * cap] += value
+
+    def _advance(self, newest, bucket):
+        """Start bucket `bucket`, writing empty buckets over any gap so running totals stay continuous."""
+        data = self.data
+        cum_count = data[self._at(newest, self.CUM_COUNT)] if newest >= 0 else 0.0
+        cum_sum = data[self._at(newest, self.CUM_SUM)] if newest >= 0 else 0.0
+        for b in range(max(newest + 1, bucket - self.capacity + 1), bucket + 1):
+            data[self._at(b, self.COUNT)] = 0.0
+            data[self._at(b, self.SUM)] = 0.0
+            data[self._at(b, self.MIN)] = math.inf
+            data[self._at(b, self.MAX)] = -math.inf
+            data[self._at(b, self.CUM_COUNT)] = cum_count
+            data[self._at(b, self.CUM_SUM)] = cum_sum
+        data[self.head] = bucket
+
+    def span(self, since, until):
+        """Bucket range covering [since, until], clipped to what the ring still holds (None if nothing)."""
+        newest = self.newest
+        if newest < 0:
+            return None
+        first = max(int(since // self.seconds), newest - self.capacity + 1)
+        last = min(int(until // self.seconds), newest)
+        return (first, last) if first <= last else None
+
+    def count_and_sum(self, first, last):
+        """O(1): running totals at the last bucket minus those before the first."""
+        data = self.data
+        count = data[self._at(last, self.CUM_COUNT)] - (data[self._at(first, self.CUM_COUNT)] - data[self._at(first, self.COUNT)])
+        total = data[self._at(last, self.CUM_SUM)] - (data[self._at(first, self.CUM_SUM)] - data[self._at(first, self.SUM)])
+        return count, total
+
+    def extreme(self, first, last, field):
+        """(value, bucket) of the lowest (MIN) or highest (MAX) bucket in the range."""
+        data = self.data
+        best, best_bucket = (math.inf, None) if field == self.MIN else (-math.inf, None)
+        for b in range(first, last + 1):
+            value = data[self._at(b, field)]
+            if (value < best) if field == self.MIN else (value > best):
+                best, best_bucket = value, b
+        return best, best_bucket
+
+class WindowStats:
+    __slots__ = ("count", "mean", "min", "min_at", "max", "max_at")
+
+    def __init__(self, count, mean, low, low_at, high, high_at):
+        self.count, self.mean = count, mean
+        self.min, self.min_at, self.max, self.max_at = low, low_at, high, high_at
+
+    def __repr__(self):
+        return (f"WindowStats(count={self.count}, mean={self.mean:.2f}, min={self.min} at {self.min_at}, "
+                f"max={self.max} at {self.max_at})")
+
+class Series:
+    """
+    One metric: a ring of raw (time, value) samples, minute and hour tiers,
+    and running all-time count/sum/min/max, all updated as each sample arrives.
+    """
+
+    # all-time aggregates and the raw ring's write position
+    COUNT, SUM, MIN, MAX, MIN_AT, MAX_AT, RAW_WRITTEN = range(7)
+
+    def __init__(self, name, data, offset, raw_capacity=RAW_CAPACITY, tiers=TIERS):
+        self.name = name
+        self.data = data
+        self.state = offset
+        self.raw_capacity = raw_capacity
+        self.raw_t = offset + 7
+        self.raw_v = self.raw_t + raw_capacity
+        offset = self.raw_v + raw_capacity
+        self.tiers = []
+        for tier_name, seconds, capacity in tiers:
+            self.tiers.append(Tier(tier_name, seconds, capacity, data, offset))
+            offset += Tier.size(capacity)
+        self.end = offset
+
+    @staticmethod
+    def size(raw_capacity=RAW_CAPACITY, tiers=TIERS):
+        return 7 + 2 * raw_capacity + sum(Tier.size(capacity) for _, _, capacity in tiers)
+
+    def reset(self):
+        s = self.state
+        self.data[s + self.COUNT] = self.data[s + self.SUM] = self.data[s + self.RAW_WRITTEN] = 0.0
+        self.data[s + self.MIN], self.data[s + self.MAX] = math.inf, -math.inf
+        for tier in self.tiers:
+            tier.reset()
+
+    def add(self, t, value):
+        data, s = self.data, self.state
+        written = int(data[s + self.RAW_WRITTEN])
+        slot = written % self.raw_capacity
+        data[self.raw_t + slot] = t
+        data[self.raw_v + slot] = value
+        data[s + self.RAW_WRITTEN] = written + 1
+        data[s + self.COUNT] += 1
+        data[s + self.SUM] += value
+        if value < data[s + self.MIN]:
+            data[s + self.MIN], data[s + self.MIN_AT] = value, t
+        if value > data[s + self.MAX]:
+            data[s + self.MAX], data[s + self.MAX_AT] = value, t
+        for tier in self.tiers:
+            tier.add(t, value)
+
+    def latest(self):
+        """(time, value) of the newest sample, or None."""
+        written = int(self.data[self.state + self.RAW_WRITTEN])
+        if not written:
+            return None
+        slot = (written - 1) % self.raw_capacity
+        return self.data[self.raw_t + slot], self.data[self.raw_v + slot]
+
+    def all_time(self):
+        data, s = self.data, self.state
+        count = int(data[s + self.COUNT])
+        if not count:
+            return None
+        return WindowStats(count, data[s + self.SUM] / count, data[s + self.MIN], data[s + self.MIN_AT],
+                           data[s + self.MAX], data[s + self.MAX_AT])
+
+    def window(self, since, until=None):
+        """
+        Count, mean, min and max (with when they happened) between `since`
+        and `until` (default now), or None if there were no samples.
+
+        Windows up to 10 minutes read the raw samples; up to 6 hours, minute
+        buckets; longer ones, hour buckets. Count and mean are two lookups;
+        min and max scan the buckets in the window, so at most 360 minute
+        buckets or, for the full 90 days, 2160 hour buckets (a few ms). The
+        time of an hourly extreme is narrowed down to its minute while minute
+        buckets for it are still kept.
+        """
+        until = time.time() if until is None else until
+        length = until - since
+        if length <= 600:
+            return self._raw_window(since, until)
+        tier = self.tiers[0] if length <= 6 * 3600 or len(self.tiers) == 1 else self.tiers[1]
+        span = tier.span(since, until)
+        if span is None:
+            return None
+        count, total = tier.count_and_sum(*span)
+        if not count:
+            return None
+        low, low_bucket = tier.extreme(*span, Tier.MIN)
+        high, high_bucket = tier.extreme(*span, Tier.MAX)
+        return WindowStats(int(count), total / count, low, self._when(tier, low_bucket, Tier.MIN),
+                           high, self._when(tier, high_bucket, Tier.MAX))
+
+    def _when(self, tier, bucket, field):
+        start = bucket * tier.seconds
+        finer = self.tiers[0]
+        if tier is not finer:
+            span = finer.span(start, start + tier.seconds - 1)
+            if span is not None:
+                _, minute = finer.extreme(*span, field)
+                if minute is not None:
+                    return minute * finer.seconds
+        return start
+
+    def _raw_window(self, since, until):
+        data = self.data
+        written = int(data[self.state + self.RAW_WRITTEN])
+        count, total = 0, 0.0
+        low = high = None
+        for i in range(written - 1, max(-1, written - 1 - self.raw_capacity), -1):
+            slot = i % self.raw_capacity
+            t = data[self.raw_t + slot]
+            if t < since:
+                break
+            if t > until:
+                continue
+            value = data[self.raw_v + slot]
+            count += 1
+            total += value
+            if low is None or value < low[0]:
+                low = (value, t)
+            if high is None or value > high[0]:
+                high = (value, t)
+        if not count:
+            return None
+        return WindowStats(count, total / count, low[0], low[1], high[0], high[1])
+
+class SensorStore:
+    """
+    Time series for the Arduino readings (temperature, humidity, volume).
+    With a path, the arrays live in a memory-mapped file; a file written
+    with a different layout is started over.
+    """
+
+    METRICS = ("temperature", "humidity", "volume")
+
+    def __init__(self, path=None, metrics=METRICS, raw_capacity=RAW_CAPACITY, tiers=TIERS):
+        self.path = path
+        layout = repr((tuple(metrics), raw_capacity, tuple(tiers))).encode("utf-8")
+        fingerprint = zlib.crc32(layout)
+        doubles = len(metrics) * Series.size(raw_capacity, tiers)
+        nbytes = HEADER.size + 8 * doubles
+        self._lock = threading.Lock()
+        self._file = None
+        fresh = True
+        if path:
+            exists = os.path.exists(path) and os.path.getsize(path) == nbytes
+            self._file = open(path, "r+b" if exists else "w+b")
+            if not exists:
+                self._file.truncate(nbytes)
+            self._buffer = mmap.mmap(self._file.fileno(), nbytes)
+            fresh = not exists or HEADER.unpack_from(self._buffer) != (MAGIC, fingerprint)
+        else:
+            self._buffer = bytearray(nbytes)
+        self.data = memoryview(self._buffer)[HEADER.size:].cast("d")
+        self.series = {}
+        offset = 0
+        for name in metrics:
+            series = self.series[name] = Series(name, self.data, offset, raw_capacity, tiers)
+            offset = series.end
+        if fresh:
+            for series in self.series.values():
+                series.reset()
+            HEADER.pack_into(self._buffer, 0, MAGIC, fingerprint)
+
+    def add(self, name, value, t=None):
+        with self._lock:
+            self.series[name].add(time.time() if t is None else t, float(value))
+
+    def add_dht(self, temperature, humidity, t=None):
+        t = time.time() if t is None else t
+        with self._lock:
+            self.series["temperature"].add(t, temperature)
+            self.series["humidity"].add(t, humidity)
+
+    def latest(self, name):
+        with self._lock:
+            return self.series[name].latest()
+
+    def window(self, name, since, until=None):
+        with self._lock:
+            return self.series[name].window(since, until)
+
+    def all_time(self, name):
+        with self._lock:
+            return self.series[name].all_time()
+
+    def flush(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.flush()
+
+    def close(self):
+        if self._file is None:
+            return
+        with self._lock:
+            self.data.release()
+            self._buffer.flush()
+            self._buffer.close()
+            self._file.close()
+            self._file = None
+
+def create_sensor_store():
+    """JARVIS_SENSOR_STORE=path of the memory-mapped history ("" keeps it in memory only)."""
+    path = os.getenv("JARVIS_SENSOR_STORE", "sensor_history.bin") or None
+    try:
+        return SensorStore(path)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not open sensor history {path}: {e}; keeping it in memory only")
+        return SensorStore()
+
+#############################
+# Questions about history
+#############################
+UNITS = {"temperature": "°F", "humidity": "%", "volume": "%"}
+_WINDOW = re.compile(r"\b(?:in |over |during )?(?:the )?(?:last|past) (?:(\d+|an?|one|two|few) )?"
+                     r"(minute|hour|day|week)s?\b|\b(today|this morning|this week|yesterday)\b")
+_WORD_NUMBERS = {"a": 1, "an": 1, "one": 1, "two": 2, "few": 3}
+_UNIT_SECONDS = {"minute": 60, "hour": 3600, "day": 86400, "week": 7 * 86400}
+
+def parse_window(text, now=None):
+    """("in the last hour" | "today" | ...) -> (since, until, spoken label), or None."""
+    match = _WINDOW.search(text.lower())
+    if not match:
+        return None
+    now = time.time() if now is None else now
+    count, unit, named = match.groups()
+    if named:
+        midnight = datetime.datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+        if named == "today":
+            return midnight.timestamp(), now, "today"
+        if named == "this morning":
+            return midnight.timestamp(), min(now, (midnight + datetime.timedelta(hours=12)).timestamp()), "this morning"
+        if named == "this week":
+            return (midnight - datetime.timedelta(days=midnight.weekday())).timestamp(), now, "this week"
+        return (midnight - datetime.timedelta(days=1)).timestamp(), midnight.timestamp() - 1, "yesterday"
+    n = int(count) if count and count.isdigit() else _WORD_NUMBERS.get(count, 1)
+    label = f"in the last {unit}" if n == 1 else f"in the last {n} {unit}s"
+    return now - n * _UNIT_SECONDS[unit], now, label
+
+def spoken_time(t):
+    return datetime.datetime.fromtimestamp(t).strftime("%I:%M %p").lstrip("0")
+
+def describe_history(store, name, text, now=None):
+    """Answer "average temperature in the last hour" / "when did humidity peak today", or None if no window is asked for."""
+    window = parse_window(text, now)
+    if window is None:
+        return None
+    since, until, label = window
+    stats = store.window(name, since, until)
+    unit = UNITS[name]
+    if stats is None:
+        return f"I don't have any {name} readings {label}."
+    text = text.lower()
+    if re.search(r"\b(peak|highest|max|maximum|warmest|hottest|most humid)\b", text):
+        return f"The {name} peaked at {stats.max:g}{unit} at {spoken_time(stats.max_at)} {label}."
+    if re.search(r"\b(lowest|min|minimum|coldest|driest|least)\b", text):
+        return f"The lowest {name} {label} was {stats.min:g}{unit} at {spoken_time(stats.min_at)}."
+    return (f"{label[0].upper() + label[1:]}, the {name} averaged {stats.mean:.1f}{unit}, "
+            f"ranging from {stats.min:g} to {stats.max:g}{unit}.")
+
+#############################
+# Benchmark: days of simulated readings
+#############################
+def simulate_readings(days, interval=2.0, start=None, seed=1):
+    """(t, temperature, humidity) every `interval` seconds with a daily cycle and some noise."""
+    rng = random.Random(seed)
+    start = time.time() - days * 86400 if start is None else start
+    for i in range(int(days * 86400 / interval)):
+        t = start + i * interval
+        phase = 2 * math.pi * ((t % 86400) / 86400)
+        yield (t, round(70 + 5 * math.sin(phase) + rng.uniform(-0.5, 0.5), 1),
+               round(40 + 10 * math.cos(phase) + rng.uniform(-1, 1)))
+
+def run_benchmark(days=7, path=None, interval=2.0):
+    import tempfile
+    if path == "tmp":
+        path = os.path.join(tempfile.mkdtemp(prefix="jarvis-ts-"), "sensor_history.bin")
+    store = SensorStore(path)
+    readings = list(simulate_readings(days, interval))
+    now = readings[-1][0]
+
+    t0 = time.perf_counter()
+    for t, temperature, humidity in readings:
+        store.add_dht(temperature, humidity, t)
+    elapsed = time.perf_counter() - t0
+    print(f"Ingested {len(readings):,} DHT readings ({days} days every {interval:g} s) into "
+          f"{'memory' if not path else path} in {elapsed:.2f} s: "
+          f"{elapsed / len(readings) * 1e6:.1f} µs per reading, {len(readings) / elapsed:,.0f} readings/s")
+
+    naive = [(t, temperature) for t, temperature, _ in readings]
+    print(f"{'window':<10}{'store µs':>10}{'list scan µs':>14}  result")
+    for label, seconds in (("1 min", 60), ("1 hour", 3600), ("6 hours", 6 * 3600), ("1 day", 86400),
+                           (f"{days} days", days * 86400)):
+        repeats = 200
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            stats = store.window("temperature", now - seconds, now)
+        store_us = (time.perf_counter() - t0) / repeats * 1e6
+        t0 = time.perf_counter()
+        values = [v for t, v in naive if t >= now - seconds]
+        scan_mean = sum(values) / len(values)
+        scan_us = (time.perf_counter() - t0) * 1e6
+        print(f"{label:<10}{store_us:>10.1f}{scan_us:>14.0f}  mean {stats.mean:.2f} (scan {scan_mean:.2f}), "
+              f"max {stats.max:g} at {spoken_time(stats.max_at)}")
+    print("Today:", describe_history(store, "humidity", "when did humidity peak today", now))
+    store.close()
+    if path:
+        reopened = SensorStore(path)
+        print(f"Reopened {path}: {reopened.all_time('temperature').count:,} temperature readings kept")
+        reopened.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest simulated DHT readings and time window queries.")
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between readings")
+    parser.add_argument("--path", help='memory-map the store to this file ("tmp" for a temporary one)')
+    args = parser.parse_args()
+    run_benchmark(args.days, args.path, args.interval)
@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import argparse
+import threading
+from collections import deque
+
+#############################
+# Rolling latency percentiles
+#############################
+class LatencyStats:
+    """Keeps the last `window` samples per name and reports percentiles."""
+
+    def __init__(self, window=200):
+        self.window = window
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, name, p):
+        with self._lock:
+            values = sorted(self.samples.get(name, ()))
+        return percentile(values, p)
+
+    def summary(self, name):
+        p50, p95 = self.percentile(name, 50), self.percentile(name, 95)
+        if p50 is None:
+            return f"{name} n/a"
+        return f"{name} p50 {p50 * 1000:.0f} ms / p95 {p95 * 1000:.0f} ms"
+
+    def table(self):
+        """{name: {"count", "p50", "p95", "p99"}} in milliseconds."""
+        with self._lock:
+            snapshot = {name: sorted(samples) for name, samples in self.samples.items()}
+        return {name: {"count": len(values), **{f"p{p}": percentile(values, p) * 1000 for p in (50, 95, 99)}}
+                for name, values in snapshot.items()}
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+#############################
+# Spans and turns
+#############################
+class Span:
+    """`with tracer.span("stt"):` times a block into the current turn."""
+
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.tracer.record(self.name, time.perf_counter() - self.start, self.start)
+
+class Tracer:
+    """
+    Collects per-stage timings for one conversational turn at a time.
+    Each finished turn is appended to a JSONL file (if a path is given) and
+    every duration feeds a rolling p50/p95/p99 histogram.
+
+    Durations recorded between turns (e.g. wake-word detection) are carried
+    into the next turn.
+    """
+
+    def __init__(self, path=None, window=500):
+        self.path = path
+        self.stats = LatencyStats(window)
+        self.turns = 0
+        self._turn = None
+        self._pending = []
+        self._file = None
+        self._lock = threading.Lock()
+
+    def begin_turn(self, **attrs):
+        self.end_turn()
+        with self._lock:
+            self.turns += 1
+            self._turn = {"turn": self.turns, "at": time.time(), "start": time.perf_counter(),
+                          "attrs": dict(attrs), "spans": self._pending, "marks": {},
+                          "carried": len(self._pending)}
+            self._pending = []
+
+    def discard_turn(self):
+        """Drop the current turn without writing it (nothing was heard). Carried-in spans wait for the next one."""
+        with self._lock:
+            turn, self._turn = self._turn, None
+            if turn is None:
+                return
+            self.turns -= 1
+            self._pending = (turn["spans"][:turn["carried"]] + self._pending)[-50:]
+
+    def span(self, name):
+        return Span(self, name)
+
+    def record(self, name, seconds, start=None):
+        """Add a duration measured elsewhere."""
+        self.stats.record(name, seconds)
+        with self._lock:
+            if self._turn is None:
+                self._pending.append((name, start, seconds))
+                del self._pending[:-50]
+            else:
+                self._turn["spans"].append((name, start, seconds))
+
+    def mark(self, name):
+        """Note when something happened, relative to the start of the turn."""
+        with self._lock:
+            turn = self._turn
+            if turn is None or name in turn["marks"]:
+                return
+            elapsed = time.perf_counter() - turn["start"]
+            turn["marks"][name] = round(elapsed * 1000, 2)
+        self.stats.record(name, elapsed)
+
+    def annotate(self, **attrs):
+        with self._lock:
+            if self._turn is not None:
+                self._turn["attrs"].update(attrs)
+
+    def end_turn(self, **attrs):
+        with self._lock:
+            turn, self._turn = self._turn, None
+        if turn is None:
+            return None
+        duration = time.perf_counter() - turn["start"]
+        self.stats.record("turn", duration)
+        record = {
+            "turn": turn["turn"],
+            "at": round(turn["at"], 3),
+            "ms": round(duration * 1000, 2),
+            "spans": [{"name": name,
+                       "start_ms": None if start is None else round((start - turn["start"]) * 1000, 2),
+                       "ms": round(seconds * 1000, 2)}
+                      for name, start, seconds in turn["spans"]],
+            "marks": turn["marks"],
+            **turn["attrs"], **attrs,
+        }
+        self._write(record)
+        return record
+
+    def _write(self, record):
+        if not self.path:
+            return
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a", buffering=1)
+            self._file.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not write trace: {e}")
+            self.path = None
+
+    def summary(self):
+        return "; ".join(f"{name} p50 {row['p50']:.0f} / p95 {row['p95']:.0f} / p99 {row['p99']:.0f} ms"
+                         for name, row in self.stats.table().items())
+
+    def close(self):
+        self.end_turn()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+_tracer = None
+
+def get_tracer():
+    """Shared tracer. JARVIS_TRACE=path.jsonl (default jarvis_trace.jsonl; empty to keep stats in memory only)."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(os.getenv("JARVIS_TRACE", "jarvis_trace.jsonl") or None)
+    return _tracer
+
+#############################
+# CLI: summarize a trace file
+#############################
+def summarize(path):
+    stages = {}
+    turn_ms = []
+    try:
+        f = open(path)
+    except OSError as e:
+        print(f"No trace found at {path} ({e.strerror}). Run Jarvis first, or pass a trace file.")
+        return
+    with f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            turn_ms.append(record["ms"])
+            for span in record.get("spans", []):
+                stages.setdefault(span["name"], []).append(span["ms"])
+            for name, ms in record.get("marks", {}).items():
+                stages.setdefault(name, []).append(ms)
+    stages["turn"] = turn_ms
+    print(f"{len(turn_ms)} turns in {path}")
+    print(f"{'stage':<20}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)")
+    for name, values in sorted(stages.items(), key=lambda item: -sum(item[1])):
+        values.sort()
+        if not values:
+            continue
+        print(f"{name:<20}{len(values):>7}" + "".join(f"{percentile(values, p):>10.1f}" for p in (50, 95, 99))
+              + f"{values[-1]:>10.1f}")
+
+def span_overhead(n=200000):
+    tracer = Tracer()
+    tracer.begin_turn()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        with tracer.span("x"):
+            pass
+    print(f"span overhead: {(time.perf_counter() - t0) / n * 1e6:.2f} µs")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a Jarvis turn trace (JSONL).")
+    parser.add_argument("trace", nargs="?", default="jarvis_trace.jsonl")
+    parser.add_argument("--overhead", action="store_true", help="measure the cost of one span instead")
+    args = parser.parse_args()
+    if args.overhead:
+        span_overhead()
+    else:
+        summarize(args.trace)
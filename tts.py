@@ -0,0 +1,203 @@
+import time
+import queue
+import argparse
+import threading
+
+# Voice settings used for every utterance.
+VOICE_ID = "com.apple.voice.compact.en-GB.Daniel"
+RATE = 165
+VOLUME = 1.2
+
+def create_engine():
+    """Create a pyttsx3 engine with Jarvis's British male voice."""
+    import pyttsx3
+    engine = pyttsx3.init()
+    engine.setProperty('rate', RATE)
+    engine.setProperty('volume', VOLUME)
+    engine.setProperty('voice', VOICE_ID)
+    return engine
+
+class SpeechWorker:
+    """
+    Owns one long-lived TTS engine and speaks queued utterances on a
+    background thread. say() returns immediately; cancel() drops everything
+    that is queued and stops the utterance in progress.
+
+    With a `cache` (phrase_cache.PhraseCache) and a `player`, lines that
+    have been pre-rendered are played from memory instead of synthesized.
+    """
+
+    def __init__(self, engine_factory=create_engine, cache=None, player=None):
+        self._engine_factory = engine_factory
+        self._cache = cache
+        self._player = player
+        self._engine = None
+        self._thread = None
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._generation = 0       # bumped by cancel(); older utterances are dropped
+        self._current = None       # generation of the utterance being spoken
+        self._on_start = None
+        self._speaking = False     # the engine has started producing audio
+
+    def start(self):
+        """Start the worker thread (and the engine) if it isn't running yet."""
+        if self._thread is None:
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(ready,), name="speech-worker", daemon=True)
+            self._thread.start()
+            ready.wait()
+        return self
+
+    def say(self, text, on_start=None):
+        """Queue text to be spoken. on_start is called when the engine begins speaking it."""
+        self.start()
+        with self._lock:
+            self._idle.clear()
+            self._queue.put((self._generation, text, on_start))
+
+    def cancel(self):
+        """Drop queued speech and stop whatever is being spoken right now."""
+        with self._lock:
+            self._generation += 1
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            speaking = self._current is not None
+            if not speaking:
+                self._idle.set()
+        if speaking:
+            try:
+                self._engine.stop()
+            except Exception:
+                pass
+
+    def wait(self, timeout=None):
+        """Block until everything queued has been spoken (or cancelled)."""
+        return self._idle.wait(timeout)
+
+    def is_busy(self):
+        return not self._idle.is_set()
+
+    def is_speaking(self):
+        """True while an utterance is actually playing (not just queued)."""
+        return self._speaking
+
+    def close(self):
+        """Cancel pending speech and stop the worker thread."""
+        self.cancel()
+        if self._thread is not None:
+            self._queue.put((None, None, None))
+            self._thread.join(timeout=1)
+            self._thread = None
+        if self._player is not None:
+            self._player.close()
+
+    def _run(self, ready):
+        self._engine = self._engine_factory()
+        self._engine.connect('started-utterance', self._on_utterance_start)
+        self._engine.connect('started-word', self._on_word)
+        ready.set()
+        while True:
+            generation, text, on_start = self._queue.get()
+            if text is None:
+                break
+            with self._lock:
+                if generation != self._generation:
+                    self._set_idle_if_empty()
+                    continue
+                self._current = generation
+                self._on_start = on_start
+            clip = self._cache.get(text) if self._cache is not None and self._player is not None else None
+            try:
+                if clip is not None:
+                    self._player.play(clip, lambda: self._generation != generation,
+                                      on_start=lambda: self._on_utterance_start(None))
+                else:
+                    self._engine.say(text)
+                    self._engine.runAndWait()
+            except Exception as e:
+                print(f"❌ Error during speech: {e}")
+            with self._lock:
+                self._current = None
+                self._on_start = None
+                self._speaking = False
+                self._set_idle_if_empty()
+
+    def _set_idle_if_empty(self):
+        if self._queue.empty():
+            self._idle.set()
+
+    def _on_utterance_start(self, name):
+        self._speaking = True
+        if self._on_start is not None:
+            self._on_start()
+
+    def _on_word(self, name, location, length):
+        # Backstop for drivers that ignore stop() from another thread.
+        if self._current is not None and self._current != self._generation:
+            self._engine.stop()
+
+#############################
+# Benchmark: per-utterance startup cost
+#############################
+def _time_to_start_fresh_engine(text):
+    """Old behaviour: init an engine, set its properties, then speak."""
+    started = {}
+    t0 = time.perf_counter()
+    engine = create_engine()
+    engine.connect('started-utterance', lambda name: started.setdefault("t", time.perf_counter()))
+    engine.say(text)
+    engine.runAndWait()
+    return started.get("t", time.perf_counter()) - t0
+
+def _time_to_start_worker(worker, text):
+    started = threading.Event()
+    t0 = time.perf_counter()
+    t_start = [None]
+
+    def mark():
+        t_start[0] = time.perf_counter()
+        started.set()
+
+    worker.say(text, on_start=mark)
+    started.wait(10)
+    worker.wait()
+    return (t_start[0] or time.perf_counter()) - t0
+
+def _time_to_cancel(worker, text):
+    started = threading.Event()
+    worker.say(text, on_start=started.set)
+    worker.say(text)
+    started.wait(10)
+    time.sleep(0.2)
+    t0 = time.perf_counter()
+    worker.cancel()
+    worker.wait()
+    return time.perf_counter() - t0
+
+def benchmark(runs=5, text="Hello, Creator."):
+    fresh = [_time_to_start_fresh_engine(text) for _ in range(runs)]
+    worker = SpeechWorker().start()
+    pooled = [_time_to_start_worker(worker, text) for _ in range(runs)]
+    long_text = "This is a long sentence that should be interrupted well before it finishes. " * 3
+    cancels = [_time_to_cancel(worker, long_text) for _ in range(runs)]
+    worker.close()
+
+    def ms(values):
+        values = sorted(values)
+        return f"min {values[0] * 1000:7.1f} ms   median {values[len(values) // 2] * 1000:7.1f} ms"
+
+    print(f"Startup, new engine per call : {ms(fresh)}")
+    print(f"Startup, persistent worker   : {ms(pooled)}")
+    print(f"Cancel to silence            : {ms(cancels)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark TTS startup and cancellation.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    benchmark(args.runs)
@@ -0,0 +1,124 @@
+import time
+from array import array
+
+from listening import frame_rms
+
+#############################
+# Voice activity detection
+#############################
+def zero_crossing_rate(frame):
+    """Fraction of neighbouring samples that change sign."""
+    if len(frame) < 2:
+        return 0.0
+    crossings = sum(1 for a, b in zip(frame, frame[1:]) if (a < 0) != (b < 0))
+    return crossings / (len(frame) - 1)
+
+class EnergyVAD:
+    """
+    Energy + zero-crossing voice detector on top of the shared noise floor.
+    Loud frames are speech; quieter frames still count if they cross zero
+    often, which keeps trailing fricatives ("yes", "six") from being cut off.
+    """
+
+    def __init__(self, noise_floor, soft_ratio=0.5, fricative_zcr=0.25):
+        self.noise_floor = noise_floor
+        self.soft_ratio = soft_ratio
+        self.fricative_zcr = fricative_zcr
+
+    def is_speech(self, frame, sample_rate):
+        energy = frame_rms(frame)
+        threshold = self.noise_floor.threshold()
+        if energy > threshold:
+            return True
+        return energy > threshold * self.soft_ratio and zero_crossing_rate(frame) > self.fricative_zcr
+
+class WebRTCVAD:
+    """WebRTC's VAD (pip install webrtcvad). Judges the first 30 ms of each frame."""
+
+    def __init__(self, aggressiveness=2):
+        import webrtcvad
+        self.vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame, sample_rate):
+        window = sample_rate * 30 // 1000
+        return self.vad.is_speech(array("h", frame[:window]).tobytes(), sample_rate)
+
+def create_vad(noise_floor, name="energy"):
+    if name == "webrtc":
+        try:
+            return WebRTCVAD()
+        except ImportError:
+            print("⚠️ webrtcvad is not installed; using the energy VAD.")
+    return EnergyVAD(noise_floor)
+
+#############################
+# Endpointing
+#############################
+# Seconds of silence that end a phrase, by what Jarvis is waiting for
+ENDPOINT_PROFILES = {
+    "confirm": 0.35,     # yes / no
+    "command": 0.6,
+    "dictation": 1.2,    # spelling out an email address
+}
+
+class Endpointer:
+    """
+    Decides when the user has finished talking. The trailing-silence
+    timeout starts from the context's profile and stretches (up to twice
+    the profile) when the user has already paused that long mid-phrase.
+
+    update() returns None to keep listening, or why listening ended:
+    "end" (speech then silence), "timeout" (no speech at all) or "limit".
+    """
+
+    def __init__(self, vad, sample_rate, frame_length, context="command",
+                 no_speech_timeout=5.0, phrase_time_limit=30.0):
+        self.vad = vad
+        self.sample_rate = sample_rate
+        self.frame_seconds = frame_length / sample_rate
+        self.context = context
+        self.base_silence = ENDPOINT_PROFILES[context]
+        self.no_speech_timeout = no_speech_timeout
+        self.phrase_time_limit = phrase_time_limit
+        self.elapsed = 0.0
+        self.speech_seconds = 0.0
+        self.silence = 0.0              # current run of silence after speech
+        self.longest_pause = 0.0        # longest mid-phrase pause so far
+        self.last_speech_at = None      # capture time of the last voiced frame
+        self.ended_at = None
+        self.reason = None
+
+    def trailing_silence(self):
+        """Silence needed to end the phrase right now."""
+        return min(2 * self.base_silence, max(self.base_silence, 1.25 * self.longest_pause))
+
+    def update(self, frame, captured_at=None):
+        if self.reason:
+            return self.reason
+        self.elapsed += self.frame_seconds
+        if self.vad.is_speech(frame, self.sample_rate):
+            if self.speech_seconds:
+                self.longest_pause = max(self.longest_pause, self.silence)
+            self.speech_seconds += self.frame_seconds
+            self.silence = 0.0
+            self.last_speech_at = time.perf_counter() if captured_at is None else captured_at
+        elif self.speech_seconds:
+            self.silence += self.frame_seconds
+            if self.silence >= self.trailing_silence():
+                return self._finish("end")
+        elif self.elapsed >= self.no_speech_timeout:
+            return self._finish("timeout")
+        if self.elapsed >= self.phrase_time_limit:
+            return self._finish("limit")
+        return None
+
+    def _finish(self, reason):
+        self.reason = reason
+        self.ended_at = time.perf_counter()
+        return reason
+
+    def latency(self):
+        """Seconds from the end of the user's last word to the end-of-speech decision."""
+        if self.ended_at is None or self.last_speech_at is None:
+            return None
+        return self.ended_at - self.last_speech_at